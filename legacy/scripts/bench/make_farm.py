@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""
+Génère une "ferme" de repositories Git locaux pour les benchmarks.
+
+Chaque repository est créé dans un remote nu (historique importé en une seule
+passe via `git fast-import`), puis cloné par `file://` pour avoir un upstream.
+Options : nombre de repositories, profondeur d'imbrication, longueur de
+l'historique, fichiers modifiés / non suivis, avance et retard sur l'upstream.
+
+Usage :
+  python3 scripts/bench/make_farm.py /tmp/farm --repos 500 --depth 3 --history 200
+"""
+
+import argparse
+import os
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+# Identité fixe : la génération ne dépend pas de la config git de la machine
+GIT_ENV = {
+    **os.environ,
+    "GIT_AUTHOR_NAME": "RepoScan Bench",
+    "GIT_AUTHOR_EMAIL": "bench@reposcan.invalid",
+    "GIT_COMMITTER_NAME": "RepoScan Bench",
+    "GIT_COMMITTER_EMAIL": "bench@reposcan.invalid",
+    "GIT_CONFIG_NOSYSTEM": "1",
+}
+
+
+def _git(cwd, *args, stdin=None):
+    subprocess.run(
+        ["git", *args], cwd=cwd, input=stdin, env=GIT_ENV, check=True,
+        stdout=subprocess.DEVNULL, stderr=subprocess.PIPE,
+    )
+
+
+def _fast_import_stream(history: int, files: int, start: int) -> bytes:
+    """Flux fast-import : `history` commits sur main, chacun modifiant un fichier."""
+    chunks = []
+    for i in range(history):
+        content = f"revision {i}\n".encode()
+        chunks.append(b"commit refs/heads/main\n")
+        stamp = f"{start + i * 3600} +0000".encode()
+        chunks.append(b"author RepoScan Bench <bench@reposcan.invalid> " + stamp + b"\n")
+        chunks.append(b"committer RepoScan Bench <bench@reposcan.invalid> " + stamp + b"\n")
+        message = f"commit {i}\n".encode()
+        chunks.append(b"data %d\n%s\n" % (len(message), message))
+        chunks.append(b"M 644 inline file%d.txt\ndata %d\n%s\n" % (i % files, len(content), content))
+    return b"".join(chunks)
+
+
+def _repo_relative_path(index: int, depth: int, rng: random.Random) -> str:
+    """Place le repository à une profondeur comprise entre 1 et depth."""
+    level = rng.randint(1, depth)
+    parts = [f"group{rng.randint(0, 9)}" if n == 0 else f"sub{rng.randint(0, 4)}" for n in range(level - 1)]
+    return os.path.join(*parts, f"repo{index:05d}")
+
+
+def create_repo(farm: str, relative_path: str, options, rng: random.Random):
+    """Crée un repository (avec ou sans upstream) et applique l'état demandé."""
+    worktree = os.path.join(farm, relative_path)
+    os.makedirs(os.path.dirname(worktree), exist_ok=True)
+    history = max(1, options.history)
+    stream = _fast_import_stream(history, max(1, options.files), 1_600_000_000 + rng.randint(0, 10_000_000))
+    with_upstream = rng.random() < options.upstream_ratio
+
+    if with_upstream:
+        remote = os.path.join(farm, ".remotes", relative_path.replace(os.sep, "__") + ".git")
+        os.makedirs(remote)
+        _git(remote, "init", "-q", "--bare", "-b", "main")
+        _git(remote, "fast-import", "--quiet", stdin=stream)
+        _git(farm, "clone", "-q", f"file://{remote}", worktree)
+        # Retard : reculer la branche locale, l'upstream garde les commits
+        behind = min(options.behind, history - 1)
+        if behind:
+            _git(worktree, "reset", "-q", "--hard", f"HEAD~{behind}")
+    else:
+        os.makedirs(worktree)
+        _git(worktree, "init", "-q", "-b", "main")
+        _git(worktree, "fast-import", "--quiet", stdin=stream)
+        _git(worktree, "reset", "-q", "--hard", "main")
+
+    # Avance : commits locaux (objets "loose", comme au quotidien)
+    for i in range(options.ahead if with_upstream else 0):
+        _git(worktree, "commit", "-q", "--allow-empty", "-m", f"local {i}")
+
+    for i in range(min(options.dirty, options.files)):
+        with open(os.path.join(worktree, f"file{i}.txt"), "a", encoding="utf-8") as f:
+            f.write("dirty\n")
+    for i in range(options.untracked):
+        with open(os.path.join(worktree, f"untracked{i}.txt"), "w", encoding="utf-8") as f:
+            f.write("untracked\n")
+    return relative_path
+
+
+def generate(farm: str, options) -> dict:
+    """Génère la ferme et retourne sa description (paramètres, durée)."""
+    rng = random.Random(options.seed)
+    paths = sorted({_repo_relative_path(i, options.depth, rng) for i in range(options.repos)})
+    # Un générateur par repository pour un résultat reproductible malgré le parallélisme
+    seeds = [rng.randint(0, 2**32) for _ in paths]
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=options.jobs or os.cpu_count()) as pool:
+        list(pool.map(lambda args: create_repo(farm, args[0], options, random.Random(args[1])), zip(paths, seeds)))
+    return {
+        "path": farm,
+        "repos": len(paths),
+        "depth": options.depth,
+        "history": options.history,
+        "files": options.files,
+        "dirty": options.dirty,
+        "untracked": options.untracked,
+        "upstream_ratio": options.upstream_ratio,
+        "ahead": options.ahead,
+        "behind": options.behind,
+        "seed": options.seed,
+        "generation_seconds": round(time.perf_counter() - start, 3),
+    }
+
+
+def add_farm_arguments(parser: argparse.ArgumentParser):
+    parser.add_argument('--repos', type=int, default=200, help='Nombre de repositories (défaut: 200)')
+    parser.add_argument('--depth', type=int, default=3, help="Profondeur d'imbrication max (défaut: 3)")
+    parser.add_argument('--history', type=int, default=50, help='Commits par repository (défaut: 50)')
+    parser.add_argument('--files', type=int, default=10, help='Fichiers suivis par repository (défaut: 10)')
+    parser.add_argument('--dirty', type=int, default=1, help='Fichiers suivis modifiés (défaut: 1)')
+    parser.add_argument('--untracked', type=int, default=1, help='Fichiers non suivis (défaut: 1)')
+    parser.add_argument('--upstream-ratio', type=float, default=0.5,
+                        help='Part des repositories avec un remote file:// (défaut: 0.5)')
+    parser.add_argument('--ahead', type=int, default=1, help="Commits locaux d'avance sur l'upstream (défaut: 1)")
+    parser.add_argument('--behind', type=int, default=1, help="Commits de retard sur l'upstream (défaut: 1)")
+    parser.add_argument('--seed', type=int, default=42, help='Graine aléatoire (défaut: 42)')
+    parser.add_argument('--jobs', type=int, default=0, help='Créations en parallèle (0 = nombre de cœurs)')
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Génère une ferme de repositories Git pour les benchmarks")
+    parser.add_argument('dest', nargs='?', help='Dossier à créer (défaut: dossier temporaire)')
+    parser.add_argument('--force', action='store_true', help='Supprime le dossier destination s\'il existe')
+    add_farm_arguments(parser)
+    args = parser.parse_args()
+
+    farm = args.dest or tempfile.mkdtemp(prefix="reposcan-farm-")
+    if os.path.exists(farm) and os.listdir(farm):
+        if not args.force:
+            print(f"❌ {farm} existe et n'est pas vide (utilisez --force)", file=sys.stderr)
+            sys.exit(1)
+        shutil.rmtree(farm)
+    os.makedirs(farm, exist_ok=True)
+
+    info = generate(farm, args)
+    print(f"✅ {info['repos']} repositories créés dans {farm} ({info['generation_seconds']}s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,277 @@
+#!/usr/bin/env python3
+"""
+Benchmarks de RepoScan sur une ferme de repositories synthétique.
+
+Mesure, sur la même ferme :
+- discovery          : parcours de l'arborescence (iter_repo_candidates)
+- analysis_subprocess: scan complet, fast_scan désactivé, sans cache
+- analysis_fast      : scan complet en fast mode, sans cache
+- analysis_cached    : scan complet avec le cache de scan chaud
+- refresh            : recalcul avance/retard + dernier commit (comme après un fetch)
+- search             : frappe progressive d'une recherche dans le SearchIndex
+- fetch_all          : FetchExecutor sur tous les repositories (remotes file://)
+- disk_usage         : tailles working tree / .git / artefacts, sans cache
+- disk_usage_cached  : idem avec le cache par dossier chaud (un stat par dossier)
+
+Les phases passent par le ScanEngine utilisé par les deux interfaces, avec une
+config dédiée écrite dans un dossier de travail temporaire.
+
+Usage :
+  python3 scripts/bench/run_bench.py --repos 500 --output bench.json
+  python3 scripts/bench/run_bench.py --farm /tmp/farm --repeat 5 --compare bench.json
+"""
+
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+BENCH_DIR = Path(__file__).resolve().parent
+sys.path.insert(0, str(BENCH_DIR))
+sys.path.insert(0, str(BENCH_DIR.parent.parent / "src"))
+
+from make_farm import add_farm_arguments, generate
+from config_manager import ConfigManager
+from scan_engine import ScanEngine
+from search_index import SearchIndex
+
+
+PHASES = (
+    "discovery",
+    "analysis_subprocess",
+    "analysis_fast",
+    "analysis_cached",
+    "refresh",
+    "search",
+    "fetch_all",
+    "disk_usage",
+    "disk_usage_cached",
+)
+
+
+class Bench:
+    """Exécute les phases sur une ferme, avec une config isolée dans workdir."""
+
+    def __init__(self, farm: str, workdir: str, args):
+        self.farm = farm
+        self.workdir = workdir
+        self.args = args
+        self.repos = []
+
+    def engine(self, **overrides) -> ScanEngine:
+        """Moteur dont la config (config/config.json du workdir) est surchargée."""
+        config = {
+            "default_repository_path": self.farm,
+            "max_scan_depth": self.args.max_depth,
+            "scan_concurrency": self.args.concurrency,
+            "fast_scan": True,
+            "scan_cache": False,
+            "scan_cache_ttl_seconds": 0,
+            "fetch_concurrency": 8,
+            "fetch_per_host_concurrency": 4,
+            **overrides,
+        }
+        config_dir = os.path.join(self.workdir, "config")
+        os.makedirs(config_dir, exist_ok=True)
+        with open(os.path.join(config_dir, "config.json"), "w", encoding="utf-8") as f:
+            json.dump(config, f)
+        # ConfigManager cherche d'abord ./config/config.json
+        os.chdir(self.workdir)
+        return ScanEngine(ConfigManager())
+
+    def scan(self, engine) -> list:
+        with contextlib.redirect_stdout(io.StringIO()):
+            return asyncio.run(engine.scan(self.farm))
+
+    # ─── Phases ─────────────────────────────────────────────────────────────────
+
+    def phase_discovery(self):
+        engine = self.engine()
+        return lambda: list(engine.candidates(self.farm))
+
+    def phase_analysis_subprocess(self):
+        engine = self.engine(fast_scan=False)
+        return lambda: self.scan(engine)
+
+    def phase_analysis_fast(self):
+        engine = self.engine()
+
+        def run():
+            self.repos = self.scan(engine)
+        return run
+
+    def phase_analysis_cached(self):
+        cache_file = os.path.join(self.workdir, "config", "scan_cache.json")
+        if os.path.exists(cache_file):
+            os.remove(cache_file)
+        engine = self.engine(scan_cache=True)
+        self.scan(engine)  # Préchauffe le cache (non mesuré)
+        engine.save_cache()
+        return lambda: self.scan(engine)
+
+    def phase_refresh(self):
+        engine = self.engine()
+        return lambda: asyncio.run(engine.refresh_sync(self.repos))
+
+    def phase_search(self):
+        index = SearchIndex()
+        for repo in self.repos:
+            index.add(repo)
+        # Frappe caractère par caractère, puis effacement
+        term = self.args.search_term
+        keystrokes = [term[:i] for i in range(1, len(term) + 1)] + [term[:i] for i in range(len(term) - 1, -1, -1)]
+
+        def run():
+            for query in keystrokes:
+                index.query(query)
+        return run
+
+    def phase_fetch_all(self):
+        engine = self.engine()
+
+        def run():
+            results = asyncio.run(engine.fetch_all(self.repos, lambda result: None))
+            failures = [result for result in results if not result.success]
+            if failures:
+                raise RuntimeError(f"{len(failures)} fetchs en échec: {failures[0].error}")
+        return run
+
+    def phase_disk_usage(self):
+        engine = self.engine(disk_usage_cache=False)
+        return lambda: asyncio.run(engine.measure_disk_usage(self.repos))
+
+    def phase_disk_usage_cached(self):
+        # Cache froid avant le préchauffage : base SQLite et ses fichiers WAL
+        cache_file = os.path.join(self.workdir, "config", "disk_usage.sqlite3")
+        for path in (cache_file, cache_file + "-wal", cache_file + "-shm"):
+            if os.path.exists(path):
+                os.remove(path)
+        engine = self.engine(disk_usage_cache=True)
+        asyncio.run(engine.measure_disk_usage(self.repos))  # Préchauffe le cache (non mesuré)
+        return lambda: asyncio.run(engine.measure_disk_usage(self.repos))
+
+    # ─── Exécution ──────────────────────────────────────────────────────────────
+
+    def run(self, phases) -> dict:
+        results = {}
+        for phase in phases:
+            run = getattr(self, f"phase_{phase}")()
+            timings = []
+            for _ in range(self.args.repeat):
+                start = time.perf_counter()
+                run()
+                timings.append(time.perf_counter() - start)
+            results[phase] = {
+                "runs": [round(t, 6) for t in timings],
+                "min": round(min(timings), 6),
+                "median": round(statistics.median(timings), 6),
+                "mean": round(statistics.fmean(timings), 6),
+            }
+            print(f"  {phase:<20} min {min(timings) * 1000:10.1f} ms   "
+                  f"médiane {statistics.median(timings) * 1000:10.1f} ms", file=sys.stderr)
+        return results
+
+
+def _git_version() -> str:
+    try:
+        return subprocess.run(["git", "--version"], capture_output=True, text=True).stdout.strip()
+    except OSError:
+        return "?"
+
+
+def _print_comparison(results: dict, baseline_file: str):
+    with open(baseline_file, "r", encoding="utf-8") as f:
+        baseline = json.load(f).get("results", {})
+    print(f"\nComparaison avec {baseline_file} (médianes) :", file=sys.stderr)
+    for phase, data in results.items():
+        if phase not in baseline or not baseline[phase]["median"]:
+            continue
+        ratio = data["median"] / baseline[phase]["median"]
+        print(f"  {phase:<20} x{ratio:6.2f}  ({baseline[phase]['median'] * 1000:.1f} -> {data['median'] * 1000:.1f} ms)",
+              file=sys.stderr)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmarks RepoScan sur une ferme de repositories synthétique")
+    parser.add_argument('--farm', help='Ferme existante à utiliser (sinon générée dans un dossier temporaire)')
+    parser.add_argument('--keep', action='store_true', help='Conserver la ferme générée')
+    parser.add_argument('--phases', default=",".join(PHASES), help=f'Phases à mesurer (défaut: {",".join(PHASES)})')
+    parser.add_argument('--repeat', type=int, default=3, help='Mesures par phase (défaut: 3)')
+    parser.add_argument('--max-depth', type=int, default=4, help='Profondeur de scan (défaut: 4)')
+    parser.add_argument('--concurrency', type=int, default=0, help='scan_concurrency (0 = nombre de cœurs)')
+    parser.add_argument('--search-term', default='group1/sub2', help='Texte tapé pour la phase search')
+    parser.add_argument('--output', help='Fichier JSON de résultats')
+    parser.add_argument('--compare', help='Fichier JSON de référence à comparer')
+    add_farm_arguments(parser)
+    args = parser.parse_args()
+
+    phases = [phase.strip() for phase in args.phases.split(",") if phase.strip()]
+    unknown = [phase for phase in phases if phase not in PHASES]
+    if unknown:
+        parser.error(f"phases inconnues: {', '.join(unknown)}")
+    # Ces phases travaillent sur le résultat d'analysis_fast (self.repos)
+    dependent = ("refresh", "search", "fetch_all", "disk_usage", "disk_usage_cached")
+    if any(phase in phases for phase in dependent) and "analysis_fast" not in phases:
+        phases.insert(0, "analysis_fast")
+
+    workdir = tempfile.mkdtemp(prefix="reposcan-bench-")
+    farm = args.farm
+    generated = farm is None
+    cwd = os.getcwd()
+    try:
+        if generated:
+            farm = os.path.join(workdir, "farm")
+            os.makedirs(farm)
+            print(f"Génération de {args.repos} repositories...", file=sys.stderr)
+            farm_info = generate(farm, args)
+        else:
+            farm = os.path.abspath(farm)
+            farm_info = {"path": farm}
+
+        print(f"Benchmarks sur {farm} ({args.repeat} mesures par phase)", file=sys.stderr)
+        results = Bench(farm, workdir, args).run(phases)
+    finally:
+        os.chdir(cwd)
+        if generated and args.keep:
+            kept = tempfile.mkdtemp(prefix="reposcan-farm-")
+            os.rename(farm, os.path.join(kept, "farm"))
+            print(f"Ferme conservée dans {os.path.join(kept, 'farm')}", file=sys.stderr)
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    report = {
+        "meta": {
+            "date": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "git": _git_version(),
+            "cpu_count": os.cpu_count(),
+            "repeat": args.repeat,
+            "max_depth": args.max_depth,
+            "concurrency": args.concurrency,
+        },
+        "farm": farm_info,
+        "results": results,
+    }
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"Résultats écrits dans {args.output}", file=sys.stderr)
+    else:
+        print(json.dumps(report, indent=2))
+    if args.compare:
+        _print_comparison(results, args.compare)
+
+
+if __name__ == "__main__":
+    main()
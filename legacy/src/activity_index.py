@@ -0,0 +1,236 @@
+#!/usr/bin/env python3
+"""
+RepoScan - Index local de l'activité des commits (SQLite).
+
+Les métadonnées des commits (hash, auteur, date) de tous les repositories sont
+stockées dans `config/activity.sqlite3`. Chaque repository garde un "watermark" :
+le commit de HEAD lors de la dernière indexation. Une actualisation n'ingère que
+`rev-list <watermark>..HEAD` ; si HEAD n'a pas bougé (lu directement dans .git),
+aucun processus git n'est lancé.
+
+Si le watermark n'est plus un ancêtre de HEAD (rebase, reset, force-push récupéré),
+l'historique a été réécrit : les commits du repository sont effacés et ré-indexés.
+
+Les requêtes (plus actifs de la semaine, sparklines par jour) ne lisent pas les
+commits mais une table de totaux par repository et par jour (UTC), recalculée
+pour un repository quand il reçoit de nouveaux commits : quelques milliers de
+lignes au plus, quelques millisecondes pour des centaines de repositories.
+"""
+
+import os
+import sqlite3
+import threading
+import time
+from typing import Generator
+
+from git_dir_reader import GitDirReader
+
+
+SCHEMA_VERSION = 1
+
+# Une ligne "commit <hash>" puis une ligne formatée par commit (séparateur %x1f)
+_FORMAT = "%H%x1f%an%x1f%ct"
+_FIELD_SEP = "\x1f"
+
+_SPARK_CHARS = "▁▂▃▄▅▆▇█"
+_DAY = 86400
+
+
+class IndexUpdate:
+    """Résultat de l'indexation d'un repository, à enregistrer avec ActivityIndex.apply."""
+
+    __slots__ = ("head", "commits", "rewritten")
+
+    def __init__(self, head: str, commits: list[tuple[str, str, int]], rewritten: bool = False):
+        self.head = head            # Nouveau watermark
+        self.commits = commits      # [(hash, auteur, timestamp)]
+        self.rewritten = rewritten  # Historique réécrit : remplacer les commits déjà indexés
+
+
+def parse_rev_list(output: str) -> list[tuple[str, str, int]]:
+    """Parse la sortie de `git rev-list --format=<_FORMAT>`."""
+    commits = []
+    for line in output.splitlines():
+        parts = line.split(_FIELD_SEP)
+        if len(parts) != 3:
+            continue  # Lignes "commit <hash>"
+        try:
+            commits.append((parts[0], parts[1], int(parts[2])))
+        except ValueError:
+            continue
+    return commits
+
+
+def index_steps(path: str, watermark: str | None, max_age: int | None = None
+                ) -> Generator[list[str], str | None, IndexUpdate | None]:
+    """Nouveaux commits de HEAD depuis watermark. None si le repository n'a pas de commit.
+
+    max_age : epoch des commits les plus anciens à indexer (None : tout l'historique).
+    Générateur (voir git_runner) : produit les commandes git et reçoit leur sortie.
+    """
+    reader = GitDirReader(path)
+    head = reader.read_head()[1] if reader.is_supported else None
+    if head is None:
+        head = yield ["rev-parse", "--verify", "-q", "HEAD"]
+    if not head:
+        return None
+    if head == watermark:
+        return IndexUpdate(head, [])
+
+    rewritten = False
+    if watermark:
+        # Code de sortie non nul (donc None) : pas un ancêtre, ou commit disparu après un gc
+        if (yield ["merge-base", "--is-ancestor", watermark, head]) is None:
+            rewritten, watermark = True, None
+
+    command = ["rev-list", f"--format={_FORMAT}"]
+    if max_age:
+        command.append(f"--max-age={max_age}")
+    command.append(f"{watermark}..{head}" if watermark else head)
+    output = yield command
+    if output is None:
+        return None
+    return IndexUpdate(head, parse_rev_list(output), rewritten)
+
+
+def sparkline(counts: list[int]) -> str:
+    """Une barre par valeur, hauteur relative au maximum (la plus basse pour zéro)."""
+    peak = max(counts, default=0) or 1
+    top = len(_SPARK_CHARS) - 1
+    return "".join(_SPARK_CHARS[(count * top + peak - 1) // peak] for count in counts)
+
+
+class ActivityIndex:
+    """Base SQLite des commits, partagée entre threads (accès sérialisés)."""
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        # Une transaction par repository indexé : WAL évite une synchronisation disque complète à chacune
+        self._conn.execute("PRAGMA journal_mode = WAL")
+        self._conn.execute("PRAGMA synchronous = NORMAL")
+        self._init_schema()
+
+    @classmethod
+    def for_config(cls, config) -> "ActivityIndex | None":
+        """Construit l'index à côté de config.json, ou None s'il est désactivé."""
+        if not config.get('activity_index', True):
+            return None
+        db_path = os.path.join(os.path.dirname(os.path.abspath(config.config_file)), "activity.sqlite3")
+        try:
+            return cls(db_path)
+        except sqlite3.Error as e:
+            print(f"[!] Index d'activité indisponible ({db_path}): {e}")
+            return None
+
+    def _init_schema(self):
+        with self._lock, self._conn:
+            version = self._conn.execute("PRAGMA user_version").fetchone()[0]
+            if version != SCHEMA_VERSION:
+                # Index reconstructible : un changement de format repart de zéro
+                for table in ("commits", "daily", "watermarks"):
+                    self._conn.execute(f"DROP TABLE IF EXISTS {table}")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS commits ("
+                " repo TEXT NOT NULL, hash TEXT NOT NULL, author TEXT NOT NULL, timestamp INTEGER NOT NULL,"
+                " PRIMARY KEY (repo, hash)) WITHOUT ROWID"
+            )
+            # Totaux par jour : clé (jour, repo) pour les requêtes par période
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS daily ("
+                " day INTEGER NOT NULL, repo TEXT NOT NULL, commits INTEGER NOT NULL,"
+                " PRIMARY KEY (day, repo)) WITHOUT ROWID"
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS daily_by_repo ON daily (repo)")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS watermarks ("
+                " repo TEXT PRIMARY KEY, head TEXT NOT NULL, indexed_at REAL NOT NULL)"
+            )
+            self._conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+
+    # ─── Écriture ───────────────────────────────────────────────────────────────
+
+    def watermarks(self) -> dict[str, str]:
+        """repository -> commit de HEAD lors de sa dernière indexation."""
+        with self._lock:
+            return dict(self._conn.execute("SELECT repo, head FROM watermarks"))
+
+    def apply(self, repo: str, update: IndexUpdate):
+        """Enregistre les nouveaux commits, les totaux par jour et le watermark, en une transaction."""
+        with self._lock, self._conn:
+            if update.rewritten:
+                self._conn.execute("DELETE FROM commits WHERE repo = ?", (repo,))
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO commits (repo, hash, author, timestamp) VALUES (?, ?, ?, ?)",
+                ((repo, oid, author, timestamp) for oid, author, timestamp in update.commits)
+            )
+            if update.commits or update.rewritten:
+                # Recalcul depuis les commits : un commit déjà indexé (INSERT OR IGNORE) ne compte pas deux fois
+                self._conn.execute("DELETE FROM daily WHERE repo = ?", (repo,))
+                self._conn.execute(
+                    "INSERT INTO daily (day, repo, commits)"
+                    " SELECT timestamp / ?, repo, COUNT(*) FROM commits WHERE repo = ? GROUP BY 1",
+                    (_DAY, repo)
+                )
+            self._conn.execute(
+                "INSERT OR REPLACE INTO watermarks (repo, head, indexed_at) VALUES (?, ?, ?)",
+                (repo, update.head, time.time())
+            )
+
+    def evict(self, roots, seen_paths):
+        """Oublie les repositories supprimés ou déplacés (même règle que ScanCache.evict).
+
+        Un repository est retiré si son .git n'existe plus, ou s'il se trouve sous
+        une des racines sans avoir été rencontré par le dernier scan.
+        """
+        prefixes = tuple(os.path.join(os.path.abspath(root), "") for root in roots)
+        seen = set(seen_paths)
+        with self._lock, self._conn:
+            indexed = [row[0] for row in self._conn.execute("SELECT repo FROM watermarks")]
+            removed = [
+                (repo,) for repo in indexed
+                if repo not in seen and (repo.startswith(prefixes) or not os.path.exists(os.path.join(repo, ".git")))
+            ]
+            if removed:
+                self._conn.executemany("DELETE FROM commits WHERE repo = ?", removed)
+                self._conn.executemany("DELETE FROM daily WHERE repo = ?", removed)
+                self._conn.executemany("DELETE FROM watermarks WHERE repo = ?", removed)
+
+    # ─── Requêtes ───────────────────────────────────────────────────────────────
+
+    @staticmethod
+    def _first_day(days: int, now: float | None) -> int:
+        """Premier jour (UTC, en jours depuis l'epoch) d'une période qui se termine aujourd'hui."""
+        return int(now or time.time()) // _DAY - days + 1
+
+    def most_active(self, days: int = 7, limit: int = 20, now: float | None = None) -> list[tuple[str, int]]:
+        """[(repository, nombre de commits)] des `days` derniers jours, les plus actifs d'abord."""
+        with self._lock:
+            # "+repo" : sans statistiques, SQLite préférerait parcourir toute la table dans
+            # l'ordre de daily_by_repo pour grouper, au lieu de ne lire que la période
+            return self._conn.execute(
+                "SELECT repo, SUM(commits) AS n FROM daily WHERE day >= ?"
+                " GROUP BY +repo ORDER BY n DESC, repo LIMIT ?",
+                (self._first_day(days, now), limit)
+            ).fetchall()
+
+    def daily_counts(self, days: int = 14, now: float | None = None) -> dict[str, list[int]]:
+        """repository -> commits par jour sur les `days` derniers jours (du plus ancien à aujourd'hui).
+
+        Seuls les repositories ayant au moins un commit sur la période sont présents.
+        """
+        first_day = self._first_day(days, now)
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT repo, day, commits FROM daily WHERE day >= ?", (first_day,)
+            ).fetchall()
+        counts: dict[str, list[int]] = {}
+        for repo, day, count in rows:
+            # Dates dans le futur (horloge décalée) : comptées aujourd'hui
+            counts.setdefault(repo, [0] * days)[min(day - first_day, days - 1)] += count
+        return counts
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
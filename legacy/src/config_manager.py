@@ -80,8 +80,40 @@ class ConfigManager:
                 "app_name": "RepoScan",
                 "shortcut_name": "RepoScan",
                 "default_repository_path": str(Path.home()),
+                "repository_roots": [],
                 "max_scan_depth": 3,
+                "scan_prune_dirs": ["node_modules", "vendor", "target", ".venv", "dist"],
+                "scan_exclude": [],
                 "fetch_timeout_seconds": 30,
+                "fetch_concurrency": 8,
+                "fetch_per_host_concurrency": 4,
+                "pull_concurrency": 4,
+                "pull_timeout_seconds": 60,
+                "scan_concurrency": 0,
+                "git_timeout_seconds": 5,
+                "fast_scan": True,
+                "scan_cache": True,
+                "scan_cache_ttl_seconds": 600,
+                "cat_file_max_sessions": 8,
+                "cat_file_idle_seconds": 60,
+                "recent_commits_count": 10,
+                "activity_index": True,
+                "activity_history_days": 365,
+                "activity_sparkline_days": 14,
+                "activity_timeout_seconds": 120,
+                "disk_usage": True,
+                "disk_usage_workers": 8,
+                "disk_usage_cache": True,
+                "disk_artifact_dirs": ["node_modules", "target", "dist", ".next", "vendor"],
+                "watch_enabled": True,
+                "watch_backend": "auto",
+                "watch_debounce_ms": 500,
+                "watch_poll_interval_seconds": 2,
+                "watch_sweep_repos": 20,
+                "daemon_enabled": True,
+                "daemon_socket": "",
+                "daemon_rescan_seconds": 300,
+                "daemon_timeout_seconds": 5,
                 "gui_window_size": "1400x800",
                 "show_empty_folders": True
             }
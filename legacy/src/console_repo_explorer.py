@@ -2,189 +2,133 @@
 
 import os
 import sys
+import asyncio
 import subprocess
 from datetime import datetime
 import json
 import argparse
 from pathlib import Path
 import shutil
+import contextlib
+import time
 
 # Ajouter le dossier src au path pour l'import relatif
 sys.path.insert(0, str(Path(__file__).parent))
 from config_manager import ConfigManager
-
-class GitRepoInfo:
-    def __init__(self, path, relative_path=None):
-        self.path = path
-        self.name = os.path.basename(path)
-        self.relative_path = relative_path or self.name
-        self.is_git_repo = False
-        self.current_branch = "N/A"
-        self.last_commit = "N/A"
-        self.last_commit_date = "N/A"
-        self.status = "N/A"
-        self.remote_url = "N/A"
-        self.ahead_behind = "N/A"
-        self.depth = self.relative_path.count(os.sep)
-        
-        self._analyze_repo()
-    
-    def _run_git_command(self, command):
-        try:
-            result = subprocess.run(
-                ["git"] + command,
-                cwd=self.path,
-                capture_output=True,
-                text=True,
-                timeout=5
-            )
-            return result.stdout.strip() if result.returncode == 0 else None
-        except (subprocess.SubprocessError, FileNotFoundError):
-            return None
-    
-    def fetch_from_remote(self):
-        """Effectue un git fetch pour ce repository"""
-        if not self.is_git_repo:
-            return {"success": False, "error": "Not a git repository"}
-        
-        try:
-            result = subprocess.run(
-                ["git", "fetch", "--all"],
-                cwd=self.path,
-                capture_output=True,
-                text=True,
-                timeout=30
-            )
-            
-            if result.returncode == 0:
-                # Re-analyser le repository après fetch
-                self._analyze_repo()
-                return {"success": True, "message": "Fetch successful"}
-            else:
-                return {"success": False, "error": result.stderr.strip() or "Fetch failed"}
-                
-        except subprocess.TimeoutExpired:
-            return {"success": False, "error": "Fetch timeout (30s)"}
-        except Exception as e:
-            return {"success": False, "error": str(e)}
-    
-    def _analyze_repo(self):
-        if not os.path.exists(os.path.join(self.path, ".git")):
-            return
-            
-        self.is_git_repo = True
-        
-        # Branche actuelle
-        branch = self._run_git_command(["branch", "--show-current"])
-        if branch:
-            self.current_branch = branch
-        
-        # Dernier commit
-        commit = self._run_git_command(["log", "-1", "--format=%h - %s"])
-        if commit:
-            self.last_commit = commit[:60] + "..." if len(commit) > 60 else commit
-        
-        # Date du dernier commit
-        commit_date = self._run_git_command(["log", "-1", "--format=%cd", "--date=short"])
-        if commit_date:
-            self.last_commit_date = commit_date
-        
-        # Statut
-        status = self._run_git_command(["status", "--porcelain"])
-        if status is not None:
-            if status:
-                lines = status.split('\n')
-                modified = len([l for l in lines if l.startswith(' M')])
-                added = len([l for l in lines if l.startswith('A')])
-                untracked = len([l for l in lines if l.startswith('??')])
-                self.status = f"M:{modified} A:{added} U:{untracked}"
-            else:
-                self.status = "Clean"
-        
-        # URL remote
-        remote = self._run_git_command(["remote", "get-url", "origin"])
-        if remote:
-            self.remote_url = remote.split('/')[-1].replace('.git', '') if remote.endswith('.git') else remote
-        
-        # Commits en avance/retard
-        try:
-            ahead = self._run_git_command(["rev-list", "--count", "HEAD@{upstream}..HEAD"])
-            behind = self._run_git_command(["rev-list", "--count", "HEAD..HEAD@{upstream}"])
-            if ahead is not None and behind is not None:
-                self.ahead_behind = f"^{ahead} v{behind}"
-        except:
-            pass
+import git_profiler
+from scan_engine import ScanEngine, resolve_roots, check_roots
+from repo_export import EXPORT_FORMATS, make_writer
+from pull_executor import UPDATED, SKIPPED
+from repo_watcher import RepoWatcher
+from live_table import LiveTable
 
 class ConsoleRepoExplorer:
-    def __init__(self, root_path=None):
+    def __init__(self, root_path=None, use_daemon=True):
         self.config = ConfigManager()
-        self.root_path = root_path or self.config.get('default_repository_path')
+        # Découverte, analyse, cache et fetch : partagés avec l'interface graphique
+        self.engine = ScanEngine(self.config)
+        # root_path, sinon repository_roots, sinon default_repository_path
+        self.roots = [root for root in self.engine.roots(root_path) if os.path.isdir(root)]
         self.app_name = self.config.get('app_name', 'RepoScan')
         self.repos = []
+        self.sections = []  # [(racine, repositories)], une section par racine
+        # Daemon de scan (scan_daemon.py) : son état remplace le scan local s'il tourne
+        self.use_daemon = use_daemon
+        self.scanned_at = None
+        self.sizes_measured = False
         
-    def _find_all_git_repos(self, root_path, current_path="", max_depth=None):
-        """Trouve récursivement tous les repositories Git"""
-        repos = []
-        
-        if max_depth is None:
-            max_depth = self.config.get('max_scan_depth', 3)
+    def _find_all_git_repos(self, roots):
+        """Trouve récursivement tous les repositories Git des racines et les analyse en parallèle"""
+        multi_root = len(roots) > 1
         
-        if current_path.count(os.sep) >= max_depth:
-            return repos
-            
+        def discovered(root, repo):
+            if repo.is_git_repo:
+                location = os.path.join(root, repo.relative_path) if multi_root else repo.relative_path
+                print(f"  [+] Repository Git trouvé: {location}")
+        
+        return asyncio.run(self.engine.scan_roots(
+            roots,
+            on_discovered=discovered,
+            on_folder=lambda path: print(f"  [*] Analyse du dossier: {path}")
+        ))
+    
+    def export(self, writer):
+        """Mode non interactif : écrit chaque repository dès que son analyse est terminée"""
         try:
-            full_path = os.path.join(root_path, current_path) if current_path else root_path
-            
-            # Lister tous les éléments et les trier
-            items = sorted([item for item in os.listdir(full_path) if not item.startswith('.')])
-            
-            # Séparer les repos Git directs des dossiers à explorer
-            git_repos = []
-            folders_to_explore = []
-            
-            for item in items:
-                item_path = os.path.join(full_path, item)
-                relative_path = os.path.join(current_path, item) if current_path else item
-                
-                if os.path.isdir(item_path):
-                    if os.path.exists(os.path.join(item_path, ".git")):
-                        print(f"  [+] Repository Git trouvé: {relative_path}")
-                        repo_info = GitRepoInfo(item_path, relative_path)
-                        git_repos.append(repo_info)
-                    else:
-                        folders_to_explore.append((item, item_path, relative_path))
-            
-            # Ajouter d'abord les repos Git du niveau actuel
-            repos.extend(git_repos)
-            
-            # Puis explorer les dossiers et ajouter leurs contenus
-            for item, item_path, relative_path in folders_to_explore:
-                print(f"  [*] Analyse du dossier: {relative_path}")
-                sub_repos = self._find_all_git_repos(root_path, relative_path, max_depth)
-                
-                # Si le dossier contient des repos Git, l'ajouter comme parent
-                if sub_repos and any(repo.is_git_repo for repo in sub_repos):
-                    folder_info = GitRepoInfo(item_path, relative_path)
-                    repos.append(folder_info)  # Ajouter le parent
-                    repos.extend(sub_repos)    # Puis ses enfants
-                elif current_path.count(os.sep) < 1:  # Garder les dossiers de premier niveau même vides
-                    folder_info = GitRepoInfo(item_path, relative_path)
-                    repos.append(folder_info)
-                        
-        except Exception as e:
-            print(f"[!] Erreur lors de l'analyse de {current_path}: {str(e)}")
-            
-        return repos
+            try:
+                daemon_state = self.engine.daemon_snapshot(self.roots) if self.use_daemon else None
+                if daemon_state is not None:
+                    for _, repos in daemon_state[0]:
+                        for repo in repos:
+                            if repo.is_git_repo:
+                                writer.write(repo)
+                    return
+                asyncio.run(self.engine.stream(
+                    self.roots,
+                    writer.write,
+                    on_error=lambda path, e: print(f"[!] Erreur lors de l'analyse de {path}: {str(e)}", file=sys.stderr)
+                ))
+            finally:
+                writer.close()
+        except BrokenPipeError:
+            # Lecteur fermé (ex: `| head`) : arrêt silencieux, comme un filtre Unix. La sortie
+            # est redirigée vers /dev/null, sinon le flush final de Python échouerait à nouveau
+            os.dup2(os.open(os.devnull, os.O_WRONLY), writer.stream.fileno())
+            sys.exit(1)
     
     def _load_repositories(self):
         print(">>> Analyse récursive des repositories en cours...")
-        print("   (Scan jusqu'à 3 niveaux de profondeur)")
+        print(f"   (Scan jusqu'à {self.engine.max_depth} niveaux de profondeur)")
         
-        self.repos = self._find_all_git_repos(self.root_path)
+        daemon_state = self.engine.daemon_snapshot(self.roots) if self.use_daemon else None
+        if daemon_state is not None:
+            # Le daemon tient l'état à jour (cache, tailles, activité) : rien à scanner ici
+            self.sections, self.scanned_at = daemon_state
+            print(f"   [+] Etat fourni par le daemon de scan")
+        else:
+            self.sections = self._find_all_git_repos(self.roots)
+            self.scanned_at = datetime.now().timestamp()
+        self.repos = [repo for _, repos in self.sections for repo in repos]
+        if daemon_state is None:
+            self.engine.finish_scan(self.sections)
         
         git_repos_count = sum(1 for repo in self.repos if repo.is_git_repo)
         folder_count = len(self.repos) - git_repos_count
-        print(f"\n>>> {git_repos_count} repositories Git trouvés • {folder_count} dossiers parents")
+        roots_info = f" • {len(self.sections)} racines" if len(self.sections) > 1 else ""
+        print(f"\n>>> {git_repos_count} repositories Git trouvés • {folder_count} dossiers parents{roots_info}")
+        # Les tailles sont mesurées à part, une fois le tableau affiché (_print_sizes)
+        self.sizes_measured = daemon_state is not None
+    
+    def _print_sizes(self):
+        """Mesure les tailles (sauf si le daemon les a fournies) et les affiche sous le tableau.
+        
+        Comme dans l'interface graphique, la mesure vient après l'affichage du statut Git :
+        un premier parcours d'un gros working tree ne retarde plus le tableau.
+        """
+        if not self.engine.disk_usage:
+            return
+        git_repos = [repo for repo in self.repos if repo.is_git_repo]
+        if not git_repos:
+            return
+        if not self.sizes_measured:
+            print(f"\n>>> Mesure des tailles (working tree, .git, artefacts)...")
+            asyncio.run(self.engine.measure_disk_usage(git_repos))
+            self.sizes_measured = True
+        
+        headers = ["Repository", "Taille", ".git", "Artefacts"]
+        rows = [
+            [f"[GIT] {'  ' * repo.depth}{repo.relative_path}"[:40],
+             repo.worktree_size_label(), repo.git_size_label(), repo.artifacts_size_label()]
+            for repo in git_repos
+        ]
+        widths = [max(len(str(row[i])) for row in rows + [headers]) for i in range(len(headers))]
+        print("\n" + "="*sum(widths) + "="*len(widths)*3)
+        print("".join(f"| {header:<{widths[i]}} " for i, header in enumerate(headers)) + "|")
+        print("="*sum(widths) + "="*len(widths)*3)
+        for row in rows:
+            print("".join(f"| {str(cell):<{widths[i]}} " for i, cell in enumerate(row)) + "|")
+        print("="*sum(widths) + "="*len(widths)*3)
+        print(f"   Taille = working tree hors .git et artefacts • Artefacts = node_modules, target, dist... (dossier le plus lourd)")
     
     def _print_table(self):
         # En-têtes
@@ -200,21 +144,18 @@ class ConsoleRepoExplorer:
                 repo_name = f"📂 {indent}{repo.relative_path}"
                 row_data = [
                     repo_name,
-                    repo.current_branch,
-                    repo.status,
-                    repo.last_commit,
-                    repo.last_commit_date,
-                    repo.ahead_behind,
-                    repo.remote_url
+                    repo.branch_label(),
+                    repo.status_label(),
+                    repo.commit_label(),
+                    repo.commit_date_label(),
+                    repo.sync_label(),
+                    repo.remote_label()
                 ]
             else:
                 # Dossier parent
                 indent = "  " * repo.depth
                 repo_name = f"📁 {indent}{repo.relative_path}"
-                row_data = [
-                    repo_name,
-                    "-", "-", "-", "-", "-", "-"
-                ]
+                row_data = [repo_name] + ["-"] * (len(headers) - 1)
             
             for i, cell in enumerate(row_data):
                 if len(str(cell)) > widths[i]:
@@ -237,35 +178,39 @@ class ConsoleRepoExplorer:
         
         # Imprimer les données - Garder l'ordre hiérarchique existant
         # Ne pas trier pour préserver l'ordre parent->enfants
-        for repo in self.repos:
-            if repo.is_git_repo:
-                indent = "  " * repo.depth
-                repo_name = f"[GIT] {indent}{repo.relative_path}"[:widths[0]]
-                row_data = [
-                    repo_name,
-                    repo.current_branch[:widths[1]],
-                    repo.status[:widths[2]],
-                    repo.last_commit[:widths[3]],
-                    repo.last_commit_date[:widths[4]],
-                    repo.ahead_behind[:widths[5]],
-                    repo.remote_url[:widths[6]]
-                ]
-                # Colorier selon le statut
-                status_color = "[OK]" if repo.status == "Clean" else "[MOD]" if "M:" in repo.status else "[?]"
-                row_data[2] = f"{status_color} {row_data[2]}"
-            else:
-                indent = "  " * repo.depth
-                repo_name = f"[DIR] {indent}{repo.relative_path}"[:widths[0]]
-                row_data = [
-                    repo_name,
-                    "-", "-", "-", "-", "-", "-"
-                ]
+        for root, repos in self.sections:
+            if len(self.sections) > 1:
+                # Une section par racine
+                git_count = sum(1 for repo in repos if repo.is_git_repo)
+                section = f"[ROOT] {root} ({git_count} repositories Git)"
+                section_width = sum(widths) + len(widths) * 3 - 3
+                print(f"| {section[:section_width]:<{section_width}} |")
+            for repo in repos:
+                if repo.is_git_repo:
+                    indent = "  " * repo.depth
+                    repo_name = f"[GIT] {indent}{repo.relative_path}"[:widths[0]]
+                    row_data = [
+                        repo_name,
+                        repo.branch_label()[:widths[1]],
+                        repo.status_label()[:widths[2]],
+                        repo.commit_label()[:widths[3]],
+                        repo.commit_date_label()[:widths[4]],
+                        repo.sync_label()[:widths[5]],
+                        repo.remote_label()[:widths[6]]
+                    ]
+                    # Colorier selon le statut
+                    status_color = "[OK]" if repo.is_clean else "[MOD]" if repo.is_modified else "[?]"
+                    row_data[2] = f"{status_color} {row_data[2]}"
+                else:
+                    indent = "  " * repo.depth
+                    repo_name = f"[DIR] {indent}{repo.relative_path}"[:widths[0]]
+                    row_data = [repo_name] + ["-"] * (len(headers) - 1)
             
-            row_line = ""
-            for i, cell in enumerate(row_data):
-                row_line += f"| {str(cell):<{widths[i]}} "
-            row_line += "|"
-            print(row_line)
+                row_line = ""
+                for i, cell in enumerate(row_data):
+                    row_line += f"| {str(cell):<{widths[i]}} "
+                row_line += "|"
+                print(row_line)
         
         print("="*sum(widths) + "="*len(widths)*3)
         
@@ -279,6 +224,7 @@ class ConsoleRepoExplorer:
         print(f"="*80)
         
         print(f"\n>>> STRUCTURE HIERARCHIQUE:")
+        print(f"   [ROOT] Racine scannee (si plusieurs repository_roots sont configurees)")
         print(f"   [DIR] Dossier parent (contient des repositories)")
         print(f"   [GIT] Repository Git")
         print(f"   [GIT]     Repository Git imbrique (indente = dans un sous-dossier)")
@@ -291,6 +237,7 @@ class ConsoleRepoExplorer:
         print(f"                      • M:X = X fichiers modifies")
         print(f"                      • A:X = X fichiers ajoutes (staged)")
         print(f"                      • U:X = X fichiers non trackes")
+        print(f"                      • D:X / R:X / C:X = supprimes / renommes / en conflit (si > 0)")
         print(f"   Last Commit      → Hash et message du dernier commit")
         print(f"   Date             → Date du dernier commit")
         print(f"   Sync             → Synchronisation avec origin:")
@@ -312,33 +259,48 @@ class ConsoleRepoExplorer:
         print(f"\n" + "="*80)
     
     def run(self):
-        print(f"*** {self.app_name} ***")
-        print("=" * 60)
-        
-        self._load_repositories()
-        self._print_table()
-        
-        print(f"\n*** Derniere analyse: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')} ***")
-        
-        # Option pour ouvrir un dossier - seulement si c'est interactif
-        if sys.stdin.isatty():
-            print(f"\n>>> Actions disponibles:")
-            print(f"    Tapez le nom d'un repository pour l'ouvrir dans l'explorateur")
-            print(f"    Tapez 'fetch' pour synchroniser tous les repositories")
-            print(f"    Tapez 'q' pour quitter")
+        try:
+            print(f"*** {self.app_name} ***")
+            print("=" * 60)
+            
+            self._load_repositories()
+            self._print_table()
+            self._print_sizes()
+            
+            scanned_at = datetime.fromtimestamp(self.scanned_at) if self.scanned_at else datetime.now()
+            print(f"\n*** Derniere analyse: {scanned_at.strftime('%Y-%m-%d %H:%M:%S')} ***")
             
-            while True:
-                try:
-                    user_input = input(f"\n> ").strip()
-                    if user_input.lower() == 'q':
+            # Option pour ouvrir un dossier - seulement si c'est interactif
+            if sys.stdin.isatty():
+                print(f"\n>>> Actions disponibles:")
+                print(f"    Tapez le nom d'un repository pour l'ouvrir dans l'explorateur")
+                print(f"    Tapez 'fetch' pour synchroniser tous les repositories")
+                print(f"    Tapez 'pull' pour avancer (fast-forward) les repositories en retard")
+                print(f"    Tapez 'log <nom>' pour voir les derniers commits d'un repository")
+                print(f"    Tapez 'actif [jours]' pour voir les repositories les plus actifs (7 jours par defaut)")
+                print(f"    Tapez 'q' pour quitter")
+            
+                while True:
+                    try:
+                        user_input = input(f"\n> ").strip()
+                        if user_input.lower() == 'q':
+                            break
+                        elif user_input.lower() == 'fetch':
+                            self._fetch_all_repositories()
+                        elif user_input.lower() == 'pull':
+                            self._pull_all_repositories()
+                        elif user_input.lower().startswith('log '):
+                            self._show_recent_commits(user_input[4:].strip())
+                        elif user_input.lower() == 'actif' or user_input.lower().startswith('actif '):
+                            days = user_input[5:].strip()
+                            self._show_activity(int(days) if days.isdigit() and int(days) > 0 else 7)
+                        elif user_input:
+                            self._open_repository(user_input)
+                    except (KeyboardInterrupt, EOFError):
+                        print(f"\n\n*** Au revoir ! ***")
                         break
-                    elif user_input.lower() == 'fetch':
-                        self._fetch_all_repositories()
-                    elif user_input:
-                        self._open_repository(user_input)
-                except (KeyboardInterrupt, EOFError):
-                    print(f"\n\n*** Au revoir ! ***")
-                    break
+        finally:
+            self.engine.close()
     
     def _open_repository(self, search_term):
         """Ouvre un repository dans l'explorateur de fichiers"""
@@ -392,6 +354,252 @@ class ConsoleRepoExplorer:
                 
             print(f"[!] Soyez plus precis dans votre recherche")
     
+    def _show_recent_commits(self, search_term):
+        """Affiche les derniers commits d'un repository (session cat-file réutilisée d'un appel à l'autre)"""
+        matches = [repo for repo in self.repos
+                   if repo.is_git_repo and search_term.lower() in repo.relative_path.lower()]
+        if len(matches) != 1:
+            print(f"[!] Aucun repository Git trouve contenant '{search_term}'" if not matches
+                  else f"[?] {len(matches)} repositories correspondent, soyez plus precis")
+            return
+        
+        repo = matches[0]
+        commits = asyncio.run(self.engine.recent_commits(repo))
+        if not commits:
+            print(f"[!] Aucun commit lisible dans {repo.relative_path}")
+            return
+        print(f"\n>>> Derniers commits de {repo.relative_path} ({repo.current_branch or 'HEAD detache'}):")
+        for commit in commits:
+            date = datetime.fromtimestamp(commit.timestamp).strftime('%Y-%m-%d %H:%M')
+            print(f"   {commit.short_hash}  {date}  {commit.subject}")
+    
+    def run_activity(self, days):
+        """Mode --activity : scan, mise à jour de l'index d'activité, classement, puis sortie"""
+        try:
+            self._load_repositories()
+            self._show_activity(days)
+        finally:
+            self.engine.close()
+    
+    def run_watch(self, interval):
+        """Mode --watch : tableau tenu à jour sur place, jusqu'à Ctrl+C"""
+        if not sys.stdout.isatty():
+            print(f"[!] --watch necessite un terminal (utilisez --format pour les scripts)")
+            sys.exit(1)
+        self._load_repositories()
+        try:
+            asyncio.run(self._watch(interval))
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self.engine.save_cache()
+            self.engine.close()
+        print(f"*** Surveillance arretee ***")
+    
+    def _replace_repos(self, fresh_repos):
+        """Remplace, par chemin, les repositories ré-analysés dans la liste et les sections"""
+        fresh_by_path = {repo.path: repo for repo in fresh_repos}
+        self.repos = [fresh_by_path.get(repo.path, repo) for repo in self.repos]
+        self.sections = [(root, [fresh_by_path.get(repo.path, repo) for repo in repos]) for root, repos in self.sections]
+    
+    def _watch_cells(self, repo):
+        """Cellules d'une ligne du mode --watch (mêmes colonnes que le tableau)"""
+        status_color = "[OK]" if repo.is_clean else "[MOD]" if repo.is_modified else "[?]"
+        cells = [
+            f"[GIT] {'  ' * repo.depth}{repo.relative_path}",
+            repo.branch_label(),
+            f"{status_color} {repo.status_label()}",
+            repo.commit_label(),
+            repo.commit_date_label(),
+            repo.sync_label(),
+            repo.remote_label(),
+        ]
+        if self.engine.disk_usage:
+            cells += [repo.worktree_size_label(), repo.git_size_label(), repo.artifacts_size_label()]
+        return cells
+    
+    async def _watch(self, interval):
+        """Ré-analyse les repositories signalés (daemon ou watcher) et redessine leurs lignes.
+        
+        Le watcher ne voit que le dossier .git (HEAD, index, refs) : une modification
+        du working tree n'y apparaît pas. Toutes les `interval` secondes, un tour
+        périodique revérifie donc `watch_sweep_repos` repositories, à tour de rôle ;
+        seules les lignes dont une valeur a changé sont redessinées.
+        """
+        loop = asyncio.get_running_loop()
+        wake = asyncio.Event()
+        pending = set()        # Chemins signalés par le watcher depuis le dernier passage
+        daemon_events = []     # Événements du daemon depuis le dernier passage
+        last = {'count': 0, 'duration': 0.0, 'at': datetime.now()}
+        watcher = None
+        sweep_size = max(0, self.config.get('watch_sweep_repos', 20))
+        sweep_offset = 0
+        
+        def signal_paths(paths):
+            pending.update(paths)
+            wake.set()
+        
+        def signal_event(message):
+            daemon_events.append(message)
+            wake.set()
+        
+        def start_watcher():
+            # interval : période du backend polling (montages réseau, WSL, limite inotify)
+            watcher = RepoWatcher(
+                lambda paths: loop.call_soon_threadsafe(signal_paths, paths),
+                self.config.get('watch_backend', 'auto'),
+                self.config.get('watch_debounce_ms', 500) / 1000,
+                interval,
+            )
+            watcher.watch(repo.path for repo in self.repos if repo.is_git_repo)
+            return watcher
+        
+        # Rattaché au daemon : il ré-analyse lui-même et envoie les lignes modifiées
+        attached = None
+        if self.use_daemon and self.engine.daemon:
+            attached = self.engine.daemon.attach(
+                self.roots, lambda message: loop.call_soon_threadsafe(signal_event, message)
+            )
+        link = None
+        if attached:
+            snapshot, link = attached
+            self.sections = self.engine.sections_from_snapshot(snapshot)
+            self.repos = [repo for _, repos in self.sections for repo in repos]
+        else:
+            watcher = start_watcher()
+        
+        headers = ["Repository", "Branche", "Statut", "Last Commit", "Date", "Sync", "Remote"]
+        if self.engine.disk_usage:
+            headers += ["Taille", ".git", "Artefacts"]
+        
+        def summary(shown):
+            git_repos = [repo for repo in self.repos if repo.is_git_repo]
+            clean = sum(1 for repo in git_repos if repo.is_clean)
+            source = "daemon" if link else f"watcher, polling {interval:g}s"
+            hidden = f" ({len(git_repos) - shown} hors ecran)" if shown < len(git_repos) else ""
+            # Durée inconnue quand la ré-analyse a été faite par le daemon
+            timing = f" en {last['duration'] * 1000:.0f} ms" if last['duration'] is not None else ""
+            return (
+                f">>> {len(git_repos)} repos ({clean}[OK] {len(git_repos) - clean}[MOD]){hidden} | {source} | "
+                f"Maj {last['at'].strftime('%H:%M:%S')}: {last['count']} re-analyses{timing} | "
+                f"Ctrl+C pour quitter"
+            )
+        
+        # Tailles mesurées en tâche de fond après le premier affichage (le daemon les fournit déjà)
+        measured = []
+        stopped = False
+        
+        def signal_measured(repo):
+            measured.append(repo)
+            wake.set()
+        
+        sizing = None
+        
+        try:
+            with LiveTable(headers, {0: 40, 2: 20, 3: 50, 6: 25}) as table:
+                if self.engine.disk_usage and not self.sizes_measured and not link:
+                    sizing = asyncio.create_task(self.engine.measure_disk_usage(
+                        [repo for repo in self.repos if repo.is_git_repo], signal_measured, lambda: stopped
+                    ))
+                terminal_size = None
+                dirty = True
+                sweep = False
+                next_sweep = loop.time() + interval
+                while True:
+                    events, daemon_events[:] = list(daemon_events), []
+                    for message in events:
+                        event = message.get("event")
+                        if event == "snapshot":
+                            self.sections = self.engine.sections_from_snapshot(message)
+                            self.repos = [repo for _, repos in self.sections for repo in repos]
+                        elif event == "repos":
+                            fresh = [self.engine.repo_from_state(state) for state in message["repos"]]
+                            self._replace_repos(fresh)
+                            last.update(count=len(fresh), duration=None, at=datetime.now())
+                        elif event == "closed" and link:
+                            # Daemon arrêté : surveillance locale
+                            link = None
+                            watcher = start_watcher()
+                        dirty = True
+                    
+                    if measured:
+                        measured.clear()
+                        dirty = True
+                    
+                    repo_by_path = {repo.path: repo for repo in self.repos}
+                    targets = [repo_by_path[path] for path in pending if path in repo_by_path]
+                    pending.clear()
+                    if sweep:
+                        # Tour périodique : repositories suivants, hors ceux déjà signalés
+                        git_repos = [repo for repo in self.repos if repo.is_git_repo]
+                        batch = [git_repos[(sweep_offset + i) % len(git_repos)]
+                                 for i in range(min(sweep_size, len(git_repos)))]
+                        sweep_offset = (sweep_offset + len(batch)) % max(1, len(git_repos))
+                        signalled = {repo.path for repo in targets}
+                        targets += [repo for repo in batch if repo.path not in signalled]
+                        sweep = False
+                    
+                    if targets:
+                        start = time.perf_counter()
+                        pairs = await self.engine.reanalyze(targets)
+                        # Les repositories inchangés (cas courant du tour périodique) ne comptent pas
+                        fresh = [new for old, new in pairs if self._watch_cells(old) != self._watch_cells(new)]
+                        if fresh:
+                            if self.engine.disk_usage:
+                                await self.engine.measure_disk_usage(fresh)
+                            self._replace_repos(fresh)
+                            last.update(count=len(fresh), duration=time.perf_counter() - start, at=datetime.now())
+                            dirty = True
+                    
+                    if dirty or tuple(shutil.get_terminal_size()) != terminal_size:
+                        rows = [(repo.path, self._watch_cells(repo)) for repo in self.repos if repo.is_git_repo]
+                        table.render(rows, summary)
+                        terminal_size = tuple(shutil.get_terminal_size())
+                        dirty = False
+                    
+                    # Échéance fixe : une rafale d'événements ne repousse pas le tour périodique
+                    wake.clear()
+                    try:
+                        await asyncio.wait_for(wake.wait(), max(0.0, next_sweep - loop.time()))
+                    except asyncio.TimeoutError:
+                        pass
+                    if loop.time() >= next_sweep:
+                        sweep = sweep_size > 0
+                        next_sweep = loop.time() + interval
+        finally:
+            stopped = True
+            if sizing:
+                sizing.cancel()
+            if link:
+                link.close()
+            if watcher:
+                watcher.stop()
+    
+    def _show_activity(self, days=7):
+        """Met à jour l'index d'activité (nouveaux commits seulement) et affiche les plus actifs"""
+        if not self.engine.activity:
+            print(f"[!] Index d'activite desactive (activity_index dans config.json)")
+            return
+        
+        git_repos = [repo for repo in self.repos if repo.is_git_repo]
+        added, rewritten = asyncio.run(self.engine.index_activity(git_repos))
+        rewritten_text = f", {rewritten} historiques reecrits re-indexes" if rewritten else ""
+        print(f"\n>>> Index d'activite a jour: {added} nouveaux commits{rewritten_text}")
+        
+        # L'index peut contenir d'autres racines : seuls les repositories affichés comptent
+        repo_by_path = {repo.path: repo for repo in git_repos}
+        ranking = [(path, count) for path, count in self.engine.activity.most_active(days, len(git_repos))
+                   if path in repo_by_path][:20]
+        if not ranking:
+            print(f"[i] Aucun commit ces {days} derniers jours")
+            return
+        
+        sparklines = self.engine.activity_sparklines()
+        spark_days = self.config.get('activity_sparkline_days', 14)
+        print(f"\n>>> Repositories les plus actifs ({days} derniers jours, tendance sur {spark_days} jours):")
+        for path, count in ranking:
+            print(f"   {count:>5} commits  {sparklines.get(path, '')}  {repo_by_path[path].relative_path}")
+    
     def _fetch_all_repositories(self):
         """Effectue un fetch sur tous les repositories Git"""
         git_repos = [repo for repo in self.repos if repo.is_git_repo]
@@ -404,29 +612,36 @@ class ConsoleRepoExplorer:
         print(f">>> FETCH ALL REPOSITORIES")
         print(f"="*80)
         print(f"\nSynchronisation de {len(git_repos)} repositories avec origin...")
-        print(f"Timeout: 30s par repository | Appuyez sur Ctrl+C pour annuler\n")
-        
-        success_count = 0
-        error_count = 0
+        fetch_executor = self.engine.fetch_executor()
+        print(
+            f"Timeout: {fetch_executor.timeout}s par repository | "
+            f"{fetch_executor.concurrency} en parallele ({fetch_executor.per_host} max par hote) | "
+            f"Appuyez sur Ctrl+C pour annuler\n"
+        )
+        
+        counters = {'done': 0, 'success': 0, 'error': 0}
+        
+        def on_result(result):
+            # Les résultats sont affichés dans l'ordre où les fetchs se terminent
+            counters['done'] += 1
+            prefix = f"[{counters['done']:2d}/{len(git_repos)}] Fetch: {result.repo.relative_path:<40} "
+            if result.success:
+                counters['success'] += 1
+                print(f"{prefix}[+] OK ({result.duration:.1f}s)", flush=True)
+            else:
+                counters['error'] += 1
+                print(f"{prefix}[!] ERREUR: {result.error}", flush=True)
         
         try:
-            for i, repo in enumerate(git_repos, 1):
-                print(f"[{i:2d}/{len(git_repos)}] Fetch: {repo.relative_path:<40} ", end="", flush=True)
-                
-                result = repo.fetch_from_remote()
-                
-                if result['success']:
-                    success_count += 1
-                    print("[+] OK")
-                else:
-                    error_count += 1
-                    print(f"[!] ERREUR: {result['error']}")
-                    
+            asyncio.run(self.engine.fetch_all(git_repos, on_result, executor=fetch_executor))
         except KeyboardInterrupt:
             print(f"\n\n[!] Fetch annule par l'utilisateur")
-            print(f">>> Repositories traites: {success_count + error_count}/{len(git_repos)}")
+            print(f">>> Repositories traites: {counters['done']}/{len(git_repos)}")
             return
         
+        success_count = counters['success']
+        error_count = counters['error']
+        
         print(f"\n" + "="*80)
         print(f">>> FETCH TERMINE")
         print(f"="*80)
@@ -436,12 +651,69 @@ class ConsoleRepoExplorer:
         
         if success_count > 0:
             print(f"\n[+] Actualisation de l'affichage...")
-            # Re-charger les données pour mettre à jour les informations de sync
-            self._load_repositories()
+            # Les repositories fetchés ont déjà recalculé leurs infos de sync : pas de re-scan
             self._print_table()
             print(f"\n[+] Interface mise a jour avec les dernieres donnees!")
         
         print(f"\n" + "="*80)
+    
+    def _pull_all_repositories(self):
+        """Avance (fast-forward uniquement) les repositories Git en retard sur leur upstream"""
+        git_repos = [repo for repo in self.repos if repo.is_git_repo]
+        
+        if not git_repos:
+            print(f"[!] Aucun repository Git trouve pour le pull")
+            return
+            
+        print(f"\n" + "="*80)
+        print(f">>> PULL ALL REPOSITORIES (fast-forward)")
+        print(f"="*80)
+        pull_executor = self.engine.pull_executor()
+        print(
+            f"\nIntegration des commits deja fetches dans {len(git_repos)} repositories...\n"
+            f"Ignores: modifications locales, HEAD detache, sans upstream, diverges, a jour\n"
+            f"Timeout: {pull_executor.timeout}s par repository | "
+            f"{pull_executor.concurrency} en parallele | "
+            f"Appuyez sur Ctrl+C pour annuler\n"
+        )
+        
+        counters = {'done': 0, 'updated': 0, 'skipped': 0, 'error': 0}
+        
+        def on_result(result):
+            # Ignorés puis mis à jour, dans l'ordre où les vérifications et les pulls se terminent
+            counters['done'] += 1
+            prefix = f"[{counters['done']:2d}/{len(git_repos)}] Pull: {result.repo.relative_path:<40} "
+            if result.outcome == UPDATED:
+                counters['updated'] += 1
+                print(f"{prefix}[+] {result.message} ({result.duration:.1f}s)", flush=True)
+            elif result.outcome == SKIPPED:
+                counters['skipped'] += 1
+                print(f"{prefix}[-] ignore: {result.message}", flush=True)
+            else:
+                counters['error'] += 1
+                print(f"{prefix}[!] ERREUR: {result.message}", flush=True)
+        
+        try:
+            asyncio.run(self.engine.pull_all(git_repos, on_result, executor=pull_executor))
+        except KeyboardInterrupt:
+            print(f"\n\n[!] Pull annule par l'utilisateur")
+            print(f">>> Repositories traites: {counters['done']}/{len(git_repos)}")
+            return
+        
+        print(f"\n" + "="*80)
+        print(f">>> PULL TERMINE")
+        print(f"="*80)
+        print(f"Mis a jour: {counters['updated']}")
+        print(f"Ignores: {counters['skipped']}")
+        print(f"Erreurs: {counters['error']}")
+        print(f"Total: {len(git_repos)} repositories")
+        
+        if counters['updated'] > 0:
+            print(f"\n[+] Actualisation de l'affichage...")
+            # Les repositories mis à jour ont déjà recalculé leurs infos de sync : pas de re-scan
+            self._print_table()
+        
+        print(f"\n" + "="*80)
 
 def main():
     # Parse des arguments de ligne de commande
@@ -453,6 +725,10 @@ Exemples d'utilisation:
   python3 console_repo_explorer.py                   # Utilise le chemin configuré
   python3 console_repo_explorer.py /path/to/repos    # Utilise un chemin spécifique
   python3 console_repo_explorer.py --config          # Affiche la configuration actuelle
+  python3 console_repo_explorer.py --format ndjson   # Un objet JSON par repository (scripts, cron)
+  python3 console_repo_explorer.py --activity 30     # Repositories les plus actifs sur 30 jours
+  python3 console_repo_explorer.py --watch           # Tableau tenu à jour en continu (Ctrl+C pour quitter)
+  python3 console_repo_explorer.py --profile --profile-trace trace.json  # Mesure les commandes git
         """
     )
     
@@ -468,7 +744,60 @@ Exemples d'utilisation:
         help='Affiche la configuration actuelle et quitte'
     )
     
+    parser.add_argument(
+        '--format',
+        choices=EXPORT_FORMATS,
+        help="Écrit un enregistrement par repository sur stdout, dès la fin de son analyse, puis quitte"
+    )
+    
+    parser.add_argument(
+        '--activity',
+        nargs='?',
+        const=7,
+        type=int,
+        metavar='JOURS',
+        help="Affiche les repositories les plus actifs (7 derniers jours par défaut) et quitte"
+    )
+    
+    parser.add_argument(
+        '--watch',
+        nargs='?',
+        const=2.0,
+        type=float,
+        metavar='SECONDES',
+        help="Tableau tenu à jour sur place : seuls les repositories modifiés sont ré-analysés et redessinés (2 s par défaut)"
+    )
+    
+    parser.add_argument(
+        '--no-daemon',
+        action='store_true',
+        help="Scanne localement même si un daemon de scan (scan_daemon.py) est en cours"
+    )
+    
+    parser.add_argument(
+        '--profile',
+        action='store_true',
+        help='Mesure chaque commande git et affiche un rapport (durées par commande et par repository) en quittant'
+    )
+    
+    parser.add_argument(
+        '--profile-trace',
+        metavar='FICHIER',
+        help='Écrit les commandes git mesurées au format Chrome trace event (chrome://tracing, Perfetto)'
+    )
+    
     args = parser.parse_args()
+    git_profiler.enable_cli_report(args.profile, args.profile_trace)
+    
+    if args.format:
+        # stdout est réservé aux enregistrements : tout autre message part sur stderr
+        output = sys.stdout
+        with contextlib.redirect_stdout(sys.stderr):
+            config = ConfigManager()
+            if not check_roots(resolve_roots(config, args.path)):
+                sys.exit(1)
+            ConsoleRepoExplorer(args.path, not args.no_daemon).export(make_writer(args.format, output))
+        return
     
     # Gérer l'option --config
     if args.config:
@@ -478,13 +807,11 @@ Exemples d'utilisation:
         print(f"\nFichier de configuration: {os.path.abspath(config.config_file)}")
         return
     
-    # Déterminer le chemin à utiliser
+    # Déterminer les racines à utiliser (argument, repository_roots ou default_repository_path)
     config = ConfigManager()
-    root_path = args.path or config.get('default_repository_path')
+    roots = check_roots(resolve_roots(config, args.path))
     
-    # Vérifier que le chemin existe
-    if not os.path.exists(root_path):
-        print(f"❌ Erreur: Le chemin '{root_path}' n'existe pas.")
+    if not roots:
         print(f"\nSolutions:")
         print(f"• Vérifiez le chemin dans le fichier config.json")
         print(f"• Utilisez: python3 {sys.argv[0]} /chemin/vers/vos/repos")
@@ -492,10 +819,18 @@ Exemples d'utilisation:
         sys.exit(1)
     
     print(f"🚀 Lancement de {config.get('app_name', 'RepoScan')} (Console)")
-    print(f"📁 Dossier à explorer: {root_path}")
+    for root in roots:
+        print(f"📁 Dossier à explorer: {root}")
     
-    explorer = ConsoleRepoExplorer(root_path)
-    explorer.run()
+    explorer = ConsoleRepoExplorer(args.path, not args.no_daemon)
+    if args.watch is not None:
+        # --watch 0 (ou négatif) : intervalle minimal plutôt que le mode interactif
+        explorer.run_watch(max(0.5, args.watch))
+    elif args.activity is not None:
+        # --activity 0 : au moins la journée en cours plutôt que le mode interactif
+        explorer.run_activity(max(1, args.activity))
+    else:
+        explorer.run()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+"""
+RepoScan - Connexion au daemon de scan (voir scan_daemon.py).
+
+Protocole : une requête JSON par ligne sur une socket UNIX, réponses et
+événements JSON, un par ligne (UTF-8).
+
+- {"op": "snapshot", "roots": [...]} : une ligne d'état complet, puis fermeture
+- {"op": "attach", "roots": [...]}   : l'état complet, puis les événements au fil de l'eau
+- {"op": "rescan"}                   : relance un scan complet (résultat via les événements)
+- {"op": "status"} / {"op": "stop"}
+
+État complet : {"event": "snapshot", "version", "scanned_at", "roots",
+"sections": [[racine, [état de repository...]]]}, chaque état étant produit par
+RepoRecord.to_state. Événements : "snapshot" (nouveau scan complet), "repos"
+(repositories ré-analysés ou mesurés) et "activity" (index d'activité à jour).
+Une erreur est une ligne {"error": "..."}, par exemple si le daemon ne scanne
+pas les racines demandées ou n'a pas terminé son premier scan : l'interface
+scanne alors elle-même.
+"""
+
+import json
+import os
+import socket
+import threading
+from typing import Callable
+
+
+SOCKET_NAME = "reposcan.sock"
+
+# Une ligne d'état complet peut peser plusieurs Mo : lecture par blocs
+_READ_SIZE = 1 << 16
+
+
+def is_supported() -> bool:
+    """Les sockets UNIX (et start_unix_server) ne sont disponibles que sous POSIX."""
+    return os.name == 'posix' and hasattr(socket, 'AF_UNIX')
+
+
+def socket_path_for_config(config) -> str:
+    """`daemon_socket`, ou reposcan.sock à côté de config.json."""
+    path = config.get('daemon_socket')
+    if path:
+        return os.path.abspath(os.path.expanduser(path))
+    return os.path.join(os.path.dirname(os.path.abspath(config.config_file)), SOCKET_NAME)
+
+
+def encode(message: dict) -> bytes:
+    return (json.dumps(message, ensure_ascii=False, separators=(',', ':')) + "\n").encode('utf-8')
+
+
+class DaemonLink:
+    """Connexion "attach" : les événements du daemon sont lus dans un thread de fond.
+
+    on_event(message) est appelé depuis ce thread, puis on_event({"event": "closed"})
+    quand la connexion se termine (daemon arrêté, ou close()). Rien n'est lu avant
+    start() : les événements attendent dans la socket.
+    """
+
+    def __init__(self, sock: socket.socket, buffer: bytes, on_event: Callable[[dict], None]):
+        self._sock = sock
+        self._buffer = buffer
+        self._on_event = on_event
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name="daemon-link", daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def _run(self):
+        self._sock.settimeout(None)
+        try:
+            for message in _iter_messages(self._sock, self._buffer):
+                self._on_event(message)
+        except (OSError, ValueError):
+            pass
+        finally:
+            if not self._closed:
+                self._on_event({"event": "closed"})
+            self._sock.close()
+
+    def send(self, message: dict) -> bool:
+        try:
+            self._sock.sendall(encode(message))
+            return True
+        except OSError:
+            return False
+
+    def close(self):
+        self._closed = True
+        if not self._thread.is_alive() and self._thread.ident is None:
+            self._sock.close()  # Jamais démarré : pas de thread pour fermer la socket
+            return
+        try:
+            self._sock.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+
+
+def _iter_messages(sock: socket.socket, buffer: bytes = b""):
+    """Messages JSON reçus, un par ligne, jusqu'à la fermeture de la connexion."""
+    while True:
+        while b"\n" in buffer:
+            line, buffer = buffer.split(b"\n", 1)
+            if line:
+                yield json.loads(line)
+        chunk = sock.recv(_READ_SIZE)
+        if not chunk:
+            return
+        buffer += chunk
+
+
+def _read_message(sock: socket.socket, buffer: bytes = b"") -> tuple[dict | None, bytes]:
+    """Première ligne reçue et ce qui la suit déjà dans le tampon. (None, b"") si la connexion se ferme."""
+    while b"\n" not in buffer:
+        chunk = sock.recv(_READ_SIZE)
+        if not chunk:
+            return None, b""
+        buffer += chunk
+    line, buffer = buffer.split(b"\n", 1)
+    return json.loads(line), buffer
+
+
+class DaemonClient:
+    """Requêtes vers le daemon ; chaque méthode retourne None si aucun daemon ne répond."""
+
+    def __init__(self, socket_path: str, timeout: float = 5):
+        self.socket_path = socket_path
+        self.timeout = timeout
+
+    @classmethod
+    def for_config(cls, config) -> "DaemonClient | None":
+        """Client configuré, ou None si le daemon est désactivé ou non supporté."""
+        if not config.get('daemon_enabled', True) or not is_supported():
+            return None
+        return cls(socket_path_for_config(config), config.get('daemon_timeout_seconds', 5))
+
+    def _connect(self) -> socket.socket | None:
+        if not os.path.exists(self.socket_path):
+            return None  # Cas courant (pas de daemon) : pas de tentative de connexion
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.settimeout(self.timeout)
+        try:
+            sock.connect(self.socket_path)
+        except OSError:
+            sock.close()  # Socket restée d'un daemon arrêté brutalement
+            return None
+        return sock
+
+    def request(self, message: dict) -> dict | None:
+        """Envoie une requête et retourne la première ligne de réponse."""
+        sock = self._connect()
+        if sock is None:
+            return None
+        try:
+            sock.sendall(encode(message))
+            return _read_message(sock)[0]
+        except (OSError, ValueError):
+            return None
+        finally:
+            sock.close()
+
+    def snapshot(self, roots: list[str]) -> dict | None:
+        """État complet des racines, ou None (pas de daemon, ou autres racines)."""
+        reply = self.request({"op": "snapshot", "roots": roots})
+        return reply if reply and reply.get("event") == "snapshot" else None
+
+    def attach(self, roots: list[str], on_event: Callable[[dict], None], start: bool = True) -> tuple[dict, DaemonLink] | None:
+        """État complet, puis événements via on_event (voir DaemonLink). None sans daemon utilisable.
+
+        Appel bloquant (jusqu'à `timeout`) : hors du thread d'une interface graphique.
+        start=False : le lien n'est démarré qu'une fois l'état complet affiché (DaemonLink.start).
+        """
+        sock = self._connect()
+        if sock is None:
+            return None
+        try:
+            sock.sendall(encode({"op": "attach", "roots": roots}))
+            snapshot, buffer = _read_message(sock)
+        except (OSError, ValueError):
+            sock.close()
+            return None
+        if not snapshot or snapshot.get("event") != "snapshot":
+            sock.close()
+            return None
+        link = DaemonLink(sock, buffer, on_event)
+        if start:
+            link.start()
+        return snapshot, link
@@ -0,0 +1,352 @@
+#!/usr/bin/env python3
+"""
+RepoScan - Taille des repositories : working tree, .git et dossiers d'artefacts.
+
+Les arborescences sont parcourues avec os.scandir par un pool de threads (les
+appels système relâchent le GIL). Une tâche parcourt sa branche elle-même, et
+confie des sous-dossiers à d'autres threads tant qu'il y en a de libres : une
+grosse arborescence unique est parallélisée comme une flotte de petites.
+
+Chaque dossier est mis en cache avec son mtime : taille des fichiers qu'il
+contient directement et liste de ses sous-dossiers. Tant que le mtime n'a pas
+changé, on ne relit pas son contenu ; une nouvelle mesure ne coûte alors qu'un
+stat par dossier, au lieu d'un stat par fichier. Le cache est une base SQLite
+(`config/disk_usage.sqlite3`) : une mesure ne lit que les dossiers des
+repositories mesurés, et n'écrit que ceux qui ont changé.
+
+Limite : le mtime d'un dossier change quand une entrée est ajoutée, supprimée
+ou renommée, pas quand un fichier existant grossit sur place. La plupart des
+écritures de git, des outils de build et des éditeurs (écriture puis
+renommage) sont vues ; une réécriture en place ne l'est qu'à la création ou
+suppression suivante dans le même dossier.
+"""
+
+import json
+import os
+import sqlite3
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable
+
+
+SCHEMA_VERSION = 1
+
+# Dossiers d'artefacts de build / dépendances, reconnus à toute profondeur du working tree
+ARTIFACT_DIRS = ("node_modules", "target", "dist", ".next", "vendor")
+
+# Catégories de taille (les artefacts sont comptés sous leur nom de dossier)
+_WORKTREE = ""
+_GIT = ".git"
+
+
+def _disk_bytes(st: os.stat_result) -> int:
+    """Espace disque occupé (comme du), ou taille apparente sans st_blocks (Windows)."""
+    blocks = getattr(st, "st_blocks", None)
+    return blocks * 512 if blocks is not None else st.st_size
+
+
+def format_size(size: int) -> str:
+    """Taille lisible : 512 o, 12 Ko, 3.4 Mo, 1.2 Go..."""
+    value = float(size)
+    for unit in ("o", "Ko", "Mo", "Go"):
+        if value < 1024:
+            return f"{value:.0f} {unit}" if unit == "o" or value >= 100 else f"{value:.1f} {unit}"
+        value /= 1024
+    return f"{value:.1f} To"
+
+
+class DiskUsage:
+    """Taille d'un repository, en octets, par catégorie (sans double comptage)."""
+
+    __slots__ = ("worktree", "git", "artifacts", "artifact_dirs")
+
+    def __init__(self):
+        self.worktree = 0                         # Fichiers suivis ou non, hors .git et artefacts
+        self.git = 0                              # Dossier .git
+        self.artifacts = 0                        # Total des dossiers d'artefacts
+        self.artifact_dirs: dict[str, int] = {}   # Nom du dossier d'artefacts -> taille cumulée
+
+    @property
+    def total(self) -> int:
+        return self.worktree + self.git + self.artifacts
+
+    def add(self, category: str, size: int):
+        if category == _WORKTREE:
+            self.worktree += size
+        elif category == _GIT:
+            self.git += size
+        else:
+            self.artifacts += size
+            self.artifact_dirs[category] = self.artifact_dirs.get(category, 0) + size
+
+    def to_dict(self) -> dict:
+        return {"worktree": self.worktree, "git": self.git, "artifact_dirs": self.artifact_dirs}
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "DiskUsage":
+        usage = cls()
+        usage.worktree = int(data.get("worktree", 0))
+        usage.git = int(data.get("git", 0))
+        for name, size in data.get("artifact_dirs", {}).items():
+            usage.add(name, int(size))
+        return usage
+
+
+class DiskUsageCache:
+    """Cache SQLite des dossiers mesurés : (repository, chemin relatif) -> mtime_ns, octets, sous-dossiers, repo.
+
+    En mémoire, un dossier est une liste [mtime_ns, octets, sous-dossiers, contient .git].
+    Partagé entre les threads de mesure (accès sérialisés).
+    """
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        # Une transaction par repository mesuré : WAL évite une synchronisation disque complète à chacune
+        self._conn.execute("PRAGMA journal_mode = WAL")
+        self._conn.execute("PRAGMA synchronous = NORMAL")
+        self._init_schema()
+
+    @classmethod
+    def for_config(cls, config) -> "DiskUsageCache | None":
+        """Cache à côté de config.json, ou None s'il ne peut pas être ouvert (mesure sans cache)."""
+        config_dir = os.path.dirname(os.path.abspath(config.config_file))
+        db_path = os.path.join(config_dir, "disk_usage.sqlite3")
+        try:
+            cache = cls(db_path)
+        except sqlite3.Error as e:
+            print(f"[!] Cache des tailles indisponible ({db_path}): {e}")
+            return None
+        # Ancien format (un fichier JSON réécrit en entier à chaque mesure) : remplacé
+        try:
+            os.remove(os.path.join(config_dir, "disk_usage_cache.json"))
+        except OSError:
+            pass
+        return cache
+
+    def _init_schema(self):
+        with self._lock, self._conn:
+            version = self._conn.execute("PRAGMA user_version").fetchone()[0]
+            if version != SCHEMA_VERSION:
+                # Cache reconstructible : un changement de format repart de zéro
+                for table in ("dirs", "repos"):
+                    self._conn.execute(f"DROP TABLE IF EXISTS {table}")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS dirs ("
+                " repo TEXT NOT NULL, rel TEXT NOT NULL, mtime_ns INTEGER NOT NULL, bytes INTEGER NOT NULL,"
+                " subdirs TEXT NOT NULL, is_repo INTEGER NOT NULL,"
+                " PRIMARY KEY (repo, rel)) WITHOUT ROWID"
+            )
+            # Repositories présents dans le cache : evict sans parcourir tous les dossiers
+            self._conn.execute("CREATE TABLE IF NOT EXISTS repos (repo TEXT PRIMARY KEY)")
+            self._conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+
+    def entries(self, repo_path: str) -> dict[str, list]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT rel, mtime_ns, bytes, subdirs, is_repo FROM dirs WHERE repo = ?", (repo_path,)
+            ).fetchall()
+        return {rel: [mtime_ns, size, json.loads(subdirs), bool(is_repo)]
+                for rel, mtime_ns, size, subdirs, is_repo in rows}
+
+    def replace(self, repo_path: str, entries: dict[str, list], old: dict[str, list]):
+        """Remplace les dossiers d'un repository par ceux de la dernière mesure (les disparus partent).
+
+        Seuls les dossiers relus (absents de old, ou autre liste que celle de old) sont écrits.
+        """
+        changed = [
+            (repo_path, rel, entry[0], entry[1], json.dumps(entry[2], ensure_ascii=False), int(entry[3]))
+            for rel, entry in entries.items() if old.get(rel) is not entry
+        ]
+        removed = [(repo_path, rel) for rel in old if rel not in entries]
+        if old and not changed and not removed:
+            return
+        with self._lock, self._conn:
+            self._conn.executemany("DELETE FROM dirs WHERE repo = ? AND rel = ?", removed)
+            self._conn.executemany("INSERT OR REPLACE INTO dirs VALUES (?, ?, ?, ?, ?, ?)", changed)
+            self._conn.execute("INSERT OR IGNORE INTO repos (repo) VALUES (?)", (repo_path,))
+
+    def evict(self, roots, seen_paths):
+        """Oublie les repositories supprimés ou déplacés (même règle que ScanCache.evict)."""
+        prefixes = tuple(os.path.join(os.path.abspath(root), "") for root in roots)
+        seen = set(seen_paths)
+        with self._lock, self._conn:
+            cached = [row[0] for row in self._conn.execute("SELECT repo FROM repos")]
+            removed = [
+                (path,) for path in cached
+                if path not in seen and (path.startswith(prefixes) or not os.path.exists(os.path.join(path, ".git")))
+            ]
+            if removed:
+                self._conn.executemany("DELETE FROM dirs WHERE repo = ?", removed)
+                self._conn.executemany("DELETE FROM repos WHERE repo = ?", removed)
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class _Job:
+    """Mesure en cours d'un repository."""
+
+    __slots__ = ("path", "old", "entries", "usage", "pending", "lock")
+
+    def __init__(self, path: str):
+        self.path = path
+        self.old: dict[str, list] = {}        # Cache de la mesure précédente (lu par la première tâche)
+        self.entries: dict[str, list] = {}    # Dossiers rencontrés par cette mesure
+        self.usage = DiskUsage()
+        self.pending = 0                      # Tâches en cours pour ce repository
+        self.lock = threading.Lock()
+
+
+class DiskUsageAnalyzer:
+    """Mesure parallèle de la taille des repositories, avec cache par dossier."""
+
+    def __init__(self, workers: int = 8, artifact_dirs=ARTIFACT_DIRS, cache: DiskUsageCache | None = None):
+        self.workers = max(1, workers)
+        self.artifact_dirs = frozenset(artifact_dirs)
+        self.cache = cache
+
+    @classmethod
+    def for_config(cls, config) -> "DiskUsageAnalyzer | None":
+        """Analyseur configuré, ou None si la mesure des tailles est désactivée."""
+        if not config.get('disk_usage', True):
+            return None
+        return cls(
+            config.get('disk_usage_workers', 8),
+            config.get('disk_artifact_dirs', list(ARTIFACT_DIRS)),
+            DiskUsageCache.for_config(config) if config.get('disk_usage_cache', True) else None,
+        )
+
+    def measure(
+        self,
+        repo_paths: list[str],
+        on_result: Callable[[str, DiskUsage], None] | None = None,
+        is_cancelled: Callable[[], bool] = lambda: False,
+    ) -> dict[str, DiskUsage]:
+        """Mesure les repositories ; on_result est appelé (depuis un thread du pool) dès
+        qu'un repository est terminé. Bloquant : à appeler hors de la boucle asyncio.
+
+        Les dépôts imbriqués (sous-dossier contenant .git) ne sont pas comptés dans
+        leur parent : ils ont leur propre mesure.
+        """
+        results: dict[str, DiskUsage] = {}
+        jobs = [_Job(path) for path in repo_paths]
+        if not jobs:
+            return results
+
+        state_lock = threading.Lock()
+        all_done = threading.Event()
+        remaining = [len(jobs)]   # Repositories non terminés
+        queued = [0]              # Tâches soumises au pool et pas encore terminées
+
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="disk-usage") as pool:
+
+            def submit(job, rel, category):
+                with state_lock:
+                    queued[0] += 1
+                    job.pending += 1
+                pool.submit(run, job, rel, category)
+
+            def should_split() -> bool:
+                # Assez de travail en attente pour occuper tous les threads : continuer sur place
+                return queued[0] < self.workers * 2
+
+            def run(job, rel, category):
+                try:
+                    if rel == "." and self.cache:
+                        # Lu au démarrage du repository : un seul en mémoire par thread
+                        job.old = self.cache.entries(job.path)
+                    self._walk(job, rel, category, submit, should_split, is_cancelled)
+                finally:
+                    with state_lock:
+                        queued[0] -= 1
+                        job.pending -= 1
+                        finished = job.pending == 0
+                    if finished:
+                        self._finish(job, results, on_result, is_cancelled)
+                        with state_lock:
+                            remaining[0] -= 1
+                            if remaining[0] == 0:
+                                all_done.set()
+
+            for job in jobs:
+                submit(job, ".", _WORKTREE)
+            all_done.wait()
+        return results
+
+    def _finish(self, job: _Job, results: dict, on_result, is_cancelled):
+        if is_cancelled():
+            return
+        if self.cache:
+            # Après une annulation, seuls les repositories terminés sont remplacés
+            self.cache.replace(job.path, job.entries, job.old)
+        job.old = {}
+        results[job.path] = job.usage
+        if on_result:
+            on_result(job.path, job.usage)
+
+    def _walk(self, job: _Job, rel: str, category: str, submit, should_split, is_cancelled):
+        """Parcourt une branche ; les sous-dossiers partent sur d'autres threads s'il y en a de libres."""
+        stack = [(rel, category)]
+        while stack:
+            if is_cancelled():
+                return
+            rel, category = stack.pop()
+            scanned = self._scan_dir(job, rel)
+            if scanned is None:
+                continue
+            size, subdirs, is_repo = scanned
+            if is_repo and rel != ".":
+                continue  # Repository imbriqué : mesuré pour lui-même
+            with job.lock:
+                job.usage.add(category, size)
+            for name in subdirs:
+                child = name if rel == "." else os.path.join(rel, name)
+                if category != _WORKTREE:
+                    child_category = category
+                elif rel == "." and name == ".git":
+                    child_category = _GIT
+                elif name in self.artifact_dirs:
+                    child_category = name
+                else:
+                    child_category = _WORKTREE
+                if should_split():
+                    submit(job, child, child_category)
+                else:
+                    stack.append((child, child_category))
+
+    @staticmethod
+    def _scan_dir(job: _Job, rel: str) -> tuple[int, list[str], bool] | None:
+        """(octets des fichiers du dossier, sous-dossiers, contient .git), depuis le cache si le mtime n'a pas changé."""
+        path = job.path if rel == "." else os.path.join(job.path, rel)
+        try:
+            st = os.stat(path, follow_symlinks=False)
+        except OSError:
+            return None
+        cached = job.old.get(rel)
+        if cached is not None and cached[0] == st.st_mtime_ns:
+            job.entries[rel] = cached
+            return cached[1], cached[2], cached[3]
+
+        size = _disk_bytes(st)
+        subdirs = []
+        is_repo = False
+        try:
+            with os.scandir(path) as it:
+                for entry in it:
+                    if entry.name == ".git":
+                        is_repo = True
+                    try:
+                        # Liens symboliques : comptés comme fichiers, jamais suivis
+                        if entry.is_dir(follow_symlinks=False):
+                            subdirs.append(entry.name)
+                        else:
+                            size += _disk_bytes(entry.stat(follow_symlinks=False))
+                    except OSError:
+                        continue
+        except OSError:
+            pass
+        job.entries[rel] = [st.st_mtime_ns, size, subdirs, is_repo]
+        return size, subdirs, is_repo
@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+RepoScan - Fetch parallèle de tous les repositories.
+
+Les fetchs tournent dans une boucle asyncio avec deux limites : une concurrence
+globale (`fetch_concurrency`) et une concurrence par hôte distant
+(`fetch_per_host_concurrency`) pour ne pas saturer un même serveur. Chaque fetch
+respecte `fetch_timeout_seconds`, et les résultats sont remontés dans l'ordre où
+ils se terminent.
+"""
+
+import asyncio
+import re
+import time
+from typing import Callable
+
+from git_dir_reader import GitDirReader
+from git_runner import AsyncGitRunner
+from repo_scanner import cancel_tasks
+
+
+class FetchResult:
+    """Résultat du fetch d'un repository."""
+
+    __slots__ = ("repo", "success", "error", "duration")
+
+    def __init__(self, repo, success: bool, error: str | None = None, duration: float = 0.0):
+        self.repo = repo
+        self.success = success
+        self.error = error
+        self.duration = duration
+
+
+def remote_host(url: str | None) -> str:
+    """Extrait l'hôte d'une URL git (https://, ssh://, git@host:chemin). "" si local/inconnu."""
+    if not url or url.startswith("file://"):
+        return ""
+    match = re.match(r'^[a-zA-Z][a-zA-Z0-9+.-]*://(?:[^@/]*@)?([^/:]+)', url)
+    if match:
+        return match.group(1).lower()
+    # Syntaxe scp : [user@]host:chemin (mais pas C:\chemin sous Windows)
+    match = re.match(r'^(?:[^@/]+@)?([^/:]{2,}):', url)
+    if match:
+        return match.group(1).lower()
+    return ""
+
+
+class FetchExecutor:
+    """Lance `git fetch --all` sur plusieurs repositories en parallèle."""
+
+    def __init__(self, concurrency: int = 8, per_host: int = 4, timeout: float = 30):
+        self.concurrency = max(1, concurrency)
+        self.per_host = max(1, per_host)
+        self.timeout = timeout
+        self.runner = AsyncGitRunner(self.concurrency, timeout)
+        self._host_semaphores: dict[str, asyncio.Semaphore] = {}
+        # Places de fetch (concurrence globale) : l'annulation est vérifiée une fois la place obtenue
+        self._slots: asyncio.Semaphore | None = None
+
+    @classmethod
+    def for_config(cls, config) -> "FetchExecutor":
+        return cls(
+            config.get('fetch_concurrency', 8),
+            config.get('fetch_per_host_concurrency', 4),
+            config.get('fetch_timeout_seconds', 30),
+        )
+
+    def _host_semaphore(self, host: str) -> asyncio.Semaphore:
+        semaphore = self._host_semaphores.get(host)
+        if semaphore is None:
+            semaphore = self._host_semaphores[host] = asyncio.Semaphore(self.per_host)
+        return semaphore
+
+    async def _fetch_one(self, repo, is_cancelled: Callable[[], bool]) -> FetchResult | None:
+        host = remote_host(GitDirReader(repo.path).remote_url())
+        # Les repositories locaux (file://, chemins) ne partagent pas de limite d'hôte
+        semaphore = self._host_semaphore(host) if host else None
+        if semaphore:
+            await semaphore.acquire()
+        try:
+            # Toujours dans l'ordre hôte puis place globale : pas d'interblocage
+            async with self._slots:
+                # Vérifié juste avant de lancer git : un fetch resté en file d'attente
+                # pendant l'annulation ne démarre pas
+                if is_cancelled():
+                    return None
+                start = time.monotonic()
+                result = await repo.fetch_from_remote(self.runner, self.timeout)
+                return FetchResult(repo, result['success'], result.get('error'), time.monotonic() - start)
+        finally:
+            if semaphore:
+                semaphore.release()
+
+    async def fetch_all(
+        self,
+        repos: list,
+        on_result: Callable[[FetchResult], None],
+        is_cancelled: Callable[[], bool] = lambda: False,
+    ) -> list[FetchResult]:
+        """Fetch tous les repositories ; on_result est appelé dès qu'un fetch se termine.
+
+        Une annulation (is_cancelled) empêche le démarrage des fetchs en attente ;
+        ceux déjà lancés vont jusqu'au bout (ou jusqu'au timeout).
+        """
+        # Les sémaphores sont liés à la boucle courante
+        self._host_semaphores = {}
+        self._slots = asyncio.Semaphore(self.concurrency)
+        tasks = [asyncio.ensure_future(self._fetch_one(repo, is_cancelled)) for repo in repos]
+        results = []
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                result = await next_done
+                if result is None:
+                    continue
+                results.append(result)
+                on_result(result)
+        except (Exception, asyncio.CancelledError):
+            # Y compris une erreur de on_result : les fetchs restants ne sont pas laissés à asyncio.run
+            await cancel_tasks(tasks)
+            raise
+        return results
@@ -0,0 +1,235 @@
+#!/usr/bin/env python3
+"""
+RepoScan - Sessions `git cat-file --batch` persistantes pour la lecture d'objets.
+
+Lire un objet (commit, arbre, blob) avec `git log` ou `git show` coûte un
+fork/exec complet par requête. Une session garde un processus
+`git cat-file --batch` (ou `--batch-check` : type et taille seulement) ouvert
+par repository ; les requêtes sont écrites à la suite sur son stdin et les
+réponses lues dans le même ordre (pipelining), sans attendre chaque réponse
+avant d'envoyer la suivante.
+
+CatFilePool ouvre les sessions à la demande, ferme les moins récemment
+utilisées au-delà de `cat_file_max_sessions`, et celles inactives depuis
+`cat_file_idle_seconds`. Les sessions sont synchrones et thread-safe : depuis
+asyncio, on les appelle via asyncio.to_thread (voir ScanEngine.recent_commits).
+"""
+
+import collections
+import os
+import subprocess
+import threading
+import time
+
+import git_profiler
+from git_dir_reader import parse_commit_object
+from git_status import LastCommit
+
+
+# Sous POSIX, git est lancé dans son propre groupe de processus (comme dans git_runner) :
+# un Ctrl+C dans le terminal ne tue pas les sessions au milieu d'une réponse
+_NEW_SESSION = os.name == 'posix'
+
+# Requêtes envoyées d'avance avant de lire les réponses. Borné : si git bloque en
+# écrivant une grosse réponse pendant qu'on écrit encore des requêtes, les deux
+# pipes se remplissent et les deux processus s'attendent mutuellement
+_PIPELINE_DEPTH = 64
+
+
+class CatFileObject:
+    """Un objet lu par cat-file. data vaut None en mode --batch-check."""
+
+    __slots__ = ("oid", "type", "size", "data")
+
+    def __init__(self, oid: str, type: str, size: int, data: bytes | None = None):
+        self.oid = oid
+        self.type = type
+        self.size = size
+        self.data = data
+
+
+class CatFileSession:
+    """Un processus `git cat-file --batch` (ou `--batch-check`) ouvert sur un repository."""
+
+    def __init__(self, cwd: str, check: bool = False):
+        self.cwd = cwd
+        self.check = check
+        self.last_used = time.monotonic()
+        self._lock = threading.Lock()  # Une seule série de requêtes à la fois sur les pipes
+        # OSError si git est introuvable ou si le dossier n'existe plus
+        self._process = subprocess.Popen(
+            ["git", "cat-file", "--batch-check" if check else "--batch"],
+            cwd=cwd,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            start_new_session=_NEW_SESSION,
+        )
+
+    @property
+    def alive(self) -> bool:
+        return self._process is not None and self._process.poll() is None
+
+    def request(self, names: list[str]) -> list[CatFileObject | None]:
+        """Lit les objets demandés (oid, ref ou expression comme HEAD~2), dans l'ordre.
+
+        None pour un objet introuvable ou ambigu. OSError si le processus s'est arrêté.
+        """
+        if any('\n' in name for name in names):
+            raise ValueError("Nom d'objet invalide (retour à la ligne)")
+        profiler = git_profiler.active()
+        with self._lock:
+            if self._process is None:
+                raise OSError("Session cat-file fermée")
+            start = time.perf_counter()
+            results: list[CatFileObject | None] = []
+            try:
+                for offset in range(0, len(names), _PIPELINE_DEPTH):
+                    chunk = names[offset:offset + _PIPELINE_DEPTH]
+                    self._process.stdin.write(b"".join(name.encode('utf-8') + b"\n" for name in chunk))
+                    self._process.stdin.flush()
+                    results.extend(self._read_response() for _ in chunk)
+            except ValueError as e:  # Pipe fermé entre-temps
+                raise OSError(str(e)) from e
+            finally:
+                self.last_used = time.monotonic()
+                if profiler is not None:
+                    profiler.record(self.cwd, ["cat-file", "--batch-check" if self.check else "--batch"],
+                                    start, time.perf_counter() - start,
+                                    returncode=0 if len(results) == len(names) else None)
+            return results
+
+    def _read_response(self) -> CatFileObject | None:
+        stdout = self._process.stdout
+        header = stdout.readline()
+        if not header:
+            raise OSError("git cat-file s'est arrêté")
+        # "<oid> <type> <taille>", ou "<nom> missing" / "<nom> ambiguous"
+        if header.endswith((b" missing\n", b" ambiguous\n")):
+            return None
+        oid, kind, size = header.split()
+        size = int(size)
+        if self.check:
+            return CatFileObject(oid.decode('ascii'), kind.decode('ascii'), size)
+        data = stdout.read(size + 1)  # Contenu suivi d'un retour à la ligne
+        if len(data) != size + 1:
+            raise OSError("git cat-file s'est arrêté")
+        return CatFileObject(oid.decode('ascii'), kind.decode('ascii'), size, data[:size])
+
+    def close(self):
+        """Ferme stdin (git se termine de lui-même) ; tue le processus s'il ne répond plus."""
+        with self._lock:
+            process, self._process = self._process, None
+        if process is None:
+            return
+        try:
+            process.stdin.close()
+        except OSError:
+            pass
+        try:
+            process.wait(timeout=1)
+        except subprocess.TimeoutExpired:
+            process.kill()
+            process.wait()
+        process.stdout.close()
+
+
+class CatFilePool:
+    """Sessions cat-file par repository, ouvertes à la demande, fermées par ancienneté (LRU)."""
+
+    def __init__(self, max_sessions: int = 8, idle_seconds: float = 60):
+        self.max_sessions = max(1, max_sessions)
+        self.idle_seconds = idle_seconds
+        self._sessions: collections.OrderedDict[tuple[str, bool], CatFileSession] = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def for_config(cls, config) -> "CatFilePool":
+        return cls(config.get('cat_file_max_sessions', 8), config.get('cat_file_idle_seconds', 60))
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    def _acquire(self, cwd: str, check: bool) -> CatFileSession:
+        key = (cwd, check)
+        with self._lock:
+            session = self._sessions.get(key)
+            if session is not None:
+                self._sessions.move_to_end(key)
+        if session is not None and session.alive:
+            return session
+
+        # Lancement hors du verrou : les autres repositories ne l'attendent pas
+        session = CatFileSession(cwd, check)
+        with self._lock:
+            stale = [self._sessions.pop(key)] if key in self._sessions else []
+            self._sessions[key] = session
+            stale.extend(self._evict_locked(keep=key))
+        for old in stale:
+            old.close()
+        return session
+
+    def _evict_locked(self, keep=None) -> list[CatFileSession]:
+        """Retire (sans les fermer) les sessions inactives trop longtemps, puis les plus anciennes."""
+        limit = time.monotonic() - self.idle_seconds if self.idle_seconds > 0 else None
+        evicted = []
+        for key in list(self._sessions):
+            if key == keep:
+                continue
+            too_many = len(self._sessions) > self.max_sessions
+            if too_many or (limit is not None and self._sessions[key].last_used < limit):
+                evicted.append(self._sessions.pop(key))
+        return evicted
+
+    def _request(self, cwd: str, names: list[str], check: bool) -> list[CatFileObject | None]:
+        # Une session fermée par l'éviction (ou morte) entre l'acquisition et la
+        # requête : on réessaie une fois avec une session neuve
+        for _ in range(2):
+            try:
+                return self._acquire(cwd, check).request(names)
+            except OSError:
+                with self._lock:
+                    session = self._sessions.pop((cwd, check), None)
+                if session is not None:
+                    session.close()
+        return [None] * len(names)
+
+    def read(self, cwd: str, names: list[str]) -> list[CatFileObject | None]:
+        """Contenu des objets (`--batch`), dans l'ordre des noms."""
+        return self._request(cwd, names, check=False)
+
+    def info(self, cwd: str, names: list[str]) -> list[CatFileObject | None]:
+        """Type et taille des objets (`--batch-check`), sans leur contenu."""
+        return self._request(cwd, names, check=True)
+
+    def recent_commits(self, cwd: str, count: int, start: str = "HEAD") -> list[LastCommit]:
+        """Derniers commits de start en suivant le premier parent (comme `git log --first-parent`).
+
+        Les `count` requêtes (HEAD, HEAD~1, HEAD~2...) partent d'un seul coup
+        dans la même session.
+        """
+        names = [start] + [f"{start}~{i}" for i in range(1, count)]
+        commits = []
+        for obj in self.read(cwd, names):
+            if obj is None or obj.type != "commit":
+                break  # Début de l'historique
+            commit = parse_commit_object(obj.oid, obj.data)
+            if commit is None:
+                break
+            commits.append(commit)
+        return commits
+
+    def close_idle(self) -> int:
+        """Ferme les sessions inactives depuis idle_seconds ; retourne leur nombre."""
+        with self._lock:
+            evicted = self._evict_locked()
+        for session in evicted:
+            session.close()
+        return len(evicted)
+
+    def close(self):
+        with self._lock:
+            sessions = list(self._sessions.values())
+            self._sessions.clear()
+        for session in sessions:
+            session.close()
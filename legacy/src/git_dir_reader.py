@@ -0,0 +1,253 @@
+#!/usr/bin/env python3
+"""
+RepoScan - Lecture directe des métadonnées d'un dossier .git, sans lancer `git`.
+
+Couvre ce dont le tableau a besoin : branche courante (HEAD), commit de HEAD
+(refs "loose" ou packed-refs), URL de origin et upstream (config), ainsi que
+l'indirection `gitdir:` des worktrees et sous-modules.
+Les objets commit ne sont lus que s'ils sont stockés en "loose" ; sinon, et pour
+tout ce qui dépend du working directory, l'appelant repasse par `git`.
+"""
+
+import os
+import zlib
+from typing import Generator
+
+from git_status import STATUS_COMMAND, LAST_COMMIT_COMMAND, BranchInfo, RepoState, LastCommit
+from git_status import parse_porcelain_v2, parse_last_commit
+
+
+class GitDirReader:
+    """Lecteur des fichiers HEAD, refs, packed-refs et config d'un repository."""
+
+    def __init__(self, worktree_path: str):
+        self.worktree_path = worktree_path
+        self.git_dir = self._resolve_git_dir(os.path.join(worktree_path, ".git"))
+        self.common_dir = self._resolve_common_dir(self.git_dir)
+        self._config: dict[tuple[str, str | None], dict[str, str]] | None = None
+        self._packed_refs: dict[str, str] | None = None
+
+    # ─── Localisation ───────────────────────────────────────────────────────────
+
+    @staticmethod
+    def _resolve_git_dir(dot_git: str) -> str | None:
+        """Retourne le vrai dossier git : .git lui-même, ou la cible de `gitdir: ...`."""
+        if os.path.isdir(dot_git):
+            return dot_git
+        try:
+            with open(dot_git, 'r', encoding='utf-8') as f:
+                content = f.read().strip()
+        except OSError:
+            return None
+        if not content.startswith("gitdir:"):
+            return None
+        target = content[len("gitdir:"):].strip()
+        if not os.path.isabs(target):
+            target = os.path.join(os.path.dirname(dot_git), target)
+        target = os.path.normpath(target)
+        return target if os.path.isdir(target) else None
+
+    @staticmethod
+    def _resolve_common_dir(git_dir: str | None) -> str | None:
+        """Les worktrees partagent refs/, packed-refs et config via le fichier `commondir`."""
+        if git_dir is None:
+            return None
+        try:
+            with open(os.path.join(git_dir, "commondir"), 'r', encoding='utf-8') as f:
+                common = f.read().strip()
+        except OSError:
+            return git_dir
+        if not os.path.isabs(common):
+            common = os.path.join(git_dir, common)
+        return os.path.normpath(common)
+
+    @property
+    def is_supported(self) -> bool:
+        """False si le dossier est introuvable ou utilise un format de refs non géré (reftable)."""
+        if self.git_dir is None:
+            return False
+        storage = self.config_get("extensions", None, "refstorage")
+        return storage in (None, "files")
+
+    # ─── Refs ───────────────────────────────────────────────────────────────────
+
+    def _read_file(self, *parts: str) -> str | None:
+        try:
+            with open(os.path.join(*parts), 'r', encoding='utf-8') as f:
+                return f.read().strip()
+        except (OSError, UnicodeDecodeError):
+            return None
+
+    def _load_packed_refs(self) -> dict[str, str]:
+        if self._packed_refs is None:
+            self._packed_refs = {}
+            content = self._read_file(self.common_dir, "packed-refs")
+            for line in (content or "").splitlines():
+                # Ignorer l'en-tête et les lignes "^<oid>" (tags annotés déréférencés)
+                if not line or line[0] in "#^":
+                    continue
+                oid, _, name = line.partition(' ')
+                self._packed_refs[name] = oid
+        return self._packed_refs
+
+    def resolve_ref(self, ref: str, _depth: int = 0) -> str | None:
+        """Résout une ref (ex: refs/heads/main) en identifiant de commit."""
+        if _depth > 5:
+            return None
+        # HEAD et les refs propres au worktree vivent dans git_dir, le reste dans common_dir
+        for base in dict.fromkeys((self.git_dir, self.common_dir)):
+            value = self._read_file(base, ref)
+            if value is None:
+                continue
+            if value.startswith("ref:"):
+                return self.resolve_ref(value[4:].strip(), _depth + 1)
+            return value
+        return self._load_packed_refs().get(ref)
+
+    def read_head(self) -> tuple[str | None, str | None]:
+        """Retourne (branche, commit) de HEAD. Branche None si HEAD est détaché."""
+        head = self._read_file(self.git_dir, "HEAD")
+        if not head:
+            return None, None
+        if head.startswith("ref:"):
+            ref = head[4:].strip()
+            branch = ref[len("refs/heads/"):] if ref.startswith("refs/heads/") else ref
+            return branch, self.resolve_ref(ref)
+        return None, head
+
+    # ─── Config ─────────────────────────────────────────────────────────────────
+
+    @staticmethod
+    def _parse_config(content: str) -> dict[tuple[str, str | None], dict[str, str]]:
+        """Parse minimal du format git-config : sections, sous-sections, clés simples."""
+        sections: dict[tuple[str, str | None], dict[str, str]] = {}
+        current: dict[str, str] | None = None
+        for raw_line in content.splitlines():
+            line = raw_line.strip()
+            if not line or line[0] in "#;":
+                continue
+            if line.startswith('['):
+                header = line[1:line.find(']')]
+                name, _, sub = header.partition(' ')
+                sub = sub.strip()
+                if sub.startswith('"') and sub.endswith('"'):
+                    sub = sub[1:-1].replace('\\"', '"').replace('\\\\', '\\')
+                elif '.' in name:  # Ancienne syntaxe [section.sub]
+                    name, _, sub = name.partition('.')
+                current = sections.setdefault((name.lower(), sub or None), {})
+                continue
+            if current is None:
+                continue
+            key, sep, value = line.partition('=')
+            value = value.strip() if sep else "true"
+            if value.startswith('"') and value.endswith('"') and len(value) >= 2:
+                value = value[1:-1]
+            else:
+                # Commentaire en fin de ligne (hors guillemets)
+                for marker in (" #", " ;", "\t#", "\t;"):
+                    if marker in value:
+                        value = value[:value.index(marker)].rstrip()
+            current[key.strip().lower()] = value
+        return sections
+
+    def config_get(self, section: str, subsection: str | None, key: str) -> str | None:
+        if self._config is None:
+            content = self._read_file(self.common_dir, "config") if self.common_dir else None
+            self._config = self._parse_config(content or "")
+        return self._config.get((section.lower(), subsection), {}).get(key.lower())
+
+    def remote_url(self, remote: str = "origin") -> str | None:
+        return self.config_get("remote", remote, "url")
+
+    def upstream(self, branch: str) -> tuple[str | None, str | None]:
+        """Retourne (nom court de l'upstream, ref de suivi) pour une branche locale.
+
+        Ex: ("origin/main", "refs/remotes/origin/main"), ou (None, None) sans upstream.
+        """
+        remote = self.config_get("branch", branch, "remote")
+        merge = self.config_get("branch", branch, "merge")
+        if not remote or not merge:
+            return None, None
+        short = merge[len("refs/heads/"):] if merge.startswith("refs/heads/") else merge
+        if remote == ".":
+            return short, merge
+        return f"{remote}/{short}", f"refs/remotes/{remote}/{short}"
+
+    # ─── Objets ─────────────────────────────────────────────────────────────────
+
+    def read_commit(self, oid: str) -> LastCommit | None:
+        """Lit un commit stocké en "loose". Retourne None s'il est dans un pack."""
+        if not oid or len(oid) < 4:
+            return None
+        path = os.path.join(self.common_dir, "objects", oid[:2], oid[2:])
+        try:
+            with open(path, 'rb') as f:
+                raw = zlib.decompress(f.read())
+        except (OSError, zlib.error):
+            return None
+
+        header, _, body = raw.partition(b'\0')
+        if not header.startswith(b"commit "):
+            return None
+        return parse_commit_object(oid, body)
+
+
+def parse_commit_object(oid: str, body: bytes) -> LastCommit | None:
+    """Hash court, date du committer et sujet d'un objet commit (contenu brut, sans en-tête)."""
+    headers, _, message = body.partition(b'\n\n')
+
+    timestamp = None
+    for line in headers.split(b'\n'):
+        if line.startswith(b"committer "):
+            # committer Nom <email> 1700000000 +0200
+            try:
+                timestamp = int(line.rsplit(b' ', 2)[1])
+            except (ValueError, IndexError):
+                return None
+            break
+    if timestamp is None:
+        return None
+
+    # %s de git : premier paragraphe du message, lignes jointes par un espace
+    paragraph = message.decode('utf-8', errors='replace').strip().split('\n\n', 1)[0]
+    subject = ' '.join(line.strip() for line in paragraph.splitlines())
+    return LastCommit(oid[:7], timestamp, subject)
+
+
+# ─── Analyse "fast mode" ────────────────────────────────────────────────────────
+
+def analyze_git_dir(path: str) -> Generator[list[str], str | None, RepoState | None]:
+    """Analyse un repository en lisant .git directement.
+
+    Seuls le statut et l'avance/retard passent par `git status` (ils dépendent du
+    working directory et du graphe de commits). Le dernier commit repasse par
+    `git log` uniquement s'il est packé. Retourne None si .git n'est pas lisible,
+    auquel cas l'appelant utilise le chemin subprocess complet.
+
+    Générateur (voir git_runner) : produit les commandes git et reçoit leur sortie.
+    """
+    reader = GitDirReader(path)
+    if not reader.is_supported:
+        return None
+
+    state = RepoState()
+    branch = BranchInfo()
+    branch.head, branch.oid = reader.read_head()
+    if branch.head:
+        branch.upstream = reader.upstream(branch.head)[0]
+    state.branch = branch
+    state.remote_url = reader.remote_url()
+
+    status_output = yield STATUS_COMMAND
+    if status_output is not None:
+        status_branch, state.status = parse_porcelain_v2(status_output)
+        branch.ahead, branch.behind = status_branch.ahead, status_branch.behind
+
+    if branch.oid:
+        state.last_commit = reader.read_commit(branch.oid)
+        if state.last_commit is None:
+            commit_output = yield LAST_COMMIT_COMMAND
+            if commit_output:
+                state.last_commit = parse_last_commit(commit_output)
+
+    return state
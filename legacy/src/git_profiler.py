@@ -0,0 +1,202 @@
+#!/usr/bin/env python3
+"""
+RepoScan - Profilage des commandes git.
+
+Quand le profilage est activé (--profile), chaque processus git lancé par
+AsyncGitRunner est enregistré : repository,
+commande, attente avant lancement, durée, code de retour, timeout. On en tire :
+- un rapport texte : histogramme des durées par commande, repositories les plus lents
+- un export "Chrome trace event" (chrome://tracing, https://ui.perfetto.dev) où
+  chaque ligne est un "slot" de concurrence, pour voir le parallélisme réel
+"""
+
+import atexit
+import json
+import os
+import statistics
+import sys
+import threading
+import time
+
+
+class GitCall:
+    """Une exécution de git."""
+
+    __slots__ = ("cwd", "args", "start", "duration", "queued", "returncode", "timed_out")
+
+    def __init__(self, cwd, args, start, duration, queued, returncode, timed_out):
+        self.cwd = cwd
+        self.args = args
+        self.start = start            # time.perf_counter() au lancement du processus
+        self.duration = duration      # secondes
+        self.queued = queued          # attente du sémaphore de concurrence, en secondes
+        self.returncode = returncode  # None si le processus n'a pas pu être lancé ou a été tué
+        self.timed_out = timed_out
+
+    @property
+    def command(self) -> str:
+        """Nom de la sous-commande git (status, log, fetch...), options globales ignorées."""
+        args = iter(self.args)
+        for arg in args:
+            if arg == "-c":
+                next(args, None)
+            elif not arg.startswith("-"):
+                return arg
+        return "?"
+
+
+class GitProfiler:
+    """Collecte thread-safe des exécutions de git."""
+
+    def __init__(self):
+        self.calls: list[GitCall] = []
+        self.origin = time.perf_counter()
+        self._lock = threading.Lock()
+
+    def record(self, cwd, args, start, duration, queued=0.0, returncode=None, timed_out=False):
+        with self._lock:
+            self.calls.append(GitCall(cwd, list(args), start, duration, queued, returncode, timed_out))
+
+    # ─── Rapport ────────────────────────────────────────────────────────────────
+
+    @staticmethod
+    def _bucket_label(index: int) -> str:
+        if index == 0:
+            return "< 1ms".rjust(9)
+        low, high = 2 ** (index - 1), 2 ** index
+        label = f"{low}-{high}ms" if high < 1000 else f"{low / 1000:.2g}-{high / 1000:.2g}s"
+        return label.rjust(9)
+
+    @classmethod
+    def _histogram(cls, durations: list[float], width: int = 30) -> list[str]:
+        """Histogramme par puissances de 2 de millisecondes."""
+        buckets: dict[int, int] = {}
+        for duration in durations:
+            ms = duration * 1000
+            index = 0 if ms < 1 else int(ms).bit_length()
+            buckets[index] = buckets.get(index, 0) + 1
+        peak = max(buckets.values())
+        return [
+            f"      {cls._bucket_label(index)} {'█' * max(1, round(count / peak * width))} {count}"
+            for index, count in sorted(buckets.items())
+        ]
+
+    def format_report(self, top: int = 10) -> str:
+        calls = list(self.calls)
+        if not calls:
+            return "Profil git : aucune commande exécutée"
+
+        lines = []
+        wall = max(c.start + c.duration for c in calls) - min(c.start for c in calls)
+        total = sum(c.duration for c in calls)
+        lines.append(f"=== Profil git : {len(calls)} commandes, {total:.2f}s cumulées "
+                     f"sur {wall:.2f}s (parallélisme moyen x{total / wall if wall else 1:.1f}) ===")
+
+        by_command: dict[str, list[GitCall]] = {}
+        for call in calls:
+            by_command.setdefault(call.command, []).append(call)
+        lines.append("")
+        lines.append(f"  {'Commande':<12} {'Appels':>7} {'Total':>9} {'Moy.':>8} {'p50':>8} "
+                     f"{'p90':>8} {'Max':>8} {'Attente':>8} {'Échecs':>7} {'Timeouts':>8}")
+        for command, group in sorted(by_command.items(), key=lambda item: -sum(c.duration for c in item[1])):
+            durations = sorted(c.duration for c in group)
+            p90 = durations[min(len(durations) - 1, int(len(durations) * 0.9))]
+            lines.append(
+                f"  {command:<12} {len(group):>7} {sum(durations):>8.2f}s "
+                f"{statistics.fmean(durations) * 1000:>6.1f}ms {statistics.median(durations) * 1000:>6.1f}ms "
+                f"{p90 * 1000:>6.1f}ms {durations[-1] * 1000:>6.1f}ms "
+                f"{statistics.fmean(c.queued for c in group) * 1000:>6.1f}ms "
+                f"{sum(1 for c in group if c.returncode != 0 and not c.timed_out):>7} "
+                f"{sum(1 for c in group if c.timed_out):>8}"
+            )
+        for command, group in sorted(by_command.items(), key=lambda item: -sum(c.duration for c in item[1])):
+            lines.append("")
+            lines.append(f"  Durées de `git {command}` :")
+            lines.extend(self._histogram([c.duration for c in group]))
+
+        by_repo: dict[str, list[GitCall]] = {}
+        for call in calls:
+            by_repo.setdefault(call.cwd, []).append(call)
+        lines.append("")
+        lines.append(f"  Repositories les plus lents (top {top}) :")
+        ranked = sorted(by_repo.items(), key=lambda item: -sum(c.duration for c in item[1]))[:top]
+        for cwd, group in ranked:
+            slowest = max(group, key=lambda c: c.duration)
+            lines.append(
+                f"    {sum(c.duration for c in group) * 1000:>8.1f}ms  {len(group):>3} appels  "
+                f"(max: {slowest.command} {slowest.duration * 1000:.1f}ms"
+                f"{', timeout' if slowest.timed_out else ''})  {cwd}"
+            )
+        return "\n".join(lines)
+
+    # ─── Chrome trace ───────────────────────────────────────────────────────────
+
+    def chrome_trace(self) -> dict:
+        """Événements "X" (durée complète), un tid par slot de concurrence."""
+        events = []
+        lane_ends: list[float] = []
+        for call in sorted(self.calls, key=lambda c: c.start):
+            # Premier slot libre à cet instant (coloration gloutonne d'intervalles)
+            for lane, end in enumerate(lane_ends):
+                if end <= call.start:
+                    break
+            else:
+                lane = len(lane_ends)
+                lane_ends.append(0.0)
+            lane_ends[lane] = call.start + call.duration
+            events.append({
+                "name": f"git {call.command}",
+                "cat": "git",
+                "ph": "X",
+                "ts": round((call.start - self.origin) * 1e6, 1),
+                "dur": round(call.duration * 1e6, 1),
+                "pid": os.getpid(),
+                "tid": lane + 1,
+                "args": {
+                    "repo": call.cwd,
+                    "argv": " ".join(call.args),
+                    "exit": call.returncode,
+                    "timed_out": call.timed_out,
+                    "queued_ms": round(call.queued * 1000, 2),
+                },
+            })
+        for lane in range(len(lane_ends)):
+            events.append({"name": "thread_name", "ph": "M", "pid": os.getpid(), "tid": lane + 1,
+                           "args": {"name": f"git slot {lane + 1}"}})
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    def write_chrome_trace(self, path: str):
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.chrome_trace(), f)
+
+
+# Profileur actif (None = profilage désactivé, aucun coût)
+_active: GitProfiler | None = None
+
+
+def enable() -> GitProfiler:
+    global _active
+    _active = GitProfiler()
+    return _active
+
+
+def active() -> GitProfiler | None:
+    return _active
+
+
+def enable_cli_report(report: bool, trace_path: str | None = None) -> GitProfiler | None:
+    """Options --profile / --profile-trace : active le profilage et, à la sortie du
+    programme, affiche le rapport sur stderr et/ou écrit la trace Chrome."""
+    if not report and not trace_path:
+        return None
+    profiler = enable()
+
+    def finish():
+        if report:
+            print(profiler.format_report(), file=sys.stderr)
+        if trace_path:
+            profiler.write_chrome_trace(trace_path)
+            print(f"Trace écrite dans {trace_path} (chrome://tracing ou https://ui.perfetto.dev)", file=sys.stderr)
+
+    atexit.register(finish)
+    return profiler
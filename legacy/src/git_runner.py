@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+"""
+RepoScan - Exécution des commandes git.
+
+Les analyses sont écrites comme des générateurs "sans I/O" : ils produisent (yield)
+les arguments d'une commande git et reçoivent sa sortie (stdout nettoyé, ou None
+en cas d'échec). AsyncGitRunner les exécute avec asyncio.create_subprocess_exec,
+sous un sémaphore global qui borne le nombre de processus git simultanés et un
+timeout (`git_timeout_seconds` pour l'analyse) qui tue le processus.
+"""
+
+import asyncio
+import contextlib
+import os
+import signal
+import threading
+import time
+import weakref
+from concurrent.futures import Future
+from typing import Generator
+
+import git_profiler
+
+
+GitSteps = Generator[list[str], str | None, object]
+
+# Sous POSIX, git est lancé dans son propre groupe de processus : au timeout, on tue
+# aussi ses enfants (ssh, helpers...) qui garderaient sinon les pipes ouverts
+_NEW_SESSION = os.name == 'posix'
+
+
+class GitResult:
+    """Résultat d'une commande git lancée par AsyncGitRunner."""
+
+    __slots__ = ("returncode", "stdout", "stderr", "timed_out")
+
+    def __init__(self, returncode: int | None, stdout: str = "", stderr: str = "", timed_out: bool = False):
+        self.returncode = returncode
+        self.stdout = stdout
+        self.stderr = stderr
+        self.timed_out = timed_out
+
+    @property
+    def ok(self) -> bool:
+        return self.returncode == 0
+
+
+class AsyncGitRunner:
+    """Lance les commandes git en asyncio, avec une limite globale de concurrence."""
+
+    def __init__(self, max_concurrency: int = 8, timeout: float = 5):
+        self.max_concurrency = max_concurrency
+        self.timeout = timeout
+        # Un sémaphore par boucle : le runner peut servir à plusieurs asyncio.run successifs
+        self._semaphores: weakref.WeakKeyDictionary = weakref.WeakKeyDictionary()
+
+    def _semaphore(self) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        semaphore = self._semaphores.get(loop)
+        if semaphore is None:
+            semaphore = self._semaphores[loop] = asyncio.Semaphore(self.max_concurrency)
+        return semaphore
+
+    async def run(self, cwd: str, args: list[str], timeout: float | None = None, env: dict | None = None) -> GitResult:
+        """Lance `git <args>` dans cwd. Le processus est tué si le timeout expire.
+
+        env complète l'environnement courant (ex: GIT_TERMINAL_PROMPT=0).
+        """
+        timeout = self.timeout if timeout is None else timeout
+        profiler = git_profiler.active()
+        requested = time.perf_counter()
+        async with self._semaphore():
+            started = time.perf_counter()
+            result = GitResult(None)  # Reste tel quel si la tâche est annulée
+            try:
+                result = await self._execute(cwd, args, timeout, env)
+                return result
+            finally:
+                if profiler is not None:
+                    profiler.record(cwd, args, started, time.perf_counter() - started, started - requested,
+                                    result.returncode, result.timed_out)
+
+    async def _execute(self, cwd: str, args: list[str], timeout: float, env: dict | None) -> GitResult:
+        try:
+            process = await self._spawn(cwd, args, env)
+        except OSError as e:
+            return GitResult(None, stderr=str(e))
+
+        try:
+            stdout, stderr = await asyncio.wait_for(process.communicate(), timeout)
+        except asyncio.TimeoutError:
+            await self._kill(process)
+            return GitResult(None, stderr=f"Timeout ({timeout:g}s)", timed_out=True)
+        except asyncio.CancelledError:
+            await self._kill(process)
+            raise
+
+        return GitResult(
+            process.returncode,
+            stdout.decode('utf-8', errors='replace'),
+            stderr.decode('utf-8', errors='replace'),
+        )
+
+    async def _spawn(self, cwd: str, args: list[str], env: dict | None) -> asyncio.subprocess.Process:
+        """Lance git, sans jamais interrompre create_subprocess_exec en cours de route.
+
+        Annulé pendant le lancement, asyncio peut perdre la trace du processus fils
+        et attendre sa fin indéfiniment (la boucle ne se ferme plus). On laisse donc
+        le lancement aboutir, puis on tue le processus avant de propager l'annulation.
+        """
+        spawn = asyncio.ensure_future(asyncio.create_subprocess_exec(
+            "git", *args,
+            cwd=cwd,
+            env={**os.environ, **env} if env else None,
+            stdin=asyncio.subprocess.DEVNULL,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+            start_new_session=_NEW_SESSION,
+        ))
+        try:
+            return await asyncio.shield(spawn)
+        except asyncio.CancelledError:
+            with contextlib.suppress(OSError):
+                await self._kill(await spawn)
+            raise
+
+    @staticmethod
+    async def _kill(process: asyncio.subprocess.Process):
+        """Tue le processus git (et son groupe sous POSIX), puis attend sa fin."""
+        if process.returncode is None:
+            try:
+                if _NEW_SESSION:
+                    os.killpg(process.pid, signal.SIGKILL)
+                else:
+                    process.kill()
+            except ProcessLookupError:
+                pass
+        await process.communicate()
+
+    async def output(self, cwd: str, args: list[str], timeout: float | None = None) -> str | None:
+        """stdout nettoyé de `git <args>`, ou None en cas d'échec ou de timeout."""
+        result = await self.run(cwd, args, timeout)
+        return result.stdout.strip() if result.ok else None
+
+    async def run_steps(self, steps: GitSteps, cwd: str, timeout: float | None = None):
+        """Exécute un générateur d'analyse en asyncio et retourne son résultat.
+
+        timeout : par commande, celui du runner par défaut.
+        """
+        try:
+            command = next(steps)
+            while True:
+                command = steps.send(await self.output(cwd, command, timeout))
+        except StopIteration as stop:
+            return stop.value
+
+
+class EventLoopThread:
+    """Boucle asyncio dédiée dans un thread de fond (utilisée par l'interface Tk)."""
+
+    def __init__(self, name: str = "git-loop"):
+        self._name = name
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._lock = threading.Lock()
+
+    def _ensure_started(self) -> asyncio.AbstractEventLoop:
+        with self._lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                thread = threading.Thread(target=self._loop.run_forever, name=self._name, daemon=True)
+                thread.start()
+            return self._loop
+
+    def submit(self, coro) -> Future:
+        """Planifie une coroutine dans la boucle ; retourne un concurrent.futures.Future."""
+        return asyncio.run_coroutine_threadsafe(coro, self._ensure_started())
+
+    def run(self, coro):
+        """Exécute une coroutine dans la boucle et attend son résultat."""
+        return self.submit(coro).result()
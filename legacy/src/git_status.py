@@ -0,0 +1,227 @@
+#!/usr/bin/env python3
+"""
+RepoScan - Analyse de l'état d'un repository Git en deux appels `git`.
+
+Au lieu de lancer une commande par information (branche, statut, avance/retard...),
+on lit tout ce qui concerne le working directory dans une seule sortie
+`git status --porcelain=v2 --branch -z`, et le dernier commit dans un seul `git log -1`.
+"""
+
+from typing import Generator
+
+
+# Commandes utilisées par l'analyseur (sans le préfixe "git")
+# --no-optional-locks : le statut ne réécrit pas l'index (pas de conflit avec un git
+# lancé par l'utilisateur, et pas d'événement parasite pour la surveillance)
+STATUS_COMMAND = ["--no-optional-locks", "status", "--porcelain=v2", "--branch", "-z"]
+LAST_COMMIT_COMMAND = ["log", "-1", "--format=%h%x1f%ct%x1f%s"]
+AHEAD_BEHIND_COMMAND = ["rev-list", "--left-right", "--count", "HEAD...@{upstream}"]
+
+# Séparateur de champs utilisé dans LAST_COMMIT_COMMAND (%x1f)
+_FIELD_SEP = "\x1f"
+
+
+# ─── Modèles ────────────────────────────────────────────────────────────────────
+
+class StatusSummary:
+    """Décompte des fichiers du working directory, par catégorie.
+
+    Un même fichier peut compter dans plusieurs catégories (ex: modifié dans
+    l'index ET dans le working tree compte à la fois en staged et unstaged).
+    """
+
+    __slots__ = ("staged", "unstaged", "untracked", "conflicted", "renamed", "deleted", "modified", "added")
+
+    def __init__(self):
+        self.staged = 0       # Changement présent dans l'index
+        self.unstaged = 0     # Changement présent dans le working tree
+        self.untracked = 0    # Fichiers non suivis
+        self.conflicted = 0   # Fichiers en conflit (merge/rebase)
+        self.renamed = 0      # Renommés ou copiés
+        self.deleted = 0      # Supprimés (index ou working tree)
+        self.modified = 0     # Modifiés (index ou working tree)
+        self.added = 0        # Ajoutés à l'index
+
+    @property
+    def is_clean(self) -> bool:
+        return not (self.staged or self.unstaged or self.untracked or self.conflicted)
+
+    def format(self) -> str:
+        """Formate le statut pour l'affichage : "Clean" ou "M:3 A:1 U:2 [D:1 R:1 C:1]"."""
+        if self.is_clean:
+            return "Clean"
+        text = f"M:{self.modified} A:{self.added} U:{self.untracked}"
+        for label, count in (("D", self.deleted), ("R", self.renamed), ("C", self.conflicted)):
+            if count:
+                text += f" {label}:{count}"
+        return text
+
+    def to_dict(self) -> dict[str, int]:
+        return {field: getattr(self, field) for field in self.__slots__}
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "StatusSummary":
+        summary = cls()
+        for field in cls.__slots__:
+            setattr(summary, field, int(data.get(field, 0)))
+        return summary
+
+
+class BranchInfo:
+    """Informations de branche extraites des en-têtes `# branch.*`."""
+
+    def __init__(self):
+        self.head: str | None = None       # None si HEAD détaché
+        self.oid: str | None = None        # None si aucun commit
+        self.upstream: str | None = None
+        self.ahead: int | None = None      # None si pas d'upstream (ou upstream disparu)
+        self.behind: int | None = None
+
+
+class LastCommit:
+    """Dernier commit de HEAD. timestamp : date du committer (epoch, secondes)."""
+
+    __slots__ = ("short_hash", "timestamp", "subject")
+
+    def __init__(self, short_hash: str, timestamp: int, subject: str):
+        self.short_hash = short_hash
+        self.timestamp = timestamp
+        self.subject = subject
+
+    def format(self) -> str:
+        return f"{self.short_hash} - {self.subject}"
+
+
+# ─── Parsing ────────────────────────────────────────────────────────────────────
+
+def _count_xy(summary: StatusSummary, xy: str):
+    """Applique le code XY (index / working tree) d'une entrée porcelain v2."""
+    x, y = xy[0], xy[1]
+    if x != '.':
+        summary.staged += 1
+    if y != '.':
+        summary.unstaged += 1
+    if 'M' in xy or 'T' in xy:
+        summary.modified += 1
+    if 'D' in xy:
+        summary.deleted += 1
+    if x == 'A':
+        summary.added += 1
+
+
+def parse_porcelain_v2(output: str) -> tuple[BranchInfo, StatusSummary]:
+    """Parse la sortie de `git status --porcelain=v2 --branch -z`.
+
+    Avec -z, chaque entrée est terminée par un NUL, et les entrées de type "2"
+    (renommage/copie) sont suivies d'un champ supplémentaire : le chemin d'origine.
+    """
+    branch = BranchInfo()
+    summary = StatusSummary()
+
+    fields = output.split('\0')
+    i = 0
+    while i < len(fields):
+        entry = fields[i]
+        i += 1
+        if not entry:
+            continue
+
+        kind = entry[0]
+        if kind == '#':
+            parts = entry.split(' ', 2)
+            if len(parts) < 3:
+                continue
+            key, value = parts[1], parts[2]
+            if key == 'branch.oid':
+                branch.oid = None if value == '(initial)' else value
+            elif key == 'branch.head':
+                branch.head = None if value == '(detached)' else value
+            elif key == 'branch.upstream':
+                branch.upstream = value
+            elif key == 'branch.ab':
+                ahead, behind = value.split(' ')
+                branch.ahead = int(ahead.lstrip('+'))
+                branch.behind = int(behind.lstrip('-'))
+        elif kind == '1':
+            _count_xy(summary, entry[2:4])
+        elif kind == '2':
+            _count_xy(summary, entry[2:4])
+            summary.renamed += 1
+            i += 1  # Sauter le chemin d'origine
+        elif kind == 'u':
+            summary.conflicted += 1
+        elif kind == '?':
+            summary.untracked += 1
+
+    return branch, summary
+
+
+def parse_last_commit(output: str) -> LastCommit | None:
+    """Parse la sortie de LAST_COMMIT_COMMAND."""
+    parts = output.split(_FIELD_SEP, 2)
+    if len(parts) != 3:
+        return None
+    try:
+        timestamp = int(parts[1])
+    except ValueError:
+        return None
+    return LastCommit(parts[0], timestamp, parts[2])
+
+
+def parse_ahead_behind(output: str) -> tuple[int, int] | None:
+    """Parse la sortie de AHEAD_BEHIND_COMMAND : "<avance>\t<retard>"."""
+    parts = output.split()
+    if len(parts) != 2:
+        return None
+    try:
+        return int(parts[0]), int(parts[1])
+    except ValueError:
+        return None
+
+
+# ─── Analyse ────────────────────────────────────────────────────────────────────
+
+class RepoState:
+    """Résultat brut de l'analyse d'un repository."""
+
+    def __init__(self):
+        self.branch: BranchInfo | None = None
+        self.status: StatusSummary | None = None
+        self.last_commit: LastCommit | None = None
+        self.remote_url: str | None = None   # Renseigné uniquement par le fast mode
+
+
+def analyze_worktree() -> Generator[list[str], str | None, RepoState]:
+    """Analyse un repository avec deux appels git.
+
+    Générateur (voir git_runner) : produit les arguments de chaque commande (sans "git")
+    et reçoit la sortie standard, ou None si la commande a échoué.
+    """
+    state = RepoState()
+
+    status_output = yield STATUS_COMMAND
+    if status_output is not None:
+        state.branch, state.status = parse_porcelain_v2(status_output)
+
+    # Inutile de lancer git log sur un repository sans commit
+    if state.branch is None or state.branch.oid is not None:
+        commit_output = yield LAST_COMMIT_COMMAND
+        if commit_output:
+            state.last_commit = parse_last_commit(commit_output)
+
+    return state
+
+
+def analyze_sync() -> Generator[list[str], str | None, tuple[tuple[int, int] | None, LastCommit | None]]:
+    """Recalcule uniquement l'avance/retard et le dernier commit (après un fetch).
+
+    Le working directory n'est pas relu : un fetch ne le modifie pas.
+    Retourne ((avance, retard) ou None sans upstream, dernier commit ou None).
+    """
+    ahead_behind_output = yield AHEAD_BEHIND_COMMAND
+    ahead_behind = parse_ahead_behind(ahead_behind_output) if ahead_behind_output else None
+
+    commit_output = yield LAST_COMMIT_COMMAND
+    last_commit = parse_last_commit(commit_output) if commit_output else None
+
+    return ahead_behind, last_commit
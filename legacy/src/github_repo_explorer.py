@@ -2,6 +2,7 @@
 
 import os
 import sys
+import asyncio
 import subprocess
 import tkinter as tk
 from tkinter import ttk, messagebox, filedialog
@@ -12,117 +13,26 @@ from pathlib import Path
 import shutil
 import webbrowser
 import re
+import queue
+from concurrent.futures import Future
 
 # Ajouter le dossier src au path pour l'import relatif
 sys.path.insert(0, str(Path(__file__).parent))
 from config_manager import ConfigManager
-
-class GitRepoInfo:
-    def __init__(self, path, relative_path=None):
-        self.path = path
-        self.name = os.path.basename(path)
-        self.relative_path = relative_path or self.name
-        self.is_git_repo = False
-        self.current_branch = "N/A"
-        self.last_commit = "N/A"
-        self.last_commit_date = "N/A"
-        self.status = "N/A"
-        self.remote_url = "N/A"
-        self.ahead_behind = "N/A"
-        self.depth = self.relative_path.count(os.sep)
-        
-        self._analyze_repo()
-    
-    def _run_git_command(self, command):
-        try:
-            result = subprocess.run(
-                ["git"] + command,
-                cwd=self.path,
-                capture_output=True,
-                text=True,
-                timeout=5
-            )
-            return result.stdout.strip() if result.returncode == 0 else None
-        except (subprocess.SubprocessError, FileNotFoundError):
-            return None
-    
-    def fetch_from_remote(self):
-        """Effectue un git fetch pour ce repository"""
-        if not self.is_git_repo:
-            return {"success": False, "error": "Not a git repository"}
-        
-        try:
-            result = subprocess.run(
-                ["git", "fetch", "--all"],
-                cwd=self.path,
-                capture_output=True,
-                text=True,
-                timeout=30
-            )
-            
-            if result.returncode == 0:
-                # Re-analyser le repository après fetch
-                self._analyze_repo()
-                return {"success": True, "message": "Fetch successful"}
-            else:
-                return {"success": False, "error": result.stderr.strip() or "Fetch failed"}
-                
-        except subprocess.TimeoutExpired:
-            return {"success": False, "error": "Fetch timeout (30s)"}
-        except Exception as e:
-            return {"success": False, "error": str(e)}
-    
-    def _analyze_repo(self):
-        if not os.path.exists(os.path.join(self.path, ".git")):
-            return
-            
-        self.is_git_repo = True
-        
-        # Branche actuelle
-        branch = self._run_git_command(["branch", "--show-current"])
-        if branch:
-            self.current_branch = branch
-        
-        # Dernier commit
-        commit = self._run_git_command(["log", "-1", "--format=%h - %s"])
-        if commit:
-            self.last_commit = commit[:50] + "..." if len(commit) > 50 else commit
-        
-        # Date du dernier commit
-        commit_date = self._run_git_command(["log", "-1", "--format=%cd", "--date=short"])
-        if commit_date:
-            self.last_commit_date = commit_date
-        
-        # Statut
-        status = self._run_git_command(["status", "--porcelain"])
-        if status is not None:
-            if status:
-                lines = status.split('\n')
-                modified = len([l for l in lines if l.startswith(' M')])
-                added = len([l for l in lines if l.startswith('A')])
-                untracked = len([l for l in lines if l.startswith('??')])
-                self.status = f"M:{modified} A:{added} U:{untracked}"
-            else:
-                self.status = "Clean"
-        
-        # URL remote
-        remote = self._run_git_command(["remote", "get-url", "origin"])
-        if remote:
-            self.remote_url = remote
-        
-        # Commits en avance/retard
-        try:
-            ahead = self._run_git_command(["rev-list", "--count", "HEAD@{upstream}..HEAD"])
-            behind = self._run_git_command(["rev-list", "--count", "HEAD..HEAD@{upstream}"])
-            if ahead is not None and behind is not None:
-                self.ahead_behind = f"^{ahead} v{behind}"
-        except:
-            pass
+import git_profiler
+from git_runner import EventLoopThread
+from scan_engine import ScanEngine, resolve_roots, check_roots
+from repo_watcher import RepoWatcher
+from tree_rows import TreeRowModel
+from search_index import SearchIndex
+from pull_executor import UPDATED, SKIPPED
 
 class GitRepoExplorer:
-    def __init__(self, root_path=None):
+    # Délai sans frappe avant d'appliquer la recherche
+    SEARCH_DEBOUNCE_MS = 150
+    
+    def __init__(self, root_path=None, use_daemon=True):
         self.config = ConfigManager()
-        self.root_path = root_path or self.config.get('default_repository_path')
         self.root = tk.Tk()
         # Dynamic application name from config
         self.app_name = self.config.get('app_name', 'RepoScan')
@@ -132,10 +42,41 @@ class GitRepoExplorer:
         self._set_window_icon()
         
         self.repos = []
+        # Découverte, analyse, cache et fetch : partagés avec l'interface console
+        self.engine = ScanEngine(self.config)
+        # root_path, sinon repository_roots, sinon default_repository_path ; une section par racine
+        self.roots = [root for root in self.engine.roots(root_path) if os.path.isdir(root)]
+        self.git_loop = EventLoopThread()
         self.filtered_repos = []
+        # Registre : chemin absolu -> repository (l'item du Treeview donne le chemin via tree_rows)
+        self.repo_by_path = {}
+        self.search_index = SearchIndex()
+        self.search_after_id = None
+        # Scan en arrière-plan : la boucle git pousse ses résultats dans une queue
+        # vidée périodiquement par la boucle Tk
+        self.scan_queue = queue.Queue()
+        self.scan_future = None
+        self.scan_generation = 0
+        self.scan_discovered = 0
+        self.scan_analyzed = 0
+        # Actualisation automatique des repositories modifiés sur disque
+        self.watcher = RepoWatcher.for_config(self.config, self._on_repos_changed)
+        # Daemon de scan (scan_daemon.py) : s'il tourne, il fournit l'état et ses mises à jour
+        # à la place du scan, du watcher, de la mesure des tailles et de l'indexation
+        self.use_daemon = use_daemon
+        self.daemon_link = None
+        self.daemon_backlog = None  # Événements reçus pendant l'affichage d'un état complet
+        self.daemon_attach = None   # Connexion au daemon en cours (jeton de la dernière tentative)
+        # Infobulle des derniers commits (lue via les sessions cat-file du moteur)
+        self.tooltip = None
+        self.tooltip_item = None
+        self.tooltip_after_id = None
+        # Sparklines de l'index d'activité, par chemin (vides tant que l'index n'est pas à jour)
+        self.activity_sparklines = {}
         
         self._setup_ui()
         self._load_repositories()
+        self._schedule_idle_sessions_cleanup()
     
     def _setup_ui(self):
         # Style configuration
@@ -164,7 +105,7 @@ class GitRepoExplorer:
         tk.Label(search_frame, text=">>> Rechercher:", bg='#ecf0f1', font=('Segoe UI', 10)).pack(side='left', padx=(10, 5), pady=15)
         
         self.search_var = tk.StringVar()
-        self.search_var.trace('w', self._on_search)
+        self.search_var.trace('w', self._schedule_search)
         search_entry = tk.Entry(search_frame, textvariable=self.search_var, font=('Segoe UI', 10), width=40)
         search_entry.pack(side='left', padx=5, pady=10)
         
@@ -205,6 +146,30 @@ class GitRepoExplorer:
         )
         fetch_btn.pack(side='right', padx=5, pady=10)
         
+        pull_btn = tk.Button(
+            search_frame, 
+            text=">>> Pull All",
+            command=self._pull_all_repositories,
+            bg='#d35400',
+            fg='white',
+            font=('Segoe UI', 9),
+            relief='flat',
+            padx=15
+        )
+        pull_btn.pack(side='right', padx=5, pady=10)
+        
+        activity_btn = tk.Button(
+            search_frame, 
+            text=">>> Plus actifs",
+            command=self._show_most_active,
+            bg='#16a085',
+            fg='white',
+            font=('Segoe UI', 9),
+            relief='flat',
+            padx=15
+        )
+        activity_btn.pack(side='right', padx=5, pady=10)
+        
         change_folder_btn = tk.Button(
             search_frame, 
             text=">>> Changer Dossier",
@@ -225,8 +190,9 @@ class GitRepoExplorer:
         tree_frame = tk.Frame(main_frame)
         tree_frame.pack(fill='both', expand=True)
         
-        # Colonnes (ajout d'une colonne cachée pour stocker le chemin et l'objet repo)
-        columns = ('name', 'branch', 'status', 'last_commit', 'date', 'ahead_behind', 'remote', 'repo_path')
+        # Colonnes (le chemin de chaque ligne est tenu par TreeRowModel, pas par une colonne)
+        columns = ('name', 'branch', 'status', 'last_commit', 'date', 'ahead_behind', 'activity', 'remote',
+                   'size', 'git_size', 'artifacts')
         self.tree = ttk.Treeview(tree_frame, columns=columns, show='headings', height=20)
         
         # Configuration des colonnes
@@ -236,7 +202,11 @@ class GitRepoExplorer:
         self.tree.heading('last_commit', text='💬 Dernier Commit')
         self.tree.heading('date', text='📅 Date')
         self.tree.heading('ahead_behind', text='↕️ Sync')
+        self.tree.heading('activity', text='📈 Activité')
         self.tree.heading('remote', text='🌐 Remote')
+        self.tree.heading('size', text='💾 Taille')
+        self.tree.heading('git_size', text='🗃️ .git')
+        self.tree.heading('artifacts', text='📦 Artefacts')
         
         self.tree.column('name', width=250, minwidth=200)
         self.tree.column('branch', width=120, minwidth=100)
@@ -244,10 +214,20 @@ class GitRepoExplorer:
         self.tree.column('last_commit', width=300, minwidth=200)
         self.tree.column('date', width=100, minwidth=80)
         self.tree.column('ahead_behind', width=80, minwidth=60)
+        self.tree.column('activity', width=120, minwidth=80)
         self.tree.column('remote', width=200, minwidth=150)
-        # Colonne cachée pour stocker le chemin du repository
-        self.tree.column('repo_path', width=0, minwidth=0, stretch=False)
-        self.tree.heading('repo_path', text='')
+        self.tree.column('size', width=80, minwidth=60, anchor='e')
+        self.tree.column('git_size', width=80, minwidth=60, anchor='e')
+        self.tree.column('artifacts', width=160, minwidth=80)
+        if not self.engine.disk_usage:
+            self.tree.configure(displaycolumns=columns[:-3])
+        # Colonne de l'arbre : seulement l'indicateur pour replier les sections (plusieurs racines)
+        self.tree.column('#0', width=40, minwidth=40, stretch=False)
+        # Lignes mises à jour par différence (identifiants stables par repository)
+        self.tree_rows = TreeRowModel(self.tree)
+        self.tree.tag_configure('clean', background='#d5f4e6')
+        self.tree.tag_configure('modified', background='#ffeaa7')
+        self.tree.tag_configure('section', background='#dfe6e9', font=('Segoe UI', 10, 'bold'))
         
         # Scrollbars
         v_scrollbar = ttk.Scrollbar(tree_frame, orient='vertical', command=self.tree.yview)
@@ -265,6 +245,9 @@ class GitRepoExplorer:
         # Bind double-click et clic droit
         self.tree.bind('<Double-1>', self._on_double_click)
         self.tree.bind('<Button-3>', self._on_right_click)  # Clic droit
+        # Survol : derniers commits du repository
+        self.tree.bind('<Motion>', self._on_tree_motion)
+        self.tree.bind('<Leave>', self._hide_commit_tooltip)
         
         # Raccourcis clavier
         self.tree.bind('<Control-Return>', self._on_ctrl_enter)  # Ctrl+Enter = VS Code
@@ -316,134 +299,445 @@ class GitRepoExplorer:
             # Ne pas bloquer l'application si l'icône n'est pas disponible
             pass
     
-    def _find_all_git_repos(self, root_path, current_path="", max_depth=3):
-        """Trouve récursivement tous les repositories Git"""
-        repos = []
+    def _load_repositories(self):
+        """Lance le scan en arrière-plan ; les lignes apparaissent au fil de l'analyse"""
+        if self.daemon_link:
+            # Le nouvel état arrivera par un événement "snapshot" du daemon
+            if self.daemon_link.send({"op": "rescan"}):
+                self.status_label.config(text="Scan complet demandé au daemon de scan...")
+                return
+            self._detach_daemon()
+        if self.use_daemon and self.engine.daemon:
+            self._attach_daemon()  # Scan local si aucun daemon ne répond
+            return
+        self._scan_locally()
+    
+    def _scan_locally(self):
+        """Scan des racines par l'interface elle-même"""
+        generation = self._begin_scan("Analyse récursive des repositories en cours...")
+        
+        # Appelés depuis la boucle git : uniquement des put() dans la queue
+        put = self.scan_queue.put
+        scan = self.engine.scan_roots(
+            self.roots,
+            on_discovered=lambda root, repo: put((generation, 'discovered', (root, repo))),
+            on_analyzed=lambda root, repo: put((generation, 'analyzed', repo)),
+            on_error=lambda path, e: print(f"Erreur lors de l'analyse de {path}: {str(e)}")
+        )
+        self.scan_future = self.git_loop.submit(scan)
+        self.scan_future.add_done_callback(lambda future: put((generation, 'done', future)))
+        self.root.after(0, self._drain_scan_queue, generation)
+    
+    def _begin_scan(self, status_text):
+        """Vide le tableau pour un nouveau scan (local ou état du daemon) ; retourne sa génération"""
+        # Abandonner un scan précédent encore en cours
+        if self.scan_future and not self.scan_future.done():
+            self.scan_future.cancel()
+        self.scan_generation += 1
+        generation = self.scan_generation
         
-        if current_path.count(os.sep) >= max_depth:
-            return repos
-            
+        self.repos = []
+        self.filtered_repos = []
+        self.repo_by_path = {}
+        self.search_index.clear()
+        self.scan_discovered = 0
+        self.scan_analyzed = 0
+        # Masquer les lignes du scan précédent : leurs items seront réutilisés
+        self.tree_rows.show([])
+        # Plusieurs racines : une section repliable par racine, sinon affichage à plat
+        multi_root = len(self.roots) > 1
+        self.tree.configure(show='tree headings' if multi_root else 'headings')
+        self.tree_rows.set_sections([(root, self._section_row(root)) for root in self.roots] if multi_root else [])
+        self.status_label.config(text=status_text)
+        return generation
+    
+    # ─── Daemon de scan ─────────────────────────────────────────────────────────
+    
+    def _attach_daemon(self):
+        """Se rattache au daemon s'il scanne les mêmes racines ; son état s'affiche sans scan.
+        
+        La connexion (bloquante jusqu'à daemon_timeout_seconds) se fait dans la boucle
+        git ; le résultat revient à la boucle Tk par _on_daemon_attached.
+        """
+        token = self.daemon_attach = object()
+        self.status_label.config(text="Connexion au daemon de scan...")
+        attach = asyncio.to_thread(
+            self.engine.daemon.attach,
+            self.roots,
+            # Thread de lecture de la connexion : tout repasse par la boucle Tk
+            lambda message: self.root.after(0, self._on_daemon_event, message),
+            False
+        )
+        future = self.git_loop.submit(attach)
+        future.add_done_callback(lambda f: self.root.after(0, self._on_daemon_attached, token, f))
+    
+    def _on_daemon_attached(self, token, future):
+        attached = future.result() if future.exception() is None else None
+        if token is not self.daemon_attach:
+            # Une tentative plus récente (Actualiser, changement de dossier) a pris le relais
+            if attached:
+                attached[1].close()
+            return
+        self.daemon_attach = None
+        if attached is None:
+            self._scan_locally()
+            return
+        snapshot, self.daemon_link = attached
+        self._show_daemon_snapshot(snapshot)
+        # Les événements suivants rejoignent daemon_backlog jusqu'à la fin de l'affichage
+        self.daemon_link.start()
+    
+    def _detach_daemon(self):
+        """Repasse en mode local : le watcher de l'interface reprend la surveillance"""
+        link, self.daemon_link = self.daemon_link, None
+        self.daemon_backlog = None
+        self.daemon_attach = None
+        if link:
+            link.close()
+        if self.watcher:
+            self.watcher.watch(repo.path for repo in self.repos if repo.is_git_repo)
+    
+    def _show_daemon_snapshot(self, snapshot):
+        """Affiche un état complet du daemon par le même chemin que les résultats d'un scan"""
+        generation = self._begin_scan("Chargement de l'état du daemon de scan...")
+        # Les mises à jour plus anciennes sont incluses dans ce nouvel état
+        self.daemon_backlog = []
+        sections = self.engine.sections_from_snapshot(snapshot)
+        put = self.scan_queue.put
+        for root, repos in sections:
+            for repo in repos:
+                put((generation, 'discovered', (root, repo)))
+        done = Future()
+        done.set_result(sections)
+        put((generation, 'done', done))
+        self.root.after(0, self._drain_scan_queue, generation)
+    
+    def _on_daemon_event(self, message):
+        event = message.get("event")
+        if event in ("repos", "activity") and self.daemon_backlog is not None:
+            # Lignes pas encore toutes affichées : rejoué à la fin de _drain_scan_queue
+            self.daemon_backlog.append(message)
+        elif event == "snapshot":
+            self._show_daemon_snapshot(message)
+        elif event == "repos":
+            # Repositories ré-analysés ou mesurés par le daemon
+            fresh = [self.engine.repo_from_state(state) for state in message["repos"]]
+            self._replace_repos([(self.repo_by_path[repo.path], repo) for repo in fresh if repo.path in self.repo_by_path])
+        elif event == "activity":
+            if self.engine.activity:
+                self._apply_activity(self.engine.activity_sparklines())
+        elif event == "closed" and self.daemon_link:
+            self._detach_daemon()
+            self.status_label.config(text="Daemon de scan arrêté : actualisation locale (bouton Actualiser pour re-scanner)")
+    
+    def _drain_scan_queue(self, generation):
+        """Intègre dans le Treeview les résultats arrivés depuis le dernier passage"""
+        if generation != self.scan_generation:
+            return  # Un nouveau scan a pris le relais
+        
+        search_term = self.search_var.get().lower()
+        analyzed = []
+        finished = None
         try:
-            full_path = os.path.join(root_path, current_path) if current_path else root_path
-            
-            # Lister tous les éléments et les trier
-            items = sorted([item for item in os.listdir(full_path) if not item.startswith('.')])
-            
-            # Séparer les repos Git directs des dossiers à explorer
-            git_repos = []
-            folders_to_explore = []
-            
-            for item in items:
-                item_path = os.path.join(full_path, item)
-                relative_path = os.path.join(current_path, item) if current_path else item
-                
-                if os.path.isdir(item_path):
-                    if os.path.exists(os.path.join(item_path, ".git")):
-                        repo_info = GitRepoInfo(item_path, relative_path)
-                        git_repos.append(repo_info)
-                    else:
-                        folders_to_explore.append((item, item_path, relative_path))
-            
-            # Ajouter d'abord les repos Git du niveau actuel
-            repos.extend(git_repos)
-            
-            # Puis explorer les dossiers et ajouter leurs contenus
-            for item, item_path, relative_path in folders_to_explore:
-                sub_repos = self._find_all_git_repos(root_path, relative_path, max_depth)
-                
-                # Si le dossier contient des repos Git, l'ajouter comme parent
-                if sub_repos and any(repo.is_git_repo for repo in sub_repos):
-                    folder_info = GitRepoInfo(item_path, relative_path)
-                    repos.append(folder_info)  # Ajouter le parent
-                    repos.extend(sub_repos)    # Puis ses enfants
-                elif current_path.count(os.sep) < 1:  # Garder les dossiers de premier niveau même vides
-                    folder_info = GitRepoInfo(item_path, relative_path)
-                    repos.append(folder_info)
-                        
-        except Exception as e:
-            print(f"Erreur lors de l'analyse de {current_path}: {str(e)}")
-            
-        return repos
+            for _ in range(500):  # Borne le travail par passage pour garder l'UI fluide
+                event_generation, kind, payload = self.scan_queue.get_nowait()
+                if event_generation != generation:
+                    continue
+                if kind == 'discovered':
+                    root, repo = payload
+                    self.repos.append(repo)
+                    self.repo_by_path[repo.path] = repo
+                    self.search_index.add(repo)
+                    if repo.is_git_repo:
+                        self.scan_discovered += 1
+                    self.tree_rows.set_row(repo.path, *self._repo_row(repo), self.tree_rows.section_for(root))
+                    if self.search_index.matches(repo, search_term):
+                        self.filtered_repos.append(repo)
+                        self.tree_rows.append(repo.path)
+                elif kind == 'analyzed':
+                    self.scan_analyzed += 1
+                    analyzed.append(payload)
+                else:
+                    finished = payload
+                    break
+        except queue.Empty:
+            pass
+        
+        if analyzed:
+            self._refresh_repo_rows(analyzed)
+        
+        if finished is None:
+            self.status_label.config(
+                text=f"Analyse en cours... {self.scan_analyzed}/{self.scan_discovered} repositories analysés"
+            )
+            self.root.after(50, self._drain_scan_queue, generation)
+            return
+        
+        if finished.cancelled():
+            return
+        if finished.exception() is not None:
+            self.status_label.config(text=f"Erreur lors de l'analyse: {finished.exception()}")
+            return
+        
+        sections = finished.result()
+        if not self.daemon_link:
+            self.engine.finish_scan(sections)
+        if len(sections) > 1:
+            self.tree_rows.set_sections([
+                (root, self._section_row(root, sum(1 for repo in repos if repo.is_git_repo)))
+                for root, repos in sections
+            ])
+        
+        # Doublons entre racines tranchés en fin de scan : leurs lignes provisoires disparaissent
+        kept = {repo.path for _, repos in sections for repo in repos}
+        if len(kept) != len(self.repos):
+            self.repos = [repo for repo in self.repos if repo.path in kept]
+            self.filtered_repos = [repo for repo in self.filtered_repos if repo.path in kept]
+            self.repo_by_path = {repo.path: repo for repo in self.repos}
+            self.search_index.retain(kept)
+            self.scan_discovered = sum(1 for repo in self.repos if repo.is_git_repo)
+        
+        # Supprimer les lignes des repositories qui ont disparu
+        self.tree_rows.retain(repo.path for repo in self.repos)
+        
+        # Ré-appliquer la recherche : branche et commit n'étaient pas connus à la découverte
+        if search_term:
+            self._on_search()
+        self._update_status_label()
+        
+        if self.daemon_link:
+            # Le daemon surveille, mesure et indexe : seules les sparklines sont relues
+            if self.engine.activity:
+                self._apply_activity(self.engine.activity_sparklines())
+            backlog, self.daemon_backlog = self.daemon_backlog or [], None
+            for message in backlog:
+                self._on_daemon_event(message)
+            return
+        if self.watcher:
+            self.watcher.watch(repo.path for repo in self.repos if repo.is_git_repo)
+        self._index_activity([repo for repo in self.repos if repo.is_git_repo])
+        self._measure_disk_usage(generation)
     
-    def _load_repositories(self):
-        self.status_label.config(text="Analyse récursive des repositories en cours...")
-        self.root.update()
+    def _on_repos_changed(self, paths):
+        """Appelé par le watcher (thread de fond) : ré-analyse uniquement les repositories modifiés"""
+        repo_by_path = self.repo_by_path
+        changed = [repo_by_path[path] for path in paths if path in repo_by_path]
+        if changed:
+            future = self.git_loop.submit(self.engine.reanalyze(changed))
+            future.add_done_callback(
+                lambda f: f.exception() is None and self.root.after(0, self._replace_repos, f.result())
+            )
+    
+    def _replace_repos(self, replacements):
+        """Remplace les repositories ré-analysés dans les listes et met à jour leurs lignes"""
+        replaced = []
+        for old, fresh in replacements:
+            if self.repo_by_path.get(old.path) is not old:
+                continue  # Un nouveau scan a remplacé ce repository entre-temps
+            for repos in (self.repos, self.filtered_repos):
+                if old in repos:
+                    repos[repos.index(old)] = fresh
+            self.repo_by_path[fresh.path] = fresh
+            self.search_index.replace(old, fresh)
+            replaced.append(fresh)
+        self._refresh_repo_rows(replaced)
+        self._update_status_label()
+        # Un commit ou un changement de branche : seuls les nouveaux commits sont indexés
+        self._index_activity(replaced)
+    
+    def _index_activity(self, repos):
+        """Met à jour l'index d'activité en arrière-plan, puis la colonne Activité"""
+        if not self.engine.activity or not repos or self.daemon_link:
+            return  # Rattaché au daemon : il indexe, puis envoie un événement "activity"
+        
+        async def index():
+            await self.engine.index_activity(repos)
+            return self.engine.activity_sparklines()
+        
+        future = self.git_loop.submit(index())
+        future.add_done_callback(
+            lambda f: f.exception() is None and self.root.after(0, self._apply_activity, f.result())
+        )
+    
+    def _measure_disk_usage(self, generation):
+        """Mesure les tailles en arrière-plan ; chaque ligne est mise à jour dès que son repository est mesuré"""
+        if not self.engine.disk_usage:
+            return
         
-        self.repos = self._find_all_git_repos(self.root_path)
+        def measured(repo):
+            if generation == self.scan_generation:
+                self.root.after(0, self._refresh_repo_rows, [repo])
         
-        self.filtered_repos = self.repos[:]
-        self._update_tree()
+        # Un nouveau scan interrompt la mesure (le cache garde ce qui a été mesuré)
+        self.git_loop.submit(self.engine.measure_disk_usage(
+            self.repos, measured, lambda: generation != self.scan_generation
+        ))
+    
+    def _apply_activity(self, sparklines):
+        self.activity_sparklines = sparklines
+        # Seules les lignes dont la sparkline a changé touchent le Treeview
+        self._refresh_repo_rows([repo for repo in self.repos if repo.is_git_repo])
+    
+    def _show_most_active(self):
+        """Fenêtre des repositories les plus actifs des 7 derniers jours (requête sur l'index local)"""
+        if not self.engine.activity:
+            messagebox.showinfo("Activité", "L'index d'activité est désactivé (activity_index dans config.json).")
+            return
         
+        git_repos = {repo.path: repo for repo in self.repos if repo.is_git_repo}
+        ranking = [(path, count) for path, count in self.engine.activity.most_active(7, len(git_repos))
+                   if path in git_repos][:20]
+        
+        window = tk.Toplevel(self.root)
+        window.title("Repositories les plus actifs - 7 derniers jours")
+        window.geometry("700x450")
+        window.transient(self.root)
+        
+        columns = ('commits', 'activity', 'name')
+        ranking_tree = ttk.Treeview(window, columns=columns, show='headings')
+        ranking_tree.heading('commits', text='Commits (7 j)')
+        ranking_tree.heading('activity', text=f"📈 {self.config.get('activity_sparkline_days', 14)} jours")
+        ranking_tree.heading('name', text='📁 Repository')
+        ranking_tree.column('commits', width=100, anchor='e', stretch=False)
+        ranking_tree.column('activity', width=140, stretch=False)
+        ranking_tree.column('name', width=420)
+        ranking_tree.pack(fill='both', expand=True, padx=10, pady=10)
+        
+        for path, count in ranking:
+            ranking_tree.insert('', 'end', values=(count, self.activity_sparklines.get(path, ""), git_repos[path].relative_path))
+        if not ranking:
+            ranking_tree.insert('', 'end', values=("", "", "Aucun commit ces 7 derniers jours"))
+    
+    def _update_status_label(self):
         git_repos_count = sum(1 for repo in self.repos if repo.is_git_repo)
         folder_count = len(self.repos) - git_repos_count
-        clean_repos = sum(1 for repo in self.repos if repo.is_git_repo and repo.status == "Clean")
-        modified_repos = sum(1 for repo in self.repos if repo.is_git_repo and "M:" in repo.status)
+        clean_repos = sum(1 for repo in self.repos if repo.is_clean)
+        modified_repos = sum(1 for repo in self.repos if repo.is_modified)
         
+        roots = f" | {len(self.roots)} racines" if len(self.roots) > 1 else ""
+        daemon = " | daemon" if self.daemon_link else ""
         self.status_label.config(
-            text=f">>> {git_repos_count} repos Git ({clean_repos}[OK] {modified_repos}[MOD]) | {folder_count} dossiers | Maj: {datetime.now().strftime('%H:%M:%S')} | Double-clic pour ouvrir"
+            text=f">>> {git_repos_count} repos Git ({clean_repos}[OK] {modified_repos}[MOD]) | {folder_count} dossiers{roots}{daemon} | Maj: {datetime.now().strftime('%H:%M:%S')} | Double-clic pour ouvrir"
+        )
+    
+    def _section_row(self, root, git_count=None):
+        """Valeurs de la ligne de section d'une racine (nombre de repositories une fois le scan terminé)"""
+        count = "analyse..." if git_count is None else f"{git_count} repos Git"
+        return (f"[ROOT] {root} ({count})",) + ("",) * (len(self.tree['columns']) - 1)
+    
+    def _repo_row(self, repo):
+        """Retourne (valeurs, tags) de la ligne du Treeview pour un repository"""
+        icon = "[DIR]" if not repo.is_git_repo else "[GIT]"
+        indent = "  " * repo.depth
+        
+        # Couleur selon le statut
+        tags = []
+        if repo.is_clean:
+            tags = ['clean']
+        elif repo.is_modified:
+            tags = ['modified']
+        
+        values = (
+            f"{icon} {indent}{repo.relative_path}",
+            repo.branch_label(),
+            repo.status_label(),
+            repo.commit_label(),
+            repo.commit_date_label(),
+            repo.sync_label(),
+            self.activity_sparklines.get(repo.path, ""),
+            repo.remote_label(),
+            repo.worktree_size_label() if repo.is_git_repo else "",
+            repo.git_size_label() if repo.is_git_repo else "",
+            repo.artifacts_size_label() if repo.is_git_repo else ""
         )
+        return values, tags
+    
+    def _refresh_repo_rows(self, repos):
+        """Met à jour uniquement les lignes des repositories donnés, sans re-scan"""
+        for repo in repos:
+            self.tree_rows.set_row(repo.path, *self._repo_row(repo))
+            self.search_index.update(repo)
     
     def _update_tree(self):
-        # Vider le tree
-        for item in self.tree.get_children():
-            self.tree.delete(item)
-        
-        # Ajouter les repositories - Garder l'ordre hiérarchique
-        for repo in self.filtered_repos:
-            icon = "[DIR]" if not repo.is_git_repo else "[GIT]"
-            indent = "  " * repo.depth
-            
-            # Couleur selon le statut
-            tags = []
-            if repo.is_git_repo:
-                if repo.status == "Clean":
-                    tags = ['clean']
-                elif "M:" in repo.status:
-                    tags = ['modified']
-            
-            self.tree.insert('', 'end', values=(
-                f"{icon} {indent}{repo.relative_path}",
-                repo.current_branch,
-                repo.status,
-                repo.last_commit,
-                repo.last_commit_date,
-                repo.ahead_behind,
-                repo.remote_url.split('/')[-1].replace('.git', '') if repo.remote_url != "N/A" else "N/A",
-                repo.path  # Chemin complet stocké dans la colonne cachée
-            ), tags=tags)
-        
-        # Configuration des tags
-        self.tree.tag_configure('clean', background='#d5f4e6')
-        self.tree.tag_configure('modified', background='#ffeaa7')
+        # Les lignes sont tenues à jour par _refresh_repo_rows : il ne reste qu'à
+        # afficher filtered_repos dans l'ordre hiérarchique (détacher / ré-attacher)
+        self.tree_rows.show(repo.path for repo in self.filtered_repos)
+    
+    def _schedule_search(self, *args):
+        """Debounce : la recherche n'est appliquée qu'après une pause dans la frappe"""
+        if self.search_after_id is not None:
+            self.root.after_cancel(self.search_after_id)
+        self.search_after_id = self.root.after(self.SEARCH_DEBOUNCE_MS, self._on_search)
     
     def _on_search(self, *args):
-        search_term = self.search_var.get().lower()
-        if not search_term:
-            self.filtered_repos = self.repos[:]
-        else:
-            self.filtered_repos = [
-                repo for repo in self.repos 
-                if search_term in repo.relative_path.lower() or 
-                   search_term in repo.current_branch.lower() or
-                   search_term in repo.last_commit.lower()
-            ]
+        self.search_after_id = None
+        self.filtered_repos = self.search_index.query(self.search_var.get())
         self._update_tree()
     
     def _get_repo_info_from_item(self, item):
         """Récupère les informations du repository à partir d'un item du Treeview"""
-        try:
-            values = self.tree.item(item)['values']
-            if len(values) < 8:  # Vérifier qu'on a toutes les colonnes
-                return None
-            
-            repo_path = values[7]  # Chemin complet depuis la colonne cachée
-            # Chercher l'objet GitRepoInfo correspondant
-            for repo in self.filtered_repos:
-                if repo.path == repo_path:
-                    return repo
-            return None
-        except:
-            return None
+        return self.repo_by_path.get(self.tree_rows.path_for(item))
+    
+    def _on_tree_motion(self, event):
+        """Survol d'une ligne : infobulle des derniers commits après un court délai"""
+        item = self.tree.identify_row(event.y)
+        if item == self.tooltip_item:
+            return
+        self._hide_commit_tooltip()
+        self.tooltip_item = item
+        repo = self._get_repo_info_from_item(item) if item else None
+        if repo and repo.is_git_repo:
+            self.tooltip_after_id = self.root.after(600, self._load_commit_tooltip, item, repo)
+    
+    def _load_commit_tooltip(self, item, repo):
+        self.tooltip_after_id = None
+        future = self.git_loop.submit(self.engine.recent_commits(repo))
+        future.add_done_callback(lambda f: self.root.after(0, self._show_commit_tooltip, item, repo, f))
+    
+    def _show_commit_tooltip(self, item, repo, future):
+        # La souris a pu quitter la ligne pendant la lecture
+        if item != self.tooltip_item or self.tooltip or future.cancelled() or future.exception():
+            return
+        commits = future.result()
+        if not commits:
+            return
+        
+        lines = [f"Derniers commits de {repo.relative_path} ({repo.current_branch or 'HEAD détaché'})"]
+        for commit in commits:
+            date = datetime.fromtimestamp(commit.timestamp).strftime('%Y-%m-%d %H:%M')
+            subject = commit.subject if len(commit.subject) <= 72 else commit.subject[:69] + "..."
+            lines.append(f"{commit.short_hash}  {date}  {subject}")
+        
+        self.tooltip = tk.Toplevel(self.root)
+        self.tooltip.overrideredirect(True)
+        self.tooltip.geometry(f"+{self.root.winfo_pointerx() + 16}+{self.root.winfo_pointery() + 12}")
+        tk.Label(
+            self.tooltip,
+            text="\n".join(lines),
+            justify='left',
+            bg='#ffffe0',
+            relief='solid',
+            borderwidth=1,
+            font=('Consolas', 9),
+            padx=6,
+            pady=4
+        ).pack()
+    
+    def _hide_commit_tooltip(self, event=None):
+        if self.tooltip_after_id:
+            self.root.after_cancel(self.tooltip_after_id)
+            self.tooltip_after_id = None
+        if self.tooltip:
+            self.tooltip.destroy()
+            self.tooltip = None
+        self.tooltip_item = None
+    
+    def _schedule_idle_sessions_cleanup(self):
+        """Ferme périodiquement les sessions cat-file inutilisées depuis cat_file_idle_seconds"""
+        idle_seconds = self.engine.objects.idle_seconds
+        if idle_seconds > 0:
+            self.engine.objects.close_idle()
+            self.root.after(int(idle_seconds * 1000), self._schedule_idle_sessions_cleanup)
     
     def _on_double_click(self, event):
         selection = self.tree.selection()
@@ -526,7 +820,7 @@ class GitRepoExplorer:
         )
         
         # Option 4: Ouvrir sur GitHub (conditionnel)
-        if repo_info.is_git_repo and repo_info.remote_url and repo_info.remote_url != "N/A":
+        if repo_info.is_git_repo and repo_info.remote_url:
             context_menu.add_command(
                 label="🌐 Ouvrir sur GitHub",
                 command=lambda: self._open_in_github(repo_info.remote_url)
@@ -806,11 +1100,15 @@ class GitRepoExplorer:
                         • M:X = X fichiers modifies
                         • A:X = X fichiers ajoutes (staged)
                         • U:X = X fichiers non trackes
+                        • D:X / R:X / C:X = supprimes / renommes / en conflit (si > 0)
    Last Commit       -> Hash et message du dernier commit
    Date              -> Date du dernier commit
    Sync              -> Synchronisation avec origin:
                         • ^N = N commits en avance (a push)
                         • vN = N commits en retard (a pull)
+   Activite          -> Commits par jour sur les derniers jours (index local)
+   Taille / .git     -> Espace disque du working tree (hors .git et artefacts) et de .git
+   Artefacts         -> node_modules, target, dist... (dossier le plus lourd)
    Remote            -> Nom du repository distant
 
 >>> CODES COULEUR:
@@ -819,6 +1117,7 @@ class GitRepoExplorer:
 
 >>> ACTIONS DISPONIBLES:
    • Double-clic sur une ligne -> Ouvre le dossier dans l'explorateur
+   • Survol d'une ligne -> Infobulle des derniers commits
    • CLIC DROIT sur une ligne -> Menu contextuel avec options:
      ┌─ 📁 Ouvrir dans l'Explorateur
      ├─ 💻 Ouvrir dans VS Code
@@ -830,6 +1129,9 @@ class GitRepoExplorer:
    • Barre de recherche -> Filtre par nom, branche ou commit
    • Bouton Actualiser -> Recharge les informations
    • Bouton Fetch All -> Synchronise tous les repos avec origin
+   • Bouton Pull All -> Fast-forward des repos en retard (propres, avec upstream, non diverges)
+   • Daemon de scan (src/scan_daemon.py) -> Etat affiche sans scan au lancement, tenu a jour par le daemon
+   • Bouton Plus actifs -> Classement des repos par commits sur 7 jours
 
 >>> EXEMPLES CONCRETS:
    [DIR] sales-maki                    -> Dossier contenant 6 repositories
@@ -865,17 +1167,14 @@ class GitRepoExplorer:
         )
         close_btn.pack(pady=10)
     
-    def _fetch_all_repositories(self):
-        """Lance le fetch pour tous les repositories Git avec une fenêtre de progression"""
-        git_repos = [repo for repo in self.repos if repo.is_git_repo]
+    def _create_progress_window(self, title, heading, total, preparing_text):
+        """Fenêtre de progression d'une opération sur tous les repositories (Fetch All, Pull All).
         
-        if not git_repos:
-            messagebox.showinfo("Information", "Aucun repository Git trouvé à synchroniser.")
-            return
-        
-        # Créer la fenêtre de progression
+        Retourne (fenêtre, barre, label de statut, zone de logs, bouton annuler, bouton fermer, annulé),
+        annulé étant un dict {'value': bool} mis à True par le bouton "Annuler".
+        """
         progress_window = tk.Toplevel(self.root)
-        progress_window.title("Fetch All Repositories")
+        progress_window.title(title)
         progress_window.geometry("600x400")
         progress_window.configure(bg='#f8f9fa')
         progress_window.transient(self.root)
@@ -890,7 +1189,7 @@ class GitRepoExplorer:
         # Interface de la fenêtre de progression
         tk.Label(
             progress_window,
-            text=">>> Synchronisation des repositories avec origin",
+            text=heading,
             font=('Segoe UI', 12, 'bold'),
             bg='#f8f9fa',
             fg='#2c3e50'
@@ -906,12 +1205,12 @@ class GitRepoExplorer:
         global_progress = ttk.Progressbar(progress_frame, length=400, mode='determinate')
         global_progress.pack(fill='x', pady=5)
         
-        global_progress['maximum'] = len(git_repos)
+        global_progress['maximum'] = total
         
         # Label de statut
         status_label = tk.Label(
             progress_window,
-            text=f"Preparation du fetch pour {len(git_repos)} repositories...",
+            text=preparing_text,
             bg='#f8f9fa',
             font=('Segoe UI', 10)
         )
@@ -972,60 +1271,151 @@ class GitRepoExplorer:
             logs_text.see('end')
         
         cancel_btn.config(command=cancel_operation)
+        return progress_window, global_progress, status_label, logs_text, cancel_btn, close_btn, cancelled
+    
+    def _fetch_all_repositories(self):
+        """Lance le fetch pour tous les repositories Git avec une fenêtre de progression"""
+        git_repos = [repo for repo in self.repos if repo.is_git_repo]
         
-        # Fonction pour effectuer le fetch en arrière-plan
-        import threading
+        if not git_repos:
+            messagebox.showinfo("Information", "Aucun repository Git trouvé à synchroniser.")
+            return
         
-        def fetch_worker():
-            success_count = 0
-            error_count = 0
-            
-            for i, repo in enumerate(git_repos):
-                if cancelled['value']:
-                    break
-                
-                # Mettre à jour l'interface
-                progress_window.after(0, lambda r=repo: status_label.config(
-                    text=f"Fetch en cours: {r.relative_path}..."
-                ))
-                progress_window.after(0, lambda: logs_text.insert('end', f"\n[*] Fetch: {repo.relative_path}\n"))
-                progress_window.after(0, lambda: logs_text.see('end'))
-                
-                # Effectuer le fetch
-                result = repo.fetch_from_remote()
-                
-                if result['success']:
-                    success_count += 1
-                    progress_window.after(0, lambda r=repo: logs_text.insert('end', f"    [+] {r.relative_path}: OK\n"))
-                else:
-                    error_count += 1
-                    progress_window.after(0, lambda r=repo, err=result['error']: logs_text.insert('end', f"    [!] {r.relative_path}: {err}\n"))
-                
-                # Mettre à jour la progression
-                progress_window.after(0, lambda v=i+1: global_progress.config(value=v))
-                progress_window.after(0, lambda: logs_text.see('end'))
+        progress_window, global_progress, status_label, logs_text, cancel_btn, close_btn, cancelled = (
+            self._create_progress_window(
+                "Fetch All Repositories",
+                ">>> Synchronisation des repositories avec origin",
+                len(git_repos),
+                f"Preparation du fetch pour {len(git_repos)} repositories..."
+            )
+        )
+        
+        # Fetch parallèle dans la boucle asyncio de fond : les résultats arrivent
+        # dans l'ordre où les fetchs se terminent
+        fetch_executor = self.engine.fetch_executor()
+        counters = {'done': 0, 'success': 0, 'error': 0}
+        
+        logs_text.insert('end', (
+            f"[*] {len(git_repos)} repositories | {fetch_executor.concurrency} en parallele "
+            f"({fetch_executor.per_host} max par hote) | timeout {fetch_executor.timeout}s\n"
+        ))
+        
+        def on_result(result):
+            counters['done'] += 1
+            if result.success:
+                counters['success'] += 1
+                line = f"    [+] {result.repo.relative_path}: OK ({result.duration:.1f}s)\n"
+            else:
+                counters['error'] += 1
+                line = f"    [!] {result.repo.relative_path}: {result.error}\n"
+            done = counters['done']
+            progress_window.after(0, lambda l=line: logs_text.insert('end', l))
+            # Mettre à jour la ligne du repository dès la fin de son fetch
+            progress_window.after(0, lambda r=result.repo: self._refresh_repo_rows([r]))
+            progress_window.after(0, lambda v=done: global_progress.config(value=v))
+            progress_window.after(0, lambda v=done: status_label.config(
+                text=f"Fetch en cours: {v}/{len(git_repos)} termines..."
+            ))
+            progress_window.after(0, lambda: logs_text.see('end'))
+        
+        def on_finished(future):
+            success_count, error_count = counters['success'], counters['error']
             
             # Finaliser
-            if cancelled['value']:
+            if cancelled['value'] or future.cancelled() or future.exception():
                 final_msg = f"\n>>> Fetch annule apres {success_count + error_count}/{len(git_repos)} repositories"
             else:
                 final_msg = f"\n>>> Fetch termine: {success_count} succes, {error_count} erreurs sur {len(git_repos)} repositories"
             
             progress_window.after(0, lambda: logs_text.insert('end', final_msg + "\n"))
             progress_window.after(0, lambda: logs_text.see('end'))
-            progress_window.after(0, lambda: status_label.config(text="Fetch terminé - Actualisation des données..."))
             
-            # Actualiser l'affichage principal
-            progress_window.after(0, self._load_repositories)
+            # Les lignes ont été mises à jour au fil des fetchs : seuls les compteurs restent à rafraîchir
+            progress_window.after(0, self._update_status_label)
             
             # Réactiver le bouton fermer
             progress_window.after(0, lambda: close_btn.config(state='normal'))
             progress_window.after(0, lambda: cancel_btn.config(state='disabled'))
             progress_window.after(0, lambda: status_label.config(text=f"Terminé: {success_count} succès, {error_count} erreurs"))
         
-        # Lancer le thread de fetch
-        fetch_thread = threading.Thread(target=fetch_worker, daemon=True)
-        fetch_thread.start()
+        # Lancer le fetch dans la boucle de fond
+        future = self.git_loop.submit(
+            self.engine.fetch_all(git_repos, on_result, lambda: cancelled['value'], fetch_executor)
+        )
+        future.add_done_callback(on_finished)
+    
+    def _pull_all_repositories(self):
+        """Avance (fast-forward uniquement) les repositories en retard, avec une fenêtre de progression"""
+        git_repos = [repo for repo in self.repos if repo.is_git_repo]
+        
+        if not git_repos:
+            messagebox.showinfo("Information", "Aucun repository Git trouvé à mettre à jour.")
+            return
+        
+        progress_window, global_progress, status_label, logs_text, cancel_btn, close_btn, cancelled = (
+            self._create_progress_window(
+                "Pull All Repositories",
+                ">>> Fast-forward des repositories en retard sur leur upstream",
+                len(git_repos),
+                f"Verification de {len(git_repos)} repositories..."
+            )
+        )
+        
+        # Vérifications puis pulls dans la boucle asyncio de fond : les résultats
+        # (ignorés compris) arrivent dans l'ordre où ils se terminent
+        pull_executor = self.engine.pull_executor()
+        counters = {'done': 0, 'updated': 0, 'skipped': 0, 'error': 0}
+        
+        logs_text.insert('end', (
+            f"[*] {len(git_repos)} repositories | {pull_executor.concurrency} en parallele "
+            f"| timeout {pull_executor.timeout}s\n"
+            f"[*] Ignores: modifications locales, HEAD detache, sans upstream, diverges, a jour\n"
+        ))
+        
+        def on_result(result):
+            counters['done'] += 1
+            if result.outcome == UPDATED:
+                counters['updated'] += 1
+                line = f"    [+] {result.repo.relative_path}: {result.message} ({result.duration:.1f}s)\n"
+            elif result.outcome == SKIPPED:
+                counters['skipped'] += 1
+                line = f"    [-] {result.repo.relative_path}: ignore ({result.message})\n"
+            else:
+                counters['error'] += 1
+                line = f"    [!] {result.repo.relative_path}: {result.message}\n"
+            done = counters['done']
+            progress_window.after(0, lambda l=line: logs_text.insert('end', l))
+            if result.outcome == UPDATED:
+                # Mettre à jour la ligne du repository dès la fin de son pull
+                progress_window.after(0, lambda r=result.repo: self._refresh_repo_rows([r]))
+            progress_window.after(0, lambda v=done: global_progress.config(value=v))
+            progress_window.after(0, lambda v=done: status_label.config(
+                text=f"Pull en cours: {v}/{len(git_repos)} traites..."
+            ))
+            progress_window.after(0, lambda: logs_text.see('end'))
+        
+        def on_finished(future):
+            updated, skipped, errors = counters['updated'], counters['skipped'], counters['error']
+            
+            if cancelled['value'] or future.cancelled() or future.exception():
+                final_msg = f"\n>>> Pull annule apres {counters['done']}/{len(git_repos)} repositories"
+            else:
+                final_msg = (f"\n>>> Pull termine: {updated} mis a jour, {skipped} ignores, "
+                             f"{errors} erreurs sur {len(git_repos)} repositories")
+            
+            progress_window.after(0, lambda: logs_text.insert('end', final_msg + "\n"))
+            progress_window.after(0, lambda: logs_text.see('end'))
+            progress_window.after(0, self._update_status_label)
+            progress_window.after(0, lambda: close_btn.config(state='normal'))
+            progress_window.after(0, lambda: cancel_btn.config(state='disabled'))
+            progress_window.after(0, lambda: status_label.config(
+                text=f"Terminé: {updated} mis à jour, {skipped} ignorés, {errors} erreurs"
+            ))
+        
+        future = self.git_loop.submit(
+            self.engine.pull_all(git_repos, on_result, lambda: cancelled['value'], pull_executor)
+        )
+        future.add_done_callback(on_finished)
     
     def _refresh_repositories(self):
         self._load_repositories()
@@ -1034,11 +1424,13 @@ class GitRepoExplorer:
         """Permet de changer le dossier racine à explorer"""
         new_folder = filedialog.askdirectory(
             title="Sélectionner le dossier contenant les repositories Git",
-            initialdir=self.root_path
+            initialdir=self.roots[0] if self.roots else None
         )
         
-        if new_folder and new_folder != self.root_path:
-            self.root_path = new_folder
+        if new_folder and [os.path.abspath(new_folder)] != self.roots:
+            self.roots = [os.path.abspath(new_folder)]
+            # Le daemon ne scanne que ses racines configurées
+            self._detach_daemon()
             
             # Sauvegarder le nouveau chemin dans la config
             self.config.set('default_repository_path', new_folder)
@@ -1050,13 +1442,18 @@ class GitRepoExplorer:
             # Recharger les repositories
             self._load_repositories()
             
-            messagebox.showinfo(
-                "Dossier changé", 
-                f"Nouveau dossier sélectionné:\n{new_folder}\n\nLe chemin a été sauvegardé dans la configuration."
-            )
+            message = f"Nouveau dossier sélectionné:\n{new_folder}\n\nLe chemin a été sauvegardé dans la configuration."
+            if self.config.get('repository_roots'):
+                message += "\n\nAu prochain lancement, repository_roots reste prioritaire."
+            messagebox.showinfo("Dossier changé", message)
     
     def run(self):
         self.root.mainloop()
+        if self.daemon_link:
+            self.daemon_link.close()
+        if self.watcher:
+            self.watcher.stop()
+        self.engine.close()
 
 def main():
     # Parse des arguments de ligne de commande
@@ -1068,6 +1465,7 @@ Exemples d'utilisation:
   python3 github_repo_explorer.py                    # Utilise le chemin configuré
   python3 github_repo_explorer.py /path/to/repos     # Utilise un chemin spécifique
   python3 github_repo_explorer.py --config           # Affiche la configuration actuelle
+  python3 github_repo_explorer.py --profile --profile-trace trace.json  # Mesure les commandes git
         """
     )
     
@@ -1083,7 +1481,26 @@ Exemples d'utilisation:
         help='Affiche la configuration actuelle et quitte'
     )
     
+    parser.add_argument(
+        '--no-daemon',
+        action='store_true',
+        help="Scanne localement même si un daemon de scan (scan_daemon.py) est en cours"
+    )
+    
+    parser.add_argument(
+        '--profile',
+        action='store_true',
+        help='Mesure chaque commande git et affiche un rapport (durées par commande et par repository) en quittant'
+    )
+    
+    parser.add_argument(
+        '--profile-trace',
+        metavar='FICHIER',
+        help='Écrit les commandes git mesurées au format Chrome trace event (chrome://tracing, Perfetto)'
+    )
+    
     args = parser.parse_args()
+    git_profiler.enable_cli_report(args.profile, args.profile_trace)
     
     # Gérer l'option --config
     if args.config:
@@ -1093,13 +1510,11 @@ Exemples d'utilisation:
         print(f"\nFichier de configuration: {os.path.abspath(config.config_file)}")
         return
     
-    # Déterminer le chemin à utiliser
+    # Déterminer les racines à utiliser (argument, repository_roots ou default_repository_path)
     config = ConfigManager()
-    root_path = args.path or config.get('default_repository_path')
+    roots = check_roots(resolve_roots(config, args.path))
     
-    # Vérifier que le chemin existe
-    if not os.path.exists(root_path):
-        print(f"❌ Erreur: Le chemin '{root_path}' n'existe pas.")
+    if not roots:
         print(f"\nSolutions:")
         print(f"• Vérifiez le chemin dans le fichier config.json")
         print(f"• Utilisez: python3 {sys.argv[0]} /chemin/vers/vos/repos")
@@ -1107,9 +1522,10 @@ Exemples d'utilisation:
         sys.exit(1)
     
     print(f"🚀 Lancement de RepoScan")
-    print(f"📁 Dossier à explorer: {root_path}")
+    for root in roots:
+        print(f"📁 Dossier à explorer: {root}")
     
-    app = GitRepoExplorer(root_path)
+    app = GitRepoExplorer(args.path, not args.no_daemon)
     app.run()
 
 if __name__ == "__main__":
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+RepoScan - Tableau console redessiné sur place (mode --watch).
+
+Le tableau est affiché une fois dans l'écran alternatif du terminal, puis seules
+les lignes dont une valeur a changé sont réécrites, en plaçant le curseur sur
+leur ligne (séquences ANSI/VT100). La ligne de résumé, en bas, n'est réécrite
+que si son texte change : au repos, rien n'est écrit sur le terminal.
+
+Les lignes sont coupées à la largeur du terminal (une ligne qui passerait à la
+ligne décalerait l'adressage). Celles qui ne tiennent pas en hauteur ne sont
+pas affichées ; le résumé l'indique. Un redimensionnement, ou un changement
+de la liste des lignes, provoque un affichage complet.
+"""
+
+import shutil
+import sys
+from typing import TextIO
+
+
+_ENTER = "\x1b[?1049h\x1b[?25l"   # Écran alternatif, curseur masqué
+_LEAVE = "\x1b[?25h\x1b[?1049l"   # Curseur visible, retour à l'écran normal
+_CLEAR = "\x1b[H\x1b[2J"
+_ERASE_LINE = "\x1b[K"
+
+# Lignes d'en-tête : séparateur, titres, séparateur
+_HEADER_LINES = 3
+
+
+def _move(line: int) -> str:
+    return f"\x1b[{line};1H"
+
+
+class LiveTable:
+    """Lignes identifiées par une clé (chemin du repository), cellules en texte."""
+
+    def __init__(self, headers: list[str], max_widths: dict[int, int] | None = None, stream: TextIO = sys.stdout):
+        self.headers = headers
+        self.max_widths = max_widths or {}   # Index de colonne -> largeur max
+        self.stream = stream
+        self._widths: list[int] = []
+        self._size = None                    # (colonnes, lignes) du dernier affichage complet
+        self._keys: list[str] = []           # Ordre des lignes du dernier affichage complet
+        self._shown: dict[str, tuple[int, list[str]]] = {}  # Clé -> (ligne écran, cellules affichées)
+        self._summary = None
+        self._active = False
+
+    def __enter__(self) -> "LiveTable":
+        self.stream.write(_ENTER)
+        self._active = True
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        if self._active:
+            self.stream.write(_LEAVE)
+            self.stream.flush()
+            self._active = False
+
+    # ─── Affichage ──────────────────────────────────────────────────────────────
+
+    def _format(self, cells: list[str]) -> str:
+        line = "".join(f"| {cell[:width]:<{width}} " for cell, width in zip(cells, self._widths)) + "|"
+        return line[:self._size[0] - 1]
+
+    def _capacity(self) -> int:
+        """Nombre de lignes de données affichables (en-tête et résumé déduits)."""
+        return max(0, self._size[1] - _HEADER_LINES - 1)
+
+    def _redraw_all(self, rows: list[tuple[str, list[str]]], size) -> int:
+        self._size = size
+        self._keys = [key for key, _ in rows]
+        self._widths = [len(header) for header in self.headers]
+        for _, cells in rows:
+            for i, cell in enumerate(cells):
+                self._widths[i] = max(self._widths[i], len(cell))
+        for i, width in self.max_widths.items():
+            self._widths[i] = min(self._widths[i], width)
+
+        separator = ("=" * (sum(self._widths) + len(self._widths) * 3 + 1))[:size[0] - 1]
+        out = [_CLEAR, separator, "\n", self._format(self.headers), "\n", separator]
+        self._shown = {}
+        for line, (key, cells) in enumerate(rows[:self._capacity()], start=_HEADER_LINES + 1):
+            out.append("\n" + self._format(cells))
+            self._shown[key] = (line, cells)
+        self.stream.write("".join(out))
+        self._summary = None
+        return len(self._shown)
+
+    def render(self, rows: list[tuple[str, list[str]]], summary) -> int:
+        """Met l'écran à jour ; retourne le nombre de lignes réécrites.
+
+        summary(affichées) : texte du résumé, selon le nombre de lignes affichées.
+        """
+        size = tuple(shutil.get_terminal_size())
+        if size != self._size or [key for key, _ in rows] != self._keys:
+            redrawn = self._redraw_all(rows, size)
+        else:
+            out = []
+            for key, cells in rows:
+                shown = self._shown.get(key)
+                if shown is not None and shown[1] != cells:
+                    out.append(_move(shown[0]) + self._format(cells) + _ERASE_LINE)
+                    self._shown[key] = (shown[0], cells)
+            self.stream.write("".join(out))
+            redrawn = len(out)
+
+        text = summary(len(self._shown))[:size[0] - 1]
+        if text != self._summary:
+            self.stream.write(_move(size[1]) + text + _ERASE_LINE)
+            self._summary = text
+        self.stream.flush()
+        return redrawn
@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+"""
+RepoScan - Pull parallèle (fast-forward uniquement) de tous les repositories.
+
+Deux phases, dont les résultats sont remontés dans l'ordre où ils arrivent :
+1. Vérification de tous les repositories en parallèle (un `git status` chacun) :
+   sont ignorés ceux qui ont des modifications locales, un HEAD détaché, pas
+   d'upstream, ou qui ont divergé (en avance ET en retard). Les repositories à
+   jour d'après la dernière analyse (retard = 0) sont ignorés sans lancer git.
+2. `git merge --ff-only @{upstream}` sur les repositories restants, au plus
+   `pull_concurrency` à la fois, chacun limité à `pull_timeout_seconds`.
+
+Le pull intègre ce que le dernier fetch a rapatrié ("Fetch All" d'abord) : il ne
+contacte pas le serveur, ne demande pas d'identifiants et ne crée jamais de
+commit de merge.
+"""
+
+import asyncio
+import time
+from typing import Callable, Generator
+
+from git_runner import AsyncGitRunner
+from git_status import STATUS_COMMAND, parse_porcelain_v2
+from repo_scanner import cancel_tasks
+
+
+# Commande de mise à jour (sans le préfixe "git")
+PULL_COMMAND = ["merge", "--ff-only", "@{upstream}"]
+
+# Issues possibles d'un pull
+UPDATED = "updated"
+SKIPPED = "skipped"
+FAILED = "failed"
+
+
+class PullResult:
+    """Résultat du pull d'un repository. message : raison de l'abandon, ou erreur git."""
+
+    __slots__ = ("repo", "outcome", "message", "duration")
+
+    def __init__(self, repo, outcome: str, message: str | None = None, duration: float = 0.0):
+        self.repo = repo
+        self.outcome = outcome
+        self.message = message
+        self.duration = duration
+
+
+def pull_check_steps() -> Generator[list[str], str | None, tuple[str | None, int | None]]:
+    """Vérifie qu'un fast-forward est possible. Retourne (raison de l'abandon ou None, retard).
+
+    Les fichiers non suivis ne bloquent pas : git refuse de lui-même un
+    fast-forward qui les écraserait.
+    Générateur (voir git_runner) : produit les commandes git et reçoit leur sortie.
+    """
+    output = yield STATUS_COMMAND
+    if output is None:
+        return "statut illisible", None
+    branch, status = parse_porcelain_v2(output)
+    if branch.head is None:
+        return "HEAD détaché", None
+    if branch.upstream is None or branch.behind is None:
+        return "pas d'upstream", None
+    if status.staged or status.unstaged or status.conflicted:
+        return "modifications locales", branch.behind
+    if branch.behind == 0:
+        return "à jour", 0
+    if branch.ahead:
+        return f"divergé (^{branch.ahead} v{branch.behind})", branch.behind
+    return None, branch.behind
+
+
+class PullExecutor:
+    """Lance `git merge --ff-only @{upstream}` sur plusieurs repositories en parallèle."""
+
+    def __init__(self, concurrency: int = 4, timeout: float = 60):
+        self.concurrency = max(1, concurrency)
+        self.timeout = timeout
+        self.runner = AsyncGitRunner(self.concurrency, timeout)
+
+    @classmethod
+    def for_config(cls, config) -> "PullExecutor":
+        return cls(config.get('pull_concurrency', 4), config.get('pull_timeout_seconds', 60))
+
+    async def _check(self, repo, check_runner: AsyncGitRunner) -> tuple:
+        reason, behind = await check_runner.run_steps(pull_check_steps(), repo.path)
+        return repo, reason, behind
+
+    async def _pull_one(self, repo, behind: int, semaphore: asyncio.Semaphore,
+                        is_cancelled: Callable[[], bool]) -> PullResult | None:
+        async with semaphore:
+            if is_cancelled():
+                return None
+            start = time.monotonic()
+            result = await repo.pull_fast_forward(self.runner, self.timeout)
+            duration = time.monotonic() - start
+        if result['success']:
+            return PullResult(repo, UPDATED, f"+{behind} commits", duration)
+        return PullResult(repo, FAILED, result.get('error'), duration)
+
+    @staticmethod
+    async def _as_completed(coros, on_done: Callable):
+        """Appelle on_done(résultat) dès qu'une coroutine se termine.
+
+        Annulation, ou erreur (y compris dans on_done, ex: BrokenPipeError d'un print) :
+        les autres coroutines sont annulées et leurs processus git tués (voir cancel_tasks).
+        """
+        tasks = [asyncio.ensure_future(coro) for coro in coros]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                on_done(await next_done)
+        except (Exception, asyncio.CancelledError):
+            await cancel_tasks(tasks)
+            raise
+
+    async def pull_all(
+        self,
+        repos: list,
+        on_result: Callable[[PullResult], None],
+        is_cancelled: Callable[[], bool] = lambda: False,
+        check_runner: AsyncGitRunner | None = None,
+    ) -> list[PullResult]:
+        """Pull tous les repositories ; on_result est appelé pour chacun, ignoré ou non.
+
+        check_runner : runner des vérifications (celui de l'analyse, en général),
+        le runner de l'exécuteur par défaut. Une annulation (is_cancelled)
+        empêche le démarrage des pulls en attente.
+        """
+        results = []
+
+        def report(result):
+            if result is None:
+                return
+            results.append(result)
+            on_result(result)
+
+        # Retard nul à la dernière analyse : rien à intégrer, aucun processus lancé
+        to_check = []
+        for repo in repos:
+            if repo.behind == 0:
+                report(PullResult(repo, SKIPPED, "à jour"))
+            else:
+                to_check.append(repo)
+
+        # Phase 1 : vérification de tous les repositories
+        to_pull = []
+
+        def checked(check):
+            repo, reason, behind = check
+            if reason:
+                report(PullResult(repo, SKIPPED, reason))
+            else:
+                to_pull.append((repo, behind))
+
+        await self._as_completed((self._check(repo, check_runner or self.runner) for repo in to_check), checked)
+
+        # Phase 2 : fast-forwards (sémaphore liée à la boucle courante)
+        if to_pull and not is_cancelled():
+            semaphore = asyncio.Semaphore(self.concurrency)
+            await self._as_completed(
+                (self._pull_one(repo, behind, semaphore, is_cancelled) for repo, behind in to_pull), report
+            )
+        return results
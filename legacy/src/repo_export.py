@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+RepoScan - Export des résultats de scan au fil de l'eau (NDJSON, JSON, CSV).
+
+Chaque enregistrement est écrit et vidé dès que l'analyse du repository est
+terminée ; rien n'est conservé en mémoire. Les valeurs sont celles de
+RepoRecord.to_dict (null / champ vide quand l'information est absente).
+"""
+
+import csv
+import json
+from abc import ABC, abstractmethod
+from typing import TextIO
+
+from repo_record import EXPORT_FIELDS
+
+
+EXPORT_FORMATS = ("ndjson", "json", "csv")
+
+
+class RecordWriter(ABC):
+    """Écrit des enregistrements de repository sur un flux texte."""
+
+    def __init__(self, stream: TextIO):
+        self.stream = stream
+
+    @abstractmethod
+    def write(self, repo):
+        """Écrit un enregistrement et vide le flux."""
+
+    def close(self):
+        self.stream.flush()
+
+
+class NdjsonWriter(RecordWriter):
+    """Un objet JSON par ligne."""
+
+    def write(self, repo):
+        self.stream.write(json.dumps(repo.to_dict(), ensure_ascii=False) + "\n")
+        self.stream.flush()
+
+
+class JsonWriter(RecordWriter):
+    """Un tableau JSON, écrit élément par élément."""
+
+    def __init__(self, stream: TextIO):
+        super().__init__(stream)
+        self._first = True
+        self.stream.write("[")
+
+    def write(self, repo):
+        self.stream.write("\n  " if self._first else ",\n  ")
+        self.stream.write(json.dumps(repo.to_dict(), ensure_ascii=False))
+        self.stream.flush()
+        self._first = False
+
+    def close(self):
+        self.stream.write("]\n" if self._first else "\n]\n")
+        super().close()
+
+
+class CsvWriter(RecordWriter):
+    """CSV avec en-tête (colonnes EXPORT_FIELDS)."""
+
+    def __init__(self, stream: TextIO):
+        super().__init__(stream)
+        self._writer = csv.DictWriter(stream, fieldnames=EXPORT_FIELDS, lineterminator="\n")
+        self._writer.writeheader()
+
+    def write(self, repo):
+        self._writer.writerow(repo.to_dict())
+        self.stream.flush()
+
+
+def make_writer(export_format: str, stream: TextIO) -> RecordWriter:
+    writers = {"ndjson": NdjsonWriter, "json": JsonWriter, "csv": CsvWriter}
+    return writers[export_format](stream)
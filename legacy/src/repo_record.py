@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+"""
+RepoScan - Enregistrement compact du résultat d'analyse d'un repository.
+
+Les valeurs sont typées (entiers, timestamp, None quand l'information est
+absente) et ne sont formatées qu'à l'affichage, via les méthodes *_label.
+Tri, agrégation et filtrage travaillent ainsi sur les vraies valeurs, et
+__slots__ évite un dictionnaire par instance sur les grosses flottes.
+"""
+
+import os
+from datetime import datetime
+
+from git_status import StatusSummary, LastCommit
+from disk_usage import DiskUsage, format_size
+
+
+NOT_AVAILABLE = "N/A"
+
+# Longueur max du dernier commit affiché (au-delà : "...")
+COMMIT_LABEL_MAX_LENGTH = 50
+
+# Champs exportés par to_dict (ordre des colonnes CSV)
+EXPORT_FIELDS = (
+    "path", "relative_path", "branch", "upstream", "ahead", "behind",
+    "clean", "staged", "unstaged", "untracked", "conflicted", "renamed", "deleted", "modified", "added",
+    "commit_hash", "commit_timestamp", "commit_subject", "remote_url",
+)
+
+# Attributs simples transmis tels quels par to_state (status, last_commit et disk_usage à part)
+STATE_FIELDS = ("is_git_repo", "current_branch", "upstream", "ahead", "behind", "remote_url")
+
+
+class RepoRecord:
+    """Repository (ou dossier parent) découvert par le scan."""
+
+    __slots__ = (
+        "path", "name", "relative_path", "depth", "is_git_repo",
+        "current_branch", "upstream", "ahead", "behind",
+        "status", "last_commit", "remote_url", "disk_usage",
+    )
+
+    def __init__(self, path: str, relative_path: str | None = None):
+        self.path = path
+        self.name = os.path.basename(path)
+        self.relative_path = relative_path or self.name
+        self.depth = self.relative_path.count(os.sep)
+        self.is_git_repo = False
+        self.current_branch: str | None = None       # None si HEAD détaché ou inconnu
+        self.upstream: str | None = None
+        self.ahead: int | None = None                # None sans upstream
+        self.behind: int | None = None
+        self.status: StatusSummary | None = None
+        self.last_commit: LastCommit | None = None
+        self.remote_url: str | None = None           # URL complète de origin
+        self.disk_usage: DiskUsage | None = None     # Mesuré à part (ScanEngine.measure_disk_usage)
+
+    # ─── Prédicats ──────────────────────────────────────────────────────────────
+
+    @property
+    def is_clean(self) -> bool:
+        return self.status is not None and self.status.is_clean
+
+    @property
+    def is_modified(self) -> bool:
+        return self.status is not None and not self.status.is_clean
+
+    # ─── Formatage (affichage uniquement) ───────────────────────────────────────
+
+    def branch_label(self) -> str:
+        return self.current_branch or NOT_AVAILABLE
+
+    def status_label(self) -> str:
+        return self.status.format() if self.status is not None else NOT_AVAILABLE
+
+    def commit_label(self, max_length: int | None = COMMIT_LABEL_MAX_LENGTH) -> str:
+        if self.last_commit is None:
+            return NOT_AVAILABLE
+        commit = self.last_commit.format()
+        if max_length and len(commit) > max_length:
+            commit = commit[:max_length] + "..."
+        return commit
+
+    def commit_date_label(self) -> str:
+        if self.last_commit is None:
+            return NOT_AVAILABLE
+        return datetime.fromtimestamp(self.last_commit.timestamp).strftime('%Y-%m-%d')
+
+    def sync_label(self) -> str:
+        if self.ahead is None:
+            return NOT_AVAILABLE
+        return f"^{self.ahead} v{self.behind}"
+
+    def remote_label(self) -> str:
+        """Nom court du repository distant (dernier segment de l'URL, sans .git)."""
+        if not self.remote_url:
+            return NOT_AVAILABLE
+        name = self.remote_url.rstrip('/').split('/')[-1].split(':')[-1]
+        return name[:-4] if name.endswith('.git') else name
+
+    def worktree_size_label(self) -> str:
+        return format_size(self.disk_usage.worktree) if self.disk_usage else NOT_AVAILABLE
+
+    def git_size_label(self) -> str:
+        return format_size(self.disk_usage.git) if self.disk_usage else NOT_AVAILABLE
+
+    def artifacts_size_label(self) -> str:
+        """Taille des artefacts et dossier le plus lourd, ex: "1.2 Go (node_modules)"."""
+        if not self.disk_usage:
+            return NOT_AVAILABLE
+        if not self.disk_usage.artifacts:
+            return "-"
+        heaviest = max(self.disk_usage.artifact_dirs, key=self.disk_usage.artifact_dirs.get)
+        return f"{format_size(self.disk_usage.artifacts)} ({heaviest})"
+
+    # ─── Export ─────────────────────────────────────────────────────────────────
+
+    def to_dict(self) -> dict:
+        """Valeurs brutes à plat (clés EXPORT_FIELDS) ; None quand l'information est absente."""
+        status = self.status
+        commit = self.last_commit
+        data = {
+            "path": self.path,
+            "relative_path": self.relative_path,
+            "branch": self.current_branch,
+            "upstream": self.upstream,
+            "ahead": self.ahead,
+            "behind": self.behind,
+            "clean": status.is_clean if status is not None else None,
+        }
+        for field in StatusSummary.__slots__:
+            data[field] = getattr(status, field) if status is not None else None
+        data["commit_hash"] = commit.short_hash if commit else None
+        data["commit_timestamp"] = commit.timestamp if commit else None
+        data["commit_subject"] = commit.subject if commit else None
+        data["remote_url"] = self.remote_url
+        return data
+
+    # ─── État complet (daemon) ──────────────────────────────────────────────────
+
+    def to_state(self) -> dict:
+        """Tout ce que l'affichage utilise, sérialisable en JSON (voir restore_state)."""
+        state = {"path": self.path, "relative_path": self.relative_path}
+        for field in STATE_FIELDS:
+            state[field] = getattr(self, field)
+        commit = self.last_commit
+        state["status"] = self.status.to_dict() if self.status is not None else None
+        state["last_commit"] = [commit.short_hash, commit.timestamp, commit.subject] if commit else None
+        state["disk_usage"] = self.disk_usage.to_dict() if self.disk_usage else None
+        return state
+
+    def restore_state(self, state: dict):
+        """Recharge les valeurs produites par to_state (path et relative_path viennent du constructeur)."""
+        for field in STATE_FIELDS:
+            setattr(self, field, state.get(field))
+        self.is_git_repo = bool(self.is_git_repo)
+        if state.get("status") is not None:
+            self.status = StatusSummary.from_dict(state["status"])
+        if state.get("last_commit") is not None:
+            self.last_commit = LastCommit(*state["last_commit"])
+        if state.get("disk_usage") is not None:
+            self.disk_usage = DiskUsage.from_dict(state["disk_usage"])
@@ -0,0 +1,448 @@
+#!/usr/bin/env python3
+"""
+RepoScan - Pipeline de scan en deux étapes.
+
+1) Découverte : le walker parcourt l'arborescence et produit des candidats
+   (repositories Git et dossiers parents) dans l'ordre d'affichage final.
+2) Analyse : les repositories sont analysés en parallèle dans une boucle asyncio
+   (nombre de processus git borné), pendant que le walker continue sa découverte.
+
+Plusieurs racines peuvent être parcourues en parallèle : chaque walker tourne
+dans son propre thread (candidates_in_thread). Une racine contenue dans une
+autre n'est pas parcourue par celle-ci, et un RepoIdentities partagé repère les
+repositories atteints par plusieurs racines (liens symboliques, montages) ;
+chacun revient, après la découverte, à la première racine de la configuration.
+"""
+
+import asyncio
+import os
+import re
+import threading
+from typing import AsyncIterator, Callable, Iterable, Iterator
+
+
+class RepoCandidate:
+    """Entrée découverte par le walker, pas encore analysée."""
+
+    __slots__ = ("path", "relative_path", "is_git")
+
+    def __init__(self, path: str, relative_path: str, is_git: bool):
+        self.path = path
+        self.relative_path = relative_path
+        self.is_git = is_git
+
+
+def resolve_concurrency(value) -> int:
+    """Nombre de workers d'analyse : valeur de config si > 0, sinon nombre de cœurs."""
+    try:
+        value = int(value)
+    except (TypeError, ValueError):
+        value = 0
+    return value if value > 0 else (os.cpu_count() or 4)
+
+
+# ─── Filtres ────────────────────────────────────────────────────────────────────
+
+DEFAULT_PRUNE_DIRS = ["node_modules", "vendor", "target", ".venv", "dist"]
+
+
+def _glob_to_regex(pattern: str) -> re.Pattern:
+    """Traduit un motif style .gitignore (*, ?, **) en expression régulière."""
+    regex = ""
+    i = 0
+    while i < len(pattern):
+        if pattern.startswith("**/", i):
+            regex += "(?:.*/)?"
+            i += 3
+        elif pattern.startswith("**", i):
+            regex += ".*"
+            i += 2
+        elif pattern[i] == '*':
+            regex += "[^/]*"
+            i += 1
+        elif pattern[i] == '?':
+            regex += "[^/]"
+            i += 1
+        else:
+            regex += re.escape(pattern[i])
+            i += 1
+    return re.compile(regex + r"\Z")
+
+
+class ScanFilter:
+    """Règles d'exclusion du walker : noms de dossiers à élaguer et motifs style .gitignore.
+
+    Motifs d'exclusion :
+    - sans "/" (ex: "old-*") : comparé au nom du dossier, à n'importe quelle profondeur
+    - avec "/" (ex: "clients/archive", "/tmp", "**/build") : comparé au chemin relatif à la racine
+    - un "/" final est ignoré (seuls des dossiers sont testés)
+    - "!motif" ré-inclut un dossier exclu par un motif précédent (le dernier motif gagne)
+
+    skip_paths : chemins relatifs toujours exclus, sans motif (racines imbriquées).
+    """
+
+    def __init__(self, prune_dirs=None, exclude_globs=None, skip_paths=()):
+        self.prune_dirs = set(DEFAULT_PRUNE_DIRS if prune_dirs is None else prune_dirs)
+        self.skip_paths = set(skip_paths)
+        self._rules: list[tuple[re.Pattern, bool, bool]] = []
+        for pattern in exclude_globs or []:
+            negate = pattern.startswith('!')
+            pattern = pattern[1:] if negate else pattern
+            pattern = pattern.rstrip('/')
+            if not pattern:
+                continue
+            anchored = '/' in pattern
+            self._rules.append((_glob_to_regex(pattern.lstrip('/')), anchored, negate))
+
+    @classmethod
+    def from_config(cls, config, skip_paths=()) -> "ScanFilter":
+        return cls(config.get('scan_prune_dirs'), config.get('scan_exclude', []), skip_paths)
+
+    def is_excluded(self, name: str, relative_path: str) -> bool:
+        if name in self.prune_dirs or relative_path in self.skip_paths:
+            return True
+        excluded = False
+        if self._rules:
+            posix_path = relative_path.replace(os.sep, '/')
+            for regex, anchored, negate in self._rules:
+                if regex.match(posix_path if anchored else name):
+                    excluded = not negate
+        return excluded
+
+
+# ─── Découverte ─────────────────────────────────────────────────────────────────
+
+def nested_roots(root: str, roots: list[str]) -> list[str]:
+    """Chemins, relatifs à root, des autres racines qu'elle contient (à ne pas parcourir)."""
+    prefix = os.path.join(root, "")
+    return [os.path.relpath(other, root) for other in roots if other != root and other.startswith(prefix)]
+
+
+class RepoIdentities:
+    """Repositories déjà rencontrés, identifiés par (st_dev, st_ino) de leur .git.
+
+    Partagé entre les walkers de plusieurs racines (thread-safe). Chaque racine a
+    un rang (sa position dans la configuration) : un repository atteint par deux
+    racines revient à celle de plus petit rang, quel que soit le walker arrivé
+    le premier. Un walker de rang plus petit peut donc reprendre un repository
+    déjà produit par un autre : resolve() retire ensuite ces doublons. Au sein
+    d'une racine (liens symboliques), le premier chemin dans l'ordre du parcours
+    est retenu.
+    """
+
+    def __init__(self):
+        self._owners: dict[tuple[int, int], int] = {}  # .git -> rang de la racine retenue
+        self._lock = threading.Lock()
+        self.duplicates = 0
+
+    def claim(self, git_stat: os.stat_result, rank: int = 0) -> bool:
+        """True si ce .git n'a été rencontré par aucune racine de rang inférieur ou égal."""
+        key = (git_stat.st_dev, git_stat.st_ino)
+        with self._lock:
+            owner = self._owners.get(key)
+            if owner is not None:
+                self.duplicates += 1
+                if owner <= rank:
+                    return False
+            self._owners[key] = rank
+            return True
+
+    def _owns(self, path: str, rank: int) -> bool:
+        try:
+            git_stat = os.stat(os.path.join(path, ".git"))
+        except OSError:
+            return True
+        return self._owners.get((git_stat.st_dev, git_stat.st_ino), rank) == rank
+
+    def resolve(self, rank: int, repos: list) -> list:
+        """Repositories (dans l'ordre d'affichage) que la racine de ce rang conserve.
+
+        Les repositories repris par une racine de rang inférieur sont retirés, ainsi
+        que les dossiers parents qui ne contiennent plus aucun repository (sauf au
+        premier niveau, comme le walker).
+        """
+        if not self.duplicates:
+            return repos
+        kept = []
+        with_repos: set[str] = set()  # Dossiers (chemins relatifs) contenant un repository conservé
+        for repo in reversed(repos):
+            if repo.is_git_repo:
+                if not self._owns(repo.path, rank):
+                    continue
+                parent = os.path.dirname(repo.relative_path)
+                while parent:
+                    with_repos.add(parent)
+                    parent = os.path.dirname(parent)
+            elif repo.depth > 0 and repo.relative_path not in with_repos:
+                continue
+            kept.append(repo)
+        kept.reverse()
+        return kept
+
+
+def iter_repo_candidates(
+    root_path: str,
+    max_depth: int = 3,
+    current_path: str = "",
+    on_folder: Callable[[str], None] | None = None,
+    on_error: Callable[[str, Exception], None] | None = None,
+    scan_filter: ScanFilter | None = None,
+    identities: RepoIdentities | None = None,
+    rank: int = 0,
+    pending: list[RepoCandidate] | None = None,
+) -> Iterator[RepoCandidate]:
+    """Parcourt récursivement root_path et produit les candidats dans l'ordre parent -> enfants.
+
+    Pour chaque niveau : d'abord les repositories Git directs, puis chaque dossier
+    suivi de son contenu. Un dossier n'est produit que s'il contient des repositories,
+    sauf au premier niveau où il est toujours conservé.
+
+    Rien n'est mis en tampon : un dossier de premier niveau est produit tout de suite,
+    un dossier plus profond est mis en attente dans pending (ancêtres pas encore
+    produits) et n'est produit que juste avant son premier repository Git.
+
+    Le parcours utilise os.scandir : le type de chaque entrée vient du DirEntry, et
+    seul un test de présence de .git est fait par sous-dossier retenu. Les dossiers
+    exclus par scan_filter ne sont jamais parcourus. Avec identities, un repository
+    déjà retenu (même .git) par une racine de rang inférieur ou égal est ignoré.
+    """
+    if current_path.count(os.sep) >= max_depth:
+        return
+    if pending is None:
+        pending = []
+
+    try:
+        full_path = os.path.join(root_path, current_path) if current_path else root_path
+
+        # Lister les sous-dossiers visibles et non exclus, triés par nom
+        with os.scandir(full_path) as it:
+            entries = []
+            for entry in it:
+                if entry.name.startswith('.'):
+                    continue
+                relative_path = os.path.join(current_path, entry.name) if current_path else entry.name
+                if scan_filter and scan_filter.is_excluded(entry.name, relative_path):
+                    continue
+                try:
+                    if entry.is_dir():
+                        entries.append((entry.name, entry.path, relative_path))
+                except OSError:
+                    continue
+        entries.sort()
+
+        # Séparer les repos Git directs des dossiers à explorer
+        git_repos = []
+        folders_to_explore = []
+
+        for item, item_path, relative_path in entries:
+            try:
+                git_stat = os.stat(os.path.join(item_path, ".git"))
+            except OSError:
+                folders_to_explore.append(RepoCandidate(item_path, relative_path, False))
+                continue
+            # Un doublon (autre racine, lien symbolique) n'est ni analysé ni affiché
+            if identities is None or identities.claim(git_stat, rank):
+                git_repos.append(RepoCandidate(item_path, relative_path, True))
+    except Exception as e:
+        if on_error:
+            on_error(current_path, e)
+        return
+
+    # Ajouter d'abord les repos Git du niveau actuel, précédés des ancêtres en attente
+    if git_repos:
+        yield from pending
+        pending.clear()
+        yield from git_repos
+
+    # Puis explorer les dossiers
+    for folder in folders_to_explore:
+        if on_folder:
+            on_folder(folder.relative_path)
+        if not current_path:  # Dossiers de premier niveau gardés même vides
+            yield folder
+        else:
+            pending.append(folder)
+        yield from iter_repo_candidates(
+            root_path, max_depth, folder.relative_path, on_folder, on_error, scan_filter, identities, rank, pending
+        )
+        # Aucun repository Git dessous : le dossier n'est pas produit
+        if pending and pending[-1] is folder:
+            pending.pop()
+
+
+async def candidates_in_thread(candidates: Iterator[RepoCandidate], batch_size: int = 256) -> AsyncIterator[RepoCandidate]:
+    """Parcourt candidates dans un thread dédié et les remet à la boucle asyncio par lots.
+
+    La boucle n'est pas bloquée par les accès disque du walker, et plusieurs
+    racines (disques lents, montages réseau) se parcourent en parallèle. Un
+    repository Git est transmis immédiatement pour que son analyse démarre.
+    Les callbacks du walker (on_folder, on_error) sont appelés depuis ce thread.
+    """
+    loop = asyncio.get_running_loop()
+    queue: asyncio.Queue = asyncio.Queue()
+    stopped = threading.Event()
+
+    def deliver(item):
+        try:
+            loop.call_soon_threadsafe(queue.put_nowait, item)
+        except RuntimeError:  # Boucle fermée : plus personne n'attend
+            stopped.set()
+
+    def walk():
+        batch = []
+        try:
+            for candidate in candidates:
+                if stopped.is_set():
+                    return
+                batch.append(candidate)
+                if candidate.is_git or len(batch) >= batch_size:
+                    deliver(batch)
+                    batch = []
+            deliver(batch)
+            deliver(None)
+        except Exception as e:
+            deliver(e)
+
+    threading.Thread(target=walk, name="repo-walker", daemon=True).start()
+    try:
+        while True:
+            item = await queue.get()
+            if item is None:
+                return
+            if isinstance(item, Exception):
+                raise item
+            for candidate in item:
+                yield candidate
+    finally:
+        stopped.set()
+
+
+async def _iterate(candidates: Iterable[RepoCandidate] | AsyncIterator[RepoCandidate]) -> AsyncIterator[RepoCandidate]:
+    """Itère indifféremment un walker synchrone (dans la boucle) ou candidates_in_thread."""
+    if hasattr(candidates, "__aiter__"):
+        async for candidate in candidates:
+            yield candidate
+    else:
+        for candidate in candidates:
+            yield candidate
+
+
+# ─── Analyse ────────────────────────────────────────────────────────────────────
+
+async def _analyze_repo(repo, runner, scan_cache=None):
+    """Analyse un repository Git, ou le reprend du cache si son empreinte .git n'a pas changé."""
+    fingerprint = None
+    if scan_cache:
+        fingerprint, data = scan_cache.lookup(repo.path)
+        if data is not None:
+            scan_cache.restore(repo, data)
+            return repo
+
+    await repo.analyze_async(runner)
+    if scan_cache:
+        scan_cache.store(repo.path, fingerprint, repo)
+    return repo
+
+
+async def cancel_tasks(tasks):
+    """Annule les analyses en cours et attend qu'elles aient tué leurs processus git.
+
+    À faire avant de propager une erreur : laissées à asyncio.run, ces tâches
+    seraient annulées en plein lancement de processus, ce qui peut bloquer la boucle.
+    """
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+
+
+async def analyze_candidates_async(
+    candidates: Iterable[RepoCandidate] | AsyncIterator[RepoCandidate],
+    make_repo: Callable[[str, str], object],
+    runner,
+    scan_cache=None,
+    on_discovered: Callable[[object], None] | None = None,
+    on_analyzed: Callable[[object], None] | None = None,
+) -> list:
+    """Analyse les candidats dans une boucle asyncio, via l'AsyncGitRunner.
+
+    make_repo construit un GitRepoInfo non analysé. Les analyses démarrent dès que
+    le walker produit un repository ; le nombre de processus git simultanés est
+    borné par le sémaphore du runner. Le résultat conserve l'ordre de découverte.
+    Si scan_cache est fourni, les repositories dont l'empreinte .git n'a pas changé
+    sont repris du cache sans lancer git.
+
+    on_discovered reçoit chaque entrée (encore non analysée) dans l'ordre d'affichage,
+    on_analyzed chaque repository Git dès que son analyse est terminée. Les deux
+    sont appelés depuis la boucle asyncio.
+    """
+    def analyzed(task):
+        if on_analyzed and not task.cancelled() and task.exception() is None:
+            on_analyzed(task.result())
+
+    tasks = []
+    try:
+        async for candidate in _iterate(candidates):
+            repo = make_repo(candidate.path, candidate.relative_path)
+            # Connu dès la découverte : permet d'afficher la ligne avant la fin de l'analyse
+            repo.is_git_repo = candidate.is_git
+            if on_discovered:
+                on_discovered(repo)
+            if not candidate.is_git:
+                # Dossier parent : aucune commande git
+                future = asyncio.get_running_loop().create_future()
+                future.set_result(repo)
+                tasks.append(future)
+                continue
+            task = asyncio.ensure_future(_analyze_repo(repo, runner, scan_cache))
+            task.add_done_callback(analyzed)
+            tasks.append(task)
+            # Laisser les analyses déjà planifiées démarrer pendant la découverte
+            await asyncio.sleep(0)
+        return list(await asyncio.gather(*tasks))
+    except (Exception, asyncio.CancelledError):
+        await cancel_tasks(tasks)
+        raise
+
+
+async def stream_candidates_async(
+    candidates: Iterable[RepoCandidate] | AsyncIterator[RepoCandidate],
+    make_repo: Callable[[str, str], object],
+    runner,
+    on_result: Callable[[object], None],
+    scan_cache=None,
+    max_pending: int = 64,
+) -> int:
+    """Analyse les repositories Git et les remet à on_result dans l'ordre où ils se terminent.
+
+    Contrairement à analyze_candidates_async, aucun résultat n'est conservé et au
+    plus max_pending analyses sont en cours : la mémoire ne dépend pas du nombre
+    de repositories. Les dossiers parents sont ignorés. Retourne le nombre de
+    repositories analysés.
+    """
+    pending = set()
+    count = 0
+
+    async def drain():
+        nonlocal pending, count
+        done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+        for task in done:
+            on_result(task.result())
+            count += 1
+
+    try:
+        async for candidate in _iterate(candidates):
+            if not candidate.is_git:
+                continue
+            repo = make_repo(candidate.path, candidate.relative_path)
+            repo.is_git_repo = True
+            pending.add(asyncio.ensure_future(_analyze_repo(repo, runner, scan_cache)))
+            if len(pending) >= max_pending:
+                await drain()
+            else:
+                await asyncio.sleep(0)
+        while pending:
+            await drain()
+    except (Exception, asyncio.CancelledError):
+        await cancel_tasks(pending)
+        raise
+    return count
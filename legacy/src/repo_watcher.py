@@ -0,0 +1,368 @@
+#!/usr/bin/env python3
+"""
+RepoScan - Surveillance des repositories pour l'actualisation automatique.
+
+Pour chaque repository, on surveille ce qui change quand son état change : HEAD
+et index (dossier git), packed-refs et l'arborescence refs/ (dossier commun).
+Deux backends :
+- inotify (Linux, via ctypes) : un watch par dossier, aucun coût au repos
+- polling : comparaison périodique de l'empreinte de scan_cache, utilisé quand
+  inotify n'est pas disponible, sur les montages où il ne voit pas les
+  modifications (drvfs/9p sous WSL, partages réseau), ou une fois la limite
+  `fs.inotify.max_user_watches` atteinte
+
+Les événements sont regroupés : on_change reçoit l'ensemble des repositories
+modifiés une fois qu'aucun nouvel événement n'est arrivé pendant `debounce`.
+"""
+
+import ctypes
+import ctypes.util
+import errno
+import os
+import select
+import struct
+import sys
+import threading
+import time
+from typing import Callable, Iterable
+
+from git_dir_reader import GitDirReader
+from scan_cache import compute_fingerprint
+
+
+# Systèmes de fichiers sur lesquels inotify ne remonte pas (ou mal) les modifications
+POLLING_FILESYSTEMS = {"drvfs", "9p", "nfs", "nfs4", "cifs", "smb3", "smbfs", "fuse.sshfs", "virtiofs"}
+
+# Fichiers du dossier git (ou commun) dont la modification compte ; tout compte sous refs/
+WATCHED_NAMES = {"HEAD", "index", "packed-refs"}
+
+
+# ─── Backend inotify ────────────────────────────────────────────────────────────
+
+_IN_CLOSE_WRITE = 0x00000008
+_IN_MOVED_FROM = 0x00000040
+_IN_MOVED_TO = 0x00000080
+_IN_CREATE = 0x00000100
+_IN_DELETE = 0x00000200
+_IN_Q_OVERFLOW = 0x00004000
+_IN_IGNORED = 0x00008000
+_IN_ONLYDIR = 0x01000000
+_IN_ISDIR = 0x40000000
+_IN_NONBLOCK = 0o4000
+_IN_CLOEXEC = 0o2000000
+
+# git écrit HEAD, index et les refs via un fichier .lock renommé : MOVED_TO suffit
+# dans la plupart des cas, CLOSE_WRITE couvre les écritures directes
+_WATCH_MASK = _IN_CLOSE_WRITE | _IN_MOVED_TO | _IN_MOVED_FROM | _IN_CREATE | _IN_DELETE | _IN_ONLYDIR
+
+_EVENT_HEADER = struct.Struct("iIII")
+
+
+class InotifyBackend:
+    """Accès minimal à inotify via la libc."""
+
+    def __init__(self):
+        libc_name = ctypes.util.find_library("c") or "libc.so.6"
+        self._libc = ctypes.CDLL(libc_name, use_errno=True)
+        self.fd = self._libc.inotify_init1(_IN_NONBLOCK | _IN_CLOEXEC)
+        if self.fd < 0:
+            err = ctypes.get_errno()
+            raise OSError(err, os.strerror(err))
+
+    @staticmethod
+    def is_available() -> bool:
+        if not sys.platform.startswith("linux"):
+            return False
+        try:
+            libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6")
+            return hasattr(libc, "inotify_init1")
+        except OSError:
+            return False
+
+    def add_watch(self, path: str) -> int:
+        """Ajoute un watch sur un dossier. OSError (ENOSPC à la limite du système) en cas d'échec."""
+        wd = self._libc.inotify_add_watch(self.fd, os.fsencode(path), _WATCH_MASK)
+        if wd < 0:
+            err = ctypes.get_errno()
+            raise OSError(err, os.strerror(err), path)
+        return wd
+
+    def rm_watch(self, wd: int):
+        self._libc.inotify_rm_watch(self.fd, wd)
+
+    def read_events(self) -> list[tuple[int, int, str]]:
+        """Lit les événements disponibles : liste de (wd, masque, nom)."""
+        events = []
+        while True:
+            try:
+                data = os.read(self.fd, 65536)
+            except BlockingIOError:
+                return events
+            offset = 0
+            while offset + _EVENT_HEADER.size <= len(data):
+                wd, mask, _cookie, length = _EVENT_HEADER.unpack_from(data, offset)
+                offset += _EVENT_HEADER.size
+                name = os.fsdecode(data[offset:offset + length].rstrip(b"\0"))
+                offset += length
+                events.append((wd, mask, name))
+
+    def close(self):
+        os.close(self.fd)
+
+
+def _mount_fstypes() -> list[tuple[str, str]]:
+    """Points de montage et type de système de fichiers, du plus long au plus court."""
+    mounts = []
+    try:
+        with open("/proc/mounts", "r", encoding="utf-8") as f:
+            for line in f:
+                fields = line.split()
+                if len(fields) >= 3:
+                    mounts.append((fields[1].replace("\\040", " "), fields[2]))
+    except OSError:
+        pass
+    mounts.sort(key=lambda mount: len(mount[0]), reverse=True)
+    return mounts
+
+
+def _fstype(path: str, mounts: list[tuple[str, str]]) -> str | None:
+    for mount_point, fstype in mounts:
+        if path == mount_point or path.startswith(mount_point.rstrip("/") + "/"):
+            return fstype
+    return None
+
+
+# ─── Watcher ────────────────────────────────────────────────────────────────────
+
+class RepoWatcher:
+    """Surveille un ensemble de repositories dans un thread de fond.
+
+    on_change(paths) est appelé depuis ce thread avec l'ensemble des chemins de
+    repositories modifiés, après `debounce` secondes sans nouvel événement.
+    """
+
+    def __init__(
+        self,
+        on_change: Callable[[set[str]], None],
+        backend: str = "auto",
+        debounce: float = 0.5,
+        poll_interval: float = 2.0,
+    ):
+        self.on_change = on_change
+        self.backend = backend
+        self.debounce = debounce
+        self.poll_interval = poll_interval
+
+        self._lock = threading.Lock()
+        self._desired: set[str] = set()
+        self._thread: threading.Thread | None = None
+        self._stopping = False
+        self._wake_r, self._wake_w = os.pipe()
+
+        # État propre au thread de surveillance
+        self._inotify: InotifyBackend | None = None
+        self._watch_dirs: dict[int, tuple[str, bool, set[str]]] = {}  # wd -> (dossier, est_refs, repos)
+        self._dir_wds: dict[str, int] = {}
+        self._repo_wds: dict[str, set[int]] = {}
+        self._polled: dict[str, list | None] = {}  # repo -> dernière empreinte
+        self._limit_reached = False
+        self._pending: set[str] = set()
+        self._last_event = 0.0
+        self._next_poll = 0.0
+
+    @classmethod
+    def for_config(cls, config, on_change) -> "RepoWatcher | None":
+        """Construit le watcher selon la config, ou None si la surveillance est désactivée."""
+        if not config.get('watch_enabled', True):
+            return None
+        return cls(
+            on_change,
+            config.get('watch_backend', 'auto'),
+            config.get('watch_debounce_ms', 500) / 1000,
+            config.get('watch_poll_interval_seconds', 2),
+        )
+
+    # ─── API (thread appelant) ──────────────────────────────────────────────────
+
+    def watch(self, paths: Iterable[str]):
+        """Remplace l'ensemble des repositories surveillés."""
+        with self._lock:
+            self._desired = {os.path.abspath(p) for p in paths}
+        self._wake()
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="repo-watcher", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stopping = True
+        self._wake()
+        if self._thread:
+            self._thread.join(timeout=2)
+            self._thread = None
+        for fd in (self._wake_r, self._wake_w):
+            try:
+                os.close(fd)
+            except OSError:
+                pass
+
+    def _wake(self):
+        try:
+            os.write(self._wake_w, b"x")
+        except OSError:
+            pass
+
+    # ─── Boucle de surveillance ─────────────────────────────────────────────────
+
+    def _run(self):
+        if self.backend in ("auto", "inotify") and InotifyBackend.is_available():
+            try:
+                self._inotify = InotifyBackend()
+            except OSError as e:
+                print(f"inotify indisponible, surveillance par polling: {e}")
+        watched: set[str] = set()
+
+        try:
+            while not self._stopping:
+                with self._lock:
+                    desired = set(self._desired)
+                if desired != watched:
+                    self._reconcile(watched, desired)
+                    watched = desired
+
+                now = time.monotonic()
+                timeout = max(0.0, self._next_poll - now) if self._polled else None
+                if self._pending:
+                    flush_in = max(0.0, self._last_event + self.debounce - now)
+                    timeout = flush_in if timeout is None else min(timeout, flush_in)
+
+                fds = [self._wake_r] + ([self._inotify.fd] if self._inotify else [])
+                readable, _, _ = select.select(fds, [], [], timeout)
+                if self._wake_r in readable:
+                    os.read(self._wake_r, 4096)
+                if self._inotify and self._inotify.fd in readable:
+                    self._handle_events(self._inotify.read_events())
+
+                now = time.monotonic()
+                if self._polled and now >= self._next_poll:
+                    self._poll()
+                    self._next_poll = now + self.poll_interval
+                if self._pending and now - self._last_event >= self.debounce:
+                    changed, self._pending = self._pending, set()
+                    try:
+                        self.on_change(changed)
+                    except Exception as e:
+                        print(f"Erreur lors de l'actualisation automatique: {e}")
+        finally:
+            if self._inotify:
+                self._inotify.close()
+                self._inotify = None
+
+    def _mark(self, repos: Iterable[str]):
+        self._pending.update(repos)
+        self._last_event = time.monotonic()
+
+    def _reconcile(self, watched: set[str], desired: set[str]):
+        for repo in watched - desired:
+            self._unwatch_repo(repo)
+        mounts = _mount_fstypes() if self.backend == "auto" else []
+        for repo in sorted(desired - watched):
+            use_inotify = (
+                self._inotify is not None and not self._limit_reached
+                and _fstype(repo, mounts) not in POLLING_FILESYSTEMS
+            )
+            if not (use_inotify and self._watch_repo_inotify(repo)):
+                self._polled[repo] = compute_fingerprint(repo)
+
+    # ─── inotify ────────────────────────────────────────────────────────────────
+
+    def _watch_repo_inotify(self, repo: str) -> bool:
+        reader = GitDirReader(repo)
+        if reader.git_dir is None:
+            return False
+        self._repo_wds[repo] = set()
+        try:
+            for directory in dict.fromkeys((reader.git_dir, reader.common_dir)):
+                self._add_dir(repo, directory, False)
+            self._add_tree(repo, os.path.join(reader.common_dir, "refs"))
+        except OSError as e:
+            self._unwatch_repo(repo)
+            if e.errno == errno.ENOSPC:
+                # Limite fs.inotify.max_user_watches atteinte : le reste passe en polling
+                self._limit_reached = True
+                print("Limite inotify atteinte, surveillance par polling pour les repositories restants")
+            return False
+        return True
+
+    def _add_tree(self, repo: str, directory: str):
+        self._add_dir(repo, directory, True)
+        try:
+            with os.scandir(directory) as it:
+                subdirs = [entry.path for entry in it if entry.is_dir(follow_symlinks=False)]
+        except OSError:
+            return
+        for subdir in subdirs:
+            self._add_tree(repo, subdir)
+
+    def _add_dir(self, repo: str, directory: str, is_refs: bool):
+        # Un même dossier commun peut être partagé par plusieurs worktrees
+        wd = self._dir_wds.get(directory)
+        if wd is None:
+            wd = self._inotify.add_watch(directory)
+            self._dir_wds[directory] = wd
+            self._watch_dirs[wd] = (directory, is_refs, set())
+        self._watch_dirs[wd][2].add(repo)
+        self._repo_wds[repo].add(wd)
+
+    def _unwatch_repo(self, repo: str):
+        self._polled.pop(repo, None)
+        for wd in self._repo_wds.pop(repo, ()):
+            entry = self._watch_dirs.get(wd)
+            if entry is None:
+                continue
+            entry[2].discard(repo)
+            if not entry[2]:
+                self._drop_watch(wd)
+                self._inotify.rm_watch(wd)
+
+    def _drop_watch(self, wd: int):
+        directory, _, repos = self._watch_dirs.pop(wd)
+        self._dir_wds.pop(directory, None)
+        for repo in repos:
+            self._repo_wds.get(repo, set()).discard(wd)
+
+    def _handle_events(self, events: list[tuple[int, int, str]]):
+        for wd, mask, name in events:
+            if mask & _IN_Q_OVERFLOW:
+                # Événements perdus : tout ce qui est surveillé par inotify est à revoir
+                self._mark(self._repo_wds)
+                continue
+            entry = self._watch_dirs.get(wd)
+            if entry is None:
+                continue
+            directory, is_refs, repos = entry
+            if mask & _IN_IGNORED:
+                self._drop_watch(wd)  # Dossier supprimé
+                continue
+            if name.endswith(".lock"):
+                continue
+            if is_refs and mask & _IN_ISDIR and mask & (_IN_CREATE | _IN_MOVED_TO):
+                # Nouveau dossier de refs (ex: refs/heads/feature/) : le surveiller aussi
+                for repo in list(repos):
+                    try:
+                        self._add_tree(repo, os.path.join(directory, name))
+                    except OSError:
+                        pass
+            if is_refs or name in WATCHED_NAMES:
+                self._mark(repos)
+
+    # ─── Polling ────────────────────────────────────────────────────────────────
+
+    def _poll(self):
+        changed = []
+        for repo, fingerprint in self._polled.items():
+            current = compute_fingerprint(repo)
+            if current != fingerprint:
+                self._polled[repo] = current
+                changed.append(repo)
+        if changed:
+            self._mark(changed)
@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+"""
+RepoScan - Cache persistant des résultats d'analyse.
+
+Chaque repository est associé à une empreinte peu coûteuse : mtime et taille de
+HEAD, index, packed-refs, config, de la ref de la branche courante et de la ref
+upstream. Tant que l'empreinte ne change pas, le résultat en cache est réutilisé
+et aucune commande git n'est lancée.
+
+Limite : une modification du working directory qui n'est pas encore passée par
+l'index ne touche pas .git. D'où l'expiration des entrées après
+`scan_cache_ttl_seconds`.
+"""
+
+import json
+import os
+import threading
+import time
+
+from git_dir_reader import GitDirReader
+from git_status import StatusSummary, LastCommit
+
+
+CACHE_VERSION = 2
+
+# Attributs simples de GitRepoInfo conservés dans le cache (status et last_commit à part)
+CACHED_FIELDS = (
+    "current_branch",
+    "upstream",
+    "ahead",
+    "behind",
+    "remote_url",
+)
+
+
+def compute_fingerprint(path: str) -> list | None:
+    """Empreinte (mtime_ns, taille) des fichiers .git qui changent quand l'état du repo change."""
+    reader = GitDirReader(path)
+    if reader.git_dir is None:
+        return None
+
+    files = [
+        os.path.join(reader.git_dir, "HEAD"),
+        os.path.join(reader.git_dir, "index"),
+        os.path.join(reader.common_dir, "packed-refs"),
+        os.path.join(reader.common_dir, "config"),
+    ]
+    branch, _ = reader.read_head()
+    if branch:
+        files.append(os.path.join(reader.common_dir, "refs", "heads", branch))
+        upstream_ref = reader.upstream(branch)[1]
+        if upstream_ref:
+            files.append(os.path.join(reader.common_dir, upstream_ref))
+
+    fingerprint = []
+    for file_path in files:
+        try:
+            st = os.stat(file_path)
+            fingerprint.append([st.st_mtime_ns, st.st_size])
+        except OSError:
+            fingerprint.append(None)
+    return fingerprint
+
+
+class ScanCache:
+    """Cache JSON des analyses, indexé par chemin absolu du repository."""
+
+    def __init__(self, cache_file: str, ttl_seconds: float = 600):
+        self.cache_file = cache_file
+        self.ttl_seconds = ttl_seconds
+        self._entries: dict[str, dict] = {}
+        self._lock = threading.Lock()
+        self._load()
+
+    @classmethod
+    def for_config(cls, config) -> "ScanCache | None":
+        """Construit le cache à côté de config.json, ou None s'il est désactivé."""
+        if not config.get('scan_cache', True):
+            return None
+        cache_file = os.path.join(os.path.dirname(os.path.abspath(config.config_file)), "scan_cache.json")
+        return cls(cache_file, config.get('scan_cache_ttl_seconds', 600))
+
+    def _load(self):
+        try:
+            with open(self.cache_file, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if data.get("version") == CACHE_VERSION:
+                self._entries = data.get("entries", {})
+        except (OSError, ValueError, AttributeError):
+            self._entries = {}
+
+    def save(self):
+        """Écrit le cache de manière atomique (fichier temporaire puis remplacement)."""
+        with self._lock:
+            data = {"version": CACHE_VERSION, "entries": self._entries}
+        tmp_file = self.cache_file + ".tmp"
+        try:
+            with open(tmp_file, 'w', encoding='utf-8') as f:
+                json.dump(data, f, ensure_ascii=False)
+            os.replace(tmp_file, self.cache_file)
+        except OSError as e:
+            print(f"Erreur lors de la sauvegarde du cache de scan: {e}")
+
+    # ─── Lecture / écriture d'entrées ───────────────────────────────────────────
+
+    def lookup(self, path: str) -> tuple[list | None, dict | None]:
+        """Retourne (empreinte actuelle, données en cache si toujours valides)."""
+        key = os.path.abspath(path)
+        fingerprint = compute_fingerprint(key)
+        if fingerprint is None:
+            return None, None
+        entry = self._entries.get(key)
+        if not entry or entry.get("fingerprint") != fingerprint:
+            return fingerprint, None
+        if self.ttl_seconds and time.time() - entry.get("analyzed_at", 0) > self.ttl_seconds:
+            return fingerprint, None
+        return fingerprint, entry.get("data")
+
+    def store(self, path: str, fingerprint: list | None, repo):
+        """Enregistre le résultat d'analyse d'un repository Git."""
+        if fingerprint is None or not repo.is_git_repo:
+            return
+        data = {field: getattr(repo, field) for field in CACHED_FIELDS}
+        if repo.status is not None:
+            data["status"] = repo.status.to_dict()
+        if repo.last_commit is not None:
+            commit = repo.last_commit
+            data["last_commit"] = [commit.short_hash, commit.timestamp, commit.subject]
+        with self._lock:
+            self._entries[os.path.abspath(path)] = {
+                "fingerprint": fingerprint,
+                "analyzed_at": time.time(),
+                "data": data,
+            }
+
+    @staticmethod
+    def restore(repo, data: dict):
+        """Recharge dans un GitRepoInfo non analysé les valeurs mises en cache."""
+        repo.is_git_repo = True
+        for field in CACHED_FIELDS:
+            if field in data:
+                setattr(repo, field, data[field])
+        if data.get("status") is not None:
+            repo.status = StatusSummary.from_dict(data["status"])
+        if data.get("last_commit") is not None:
+            repo.last_commit = LastCommit(*data["last_commit"])
+
+    # ─── Éviction ───────────────────────────────────────────────────────────────
+
+    def evict(self, root_path: str, seen_paths):
+        """Supprime les entrées des repositories supprimés ou déplacés.
+
+        Une entrée est retirée si son .git n'existe plus, ou si elle se trouve sous
+        root_path sans avoir été rencontrée par le dernier scan.
+        """
+        root = os.path.join(os.path.abspath(root_path), "")
+        seen = {os.path.abspath(p) for p in seen_paths}
+        with self._lock:
+            for key in list(self._entries):
+                if key in seen:
+                    continue
+                if key.startswith(root) or not os.path.exists(os.path.join(key, ".git")):
+                    del self._entries[key]
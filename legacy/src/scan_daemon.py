@@ -0,0 +1,342 @@
+#!/usr/bin/env python3
+"""
+RepoScan - Daemon de scan : garde l'état des repositories à jour en arrière-plan.
+
+Le daemon scanne les racines configurées, puis tient l'état à jour :
+- ré-analyse des repositories modifiés sur disque (RepoWatcher, comme l'interface graphique)
+- scan complet toutes les `daemon_rescan_seconds` (repositories ajoutés ou supprimés,
+  modifications du working directory qui ne touchent pas .git), ou sur demande
+- tailles sur disque et index d'activité après chaque scan
+
+Il sert cet état sur une socket UNIX (protocole : voir daemon_client.py). Les
+deux interfaces s'y rattachent au lancement et affichent l'état immédiatement,
+sans scan ; sans daemon, elles scannent elles-mêmes comme avant.
+
+Usage :
+  python3 scan_daemon.py            # Lance le daemon au premier plan (Ctrl+C pour l'arrêter)
+  python3 scan_daemon.py --status   # État du daemon en cours
+  python3 scan_daemon.py --rescan   # Demande un scan complet
+  python3 scan_daemon.py --stop     # Arrête le daemon
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import signal
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+# Ajouter le dossier src au path pour l'import relatif
+sys.path.insert(0, str(Path(__file__).parent))
+from config_manager import ConfigManager
+import git_profiler
+from scan_engine import ScanEngine, check_roots
+from repo_watcher import RepoWatcher
+from daemon_client import DaemonClient, encode, is_supported, socket_path_for_config
+
+
+# Taille max d'une requête (une ligne JSON)
+_MAX_REQUEST = 1 << 20
+
+# Événements en attente au-delà desquels un client qui ne lit plus est déconnecté
+_MAX_CLIENT_BUFFER = 64 << 20
+
+
+def _log(message: str):
+    print(f"[{datetime.now().strftime('%H:%M:%S')}] {message}", flush=True)
+
+
+class ScanDaemon:
+    """État des repositories des racines configurées, servi sur une socket UNIX.
+
+    Tout s'exécute dans une seule boucle asyncio ; seul le watcher a son propre
+    thread, et repasse par la boucle (call_soon_threadsafe).
+    """
+
+    def __init__(self, config, socket_path: str):
+        self.config = config
+        self.socket_path = socket_path
+        self.engine = ScanEngine(config)
+        self.roots = check_roots(self.engine.roots())
+        self.rescan_interval = config.get('daemon_rescan_seconds', 300)
+        self.sections = []       # [(racine, repositories)], comme ScanEngine.scan_roots
+        self.repo_by_path = {}
+        self.version = 0         # Incrémentée à chaque changement de l'état
+        self.scanned_at = None   # Fin du dernier scan complet (epoch)
+        self.subscribers = set()
+        self.watcher = RepoWatcher.for_config(config, self._on_repos_changed)
+        self._snapshot_line = None  # État complet encodé, réutilisé tant que version ne change pas
+        self._loop = None
+        self._ready = None          # Premier scan terminé
+        self._rescan_requested = None
+        self._main_task = None
+        self._tasks = set()         # Ré-analyses en cours
+        self._handlers = set()      # Connexions clientes en cours
+
+    # ─── État ───────────────────────────────────────────────────────────────────
+
+    def _snapshot(self) -> bytes:
+        if self._snapshot_line is None:
+            self._snapshot_line = encode({
+                "event": "snapshot",
+                "version": self.version,
+                "scanned_at": self.scanned_at,
+                "roots": self.roots,
+                "sections": [[root, [repo.to_state() for repo in repos]] for root, repos in self.sections],
+            })
+        return self._snapshot_line
+
+    def _changed(self):
+        self.version += 1
+        self._snapshot_line = None
+
+    def _broadcast(self, message: dict | bytes):
+        """Écrit un événement à tous les clients rattachés (sans attendre qu'ils le lisent)."""
+        if not self.subscribers:
+            return
+        line = message if isinstance(message, bytes) else encode(message)
+        for writer in list(self.subscribers):
+            if writer.is_closing() or writer.transport.get_write_buffer_size() > _MAX_CLIENT_BUFFER:
+                self.subscribers.discard(writer)
+                writer.close()
+            else:
+                writer.write(line)
+
+    @property
+    def git_repos(self) -> list:
+        return [repo for repo in self.repo_by_path.values() if repo.is_git_repo]
+
+    # ─── Scan et mises à jour ───────────────────────────────────────────────────
+
+    async def rescan(self):
+        start = time.monotonic()
+        sections = await self.engine.scan_roots(self.roots)
+        self.engine.finish_scan(sections)
+
+        # Les tailles du scan précédent restent affichées jusqu'à la nouvelle mesure
+        previous = self.repo_by_path
+        self.sections = sections
+        self.repo_by_path = {repo.path: repo for _, repos in sections for repo in repos}
+        for path, repo in self.repo_by_path.items():
+            if path in previous and repo.disk_usage is None:
+                repo.disk_usage = previous[path].disk_usage
+        self.scanned_at = time.time()
+        self._changed()
+        self._broadcast(self._snapshot())
+        _log(f"Scan terminé : {len(self.git_repos)} repositories en {time.monotonic() - start:.1f}s")
+
+        git_repos = self.git_repos
+        if self.watcher:
+            self.watcher.watch(repo.path for repo in git_repos)
+
+        measured = []
+        await self.engine.measure_disk_usage(git_repos, measured.append)
+        self._publish_repos([repo for repo in measured if self.repo_by_path.get(repo.path) is repo])
+        await self._index_activity(git_repos, always_notify=True)
+
+    def _on_repos_changed(self, paths):
+        """Appelé par le watcher (thread de fond)."""
+        self._loop.call_soon_threadsafe(self._schedule_reanalyze, paths)
+
+    def _schedule_reanalyze(self, paths):
+        changed = [self.repo_by_path[path] for path in paths if path in self.repo_by_path]
+        if changed:
+            task = asyncio.ensure_future(self._reanalyze(changed))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _reanalyze(self, repos: list):
+        fresh_repos = []
+        for old, fresh in await self.engine.reanalyze(repos):
+            if self.repo_by_path.get(old.path) is not old:
+                continue  # Un scan complet a remplacé ce repository entre-temps
+            for _, section_repos in self.sections:
+                if old in section_repos:
+                    section_repos[section_repos.index(old)] = fresh
+            self.repo_by_path[fresh.path] = fresh
+            fresh_repos.append(fresh)
+        self._publish_repos(fresh_repos)
+        await self._index_activity(fresh_repos)
+
+    def _publish_repos(self, repos: list):
+        if repos:
+            self._changed()
+            self._broadcast({"event": "repos", "version": self.version, "repos": [repo.to_state() for repo in repos]})
+
+    async def _index_activity(self, repos: list, always_notify: bool = False):
+        if not self.engine.activity or not repos:
+            return
+        added, rewritten = await self.engine.index_activity(repos)
+        if added or rewritten or always_notify:
+            # Les clients relisent les sparklines dans l'index partagé (SQLite)
+            self._broadcast({"event": "activity"})
+
+    # ─── Socket ─────────────────────────────────────────────────────────────────
+
+    async def _handle_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        handler = asyncio.current_task()
+        self._handlers.add(handler)
+        try:
+            request = json.loads(await reader.readline() or b"{}")
+            op = request.get("op")
+            if op in ("snapshot", "attach"):
+                roots = request.get("roots")
+                if roots is not None and set(roots) != set(self.roots):
+                    writer.write(encode({"error": "Le daemon scanne d'autres racines", "roots": self.roots}))
+                    return
+                if not self._ready.is_set():
+                    # Réponse immédiate : le client scanne lui-même plutôt que d'attendre
+                    writer.write(encode({"error": "Premier scan du daemon en cours"}))
+                    return
+                writer.write(self._snapshot())
+                if op == "attach":
+                    self.subscribers.add(writer)
+                    # Jusqu'à la déconnexion, le client peut demander un scan complet
+                    while line := await reader.readline():
+                        if json.loads(line).get("op") == "rescan":
+                            self._rescan_requested.set()
+            elif op == "rescan":
+                self._rescan_requested.set()
+                writer.write(encode({"ok": True}))
+            elif op == "status":
+                writer.write(encode({
+                    "ok": True,
+                    "pid": os.getpid(),
+                    "roots": self.roots,
+                    "version": self.version,
+                    "scanned_at": self.scanned_at,
+                    "repositories": len(self.git_repos),
+                    "clients": len(self.subscribers),
+                }))
+            elif op == "stop":
+                writer.write(encode({"ok": True}))
+                self.stop()
+            else:
+                writer.write(encode({"error": f"Requête inconnue: {op}"}))
+            await writer.drain()
+        except (ConnectionError, ValueError, AttributeError):
+            pass
+        finally:
+            self.subscribers.discard(writer)
+            self._handlers.discard(handler)
+            writer.close()
+
+    def stop(self):
+        if self._main_task:
+            self._main_task.cancel()
+
+    async def serve(self):
+        self._loop = asyncio.get_running_loop()
+        self._ready = asyncio.Event()
+        self._rescan_requested = asyncio.Event()
+        self._main_task = asyncio.current_task()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            self._loop.add_signal_handler(sig, self.stop)
+
+        server = await asyncio.start_unix_server(self._handle_client, path=self.socket_path, limit=_MAX_REQUEST)
+        os.chmod(self.socket_path, 0o600)  # État des repositories : lisible par l'utilisateur seulement
+        _log(f"Daemon en écoute sur {self.socket_path} ({len(self.roots)} racines)")
+        try:
+            while True:
+                self._rescan_requested.clear()
+                try:
+                    await self.rescan()
+                except Exception as e:
+                    _log(f"Erreur lors du scan: {e}")
+                self._ready.set()
+                try:
+                    await asyncio.wait_for(self._rescan_requested.wait(), self.rescan_interval or None)
+                except asyncio.TimeoutError:
+                    pass
+        except asyncio.CancelledError:
+            pass
+        finally:
+            _log("Arrêt du daemon")
+            server.close()
+            for writer in list(self.subscribers):
+                writer.close()
+            if self._handlers:
+                # Les connexions fermées se terminent d'elles-mêmes (fin de flux)
+                await asyncio.wait(list(self._handlers), timeout=1)
+            for task in list(self._tasks):
+                task.cancel()
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+            if self.watcher:
+                self.watcher.stop()
+            self.engine.close()
+            try:
+                os.unlink(self.socket_path)
+            except OSError:
+                pass
+
+
+def _print_status(status: dict):
+    scanned_at = status.get("scanned_at")
+    scanned = datetime.fromtimestamp(scanned_at).strftime('%Y-%m-%d %H:%M:%S') if scanned_at else "en cours"
+    print(f"Daemon actif (pid {status['pid']}) : {status['repositories']} repositories, "
+          f"dernier scan {scanned}, {status['clients']} clients rattachés")
+    for root in status["roots"]:
+        print(f"  📁 {root}")
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="RepoScan (Daemon) - Garde l'état des repositories à jour et le sert aux interfaces",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Exemples d'utilisation:
+  python3 scan_daemon.py               # Lance le daemon (racines de config.json)
+  python3 scan_daemon.py --status      # Affiche l'état du daemon
+  python3 scan_daemon.py --rescan      # Demande un scan complet
+  python3 scan_daemon.py --stop        # Arrête le daemon
+        """
+    )
+    action = parser.add_mutually_exclusive_group()
+    action.add_argument('--status', action='store_true', help="Affiche l'état du daemon en cours et quitte")
+    action.add_argument('--rescan', action='store_true', help='Demande un scan complet au daemon en cours')
+    action.add_argument('--stop', action='store_true', help='Arrête le daemon en cours')
+    parser.add_argument(
+        '--profile',
+        action='store_true',
+        help='Mesure chaque commande git et affiche un rapport à l\'arrêt du daemon'
+    )
+    args = parser.parse_args()
+
+    if not is_supported():
+        print("❌ Erreur: Le daemon nécessite les sockets UNIX (Linux, macOS, WSL).")
+        sys.exit(1)
+
+    config = ConfigManager()
+    socket_path = socket_path_for_config(config)
+    client = DaemonClient(socket_path, config.get('daemon_timeout_seconds', 5))
+
+    if args.status or args.rescan or args.stop:
+        op = "status" if args.status else "rescan" if args.rescan else "stop"
+        reply = client.request({"op": op})
+        if reply is None:
+            print(f"[!] Aucun daemon en écoute sur {socket_path}")
+            sys.exit(1)
+        if args.status:
+            _print_status(reply)
+        else:
+            print("[+] Scan complet demandé" if args.rescan else "[+] Daemon arrêté")
+        return
+
+    if client.request({"op": "status"}) is not None:
+        print(f"[!] Un daemon est déjà en écoute sur {socket_path}")
+        sys.exit(1)
+    if os.path.exists(socket_path):
+        os.unlink(socket_path)  # Socket restée d'un daemon arrêté brutalement
+
+    git_profiler.enable_cli_report(args.profile, None)
+    daemon = ScanDaemon(config, socket_path)
+    if not daemon.roots:
+        sys.exit(1)
+    asyncio.run(daemon.serve())
+
+
+if __name__ == "__main__":
+    main()
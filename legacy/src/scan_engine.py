@@ -0,0 +1,489 @@
+#!/usr/bin/env python3
+"""
+RepoScan - Moteur de scan commun aux deux interfaces (Tk et console).
+
+Regroupe derrière une seule API ce que les interfaces dupliquaient :
+- GitRepoInfo : analyse d'un repository (git, ou lecture directe de .git en fast mode)
+- ScanEngine : découverte, analyse parallèle, cache de scan, ré-analyse, fetch, pull,
+  lecture d'objets git, index d'activité et tailles sur disque, paramétrés par
+  la configuration (profondeur, filtres, concurrence, timeouts)
+
+Les interfaces ne s'occupent plus que de l'affichage : elles reçoivent les
+repositories via des callbacks et pilotent les coroutines du moteur avec
+asyncio.run (console) ou l'EventLoopThread (Tk).
+"""
+
+import asyncio
+import os
+import time
+from typing import Callable
+
+from git_status import analyze_worktree, analyze_sync, LastCommit
+from git_dir_reader import analyze_git_dir
+from git_runner import AsyncGitRunner
+from git_cat_file import CatFilePool
+from repo_scanner import (
+    iter_repo_candidates, candidates_in_thread, analyze_candidates_async, stream_candidates_async,
+    cancel_tasks, resolve_concurrency, nested_roots, ScanFilter, RepoIdentities,
+)
+from scan_cache import ScanCache
+from activity_index import ActivityIndex, index_steps, sparkline
+from disk_usage import DiskUsageAnalyzer
+from fetch_executor import FetchExecutor, FetchResult
+from pull_executor import PullExecutor, PullResult, PULL_COMMAND
+from repo_record import RepoRecord
+from daemon_client import DaemonClient
+
+
+class GitRepoInfo(RepoRecord):
+    __slots__ = ("fast_mode",)
+
+    def __init__(self, path, relative_path=None, fast_mode=False):
+        """Repository non analysé : voir analyze_async (ScanEngine.make_repo en crée un par repository)."""
+        super().__init__(path, relative_path)
+        self.fast_mode = fast_mode
+
+    async def fetch_from_remote(self, runner, timeout=30):
+        """Effectue un git fetch pour ce repository (via l'AsyncGitRunner)"""
+        if not self.is_git_repo:
+            return {"success": False, "error": "Not a git repository"}
+
+        # Pas de prompt d'identifiants : un fetch qui attend une saisie irait jusqu'au timeout
+        result = await runner.run(self.path, ["fetch", "--all"], timeout, env={"GIT_TERMINAL_PROMPT": "0"})
+
+        if result.ok:
+            # Seules les infos de synchronisation changent après un fetch
+            await runner.run_steps(self._sync_steps(), self.path)
+            return {"success": True, "message": "Fetch successful"}
+        elif result.timed_out:
+            return {"success": False, "error": f"Fetch timeout ({timeout:g}s)"}
+        else:
+            return {"success": False, "error": result.stderr.strip() or "Fetch failed"}
+
+    async def pull_fast_forward(self, runner, timeout=60):
+        """Avance la branche courante jusqu'à son upstream, sans commit de merge (via l'AsyncGitRunner)"""
+        result = await runner.run(self.path, PULL_COMMAND, timeout)
+
+        if result.ok:
+            # Le working directory reste propre : seuls l'avance/retard et le dernier commit changent
+            await runner.run_steps(self._sync_steps(), self.path)
+            return {"success": True, "message": "Pull successful"}
+        elif result.timed_out:
+            return {"success": False, "error": f"Pull timeout ({timeout:g}s)"}
+        else:
+            # Première ligne de l'erreur git (les suivantes détaillent les fichiers en cause)
+            error = result.stderr.strip() or result.stdout.strip()
+            return {"success": False, "error": error.splitlines()[0] if error else "Pull failed"}
+
+    async def analyze_async(self, runner):
+        """Analyse le repository via l'AsyncGitRunner (processus git non bloquants)"""
+        await runner.run_steps(self._analysis_steps(), self.path)
+
+    def _analysis_steps(self):
+        """Générateur d'analyse : produit les commandes git, reçoit leur sortie (voir git_runner)"""
+        if not os.path.exists(os.path.join(self.path, ".git")):
+            return
+
+        self.is_git_repo = True
+
+        # Fast mode : lecture directe de .git, git n'est lancé que pour le statut
+        state = (yield from analyze_git_dir(self.path)) if self.fast_mode else None
+        read_from_git_dir = state is not None
+        if not read_from_git_dir:
+            # Branche, upstream, avance/retard et statut : un seul appel status, un seul appel log
+            state = yield from analyze_worktree()
+
+        if state.branch:
+            self.current_branch = state.branch.head
+            self.upstream = state.branch.upstream
+            self.ahead, self.behind = state.branch.ahead, state.branch.behind
+
+        self.status = state.status
+        self.last_commit = state.last_commit
+
+        # URL remote
+        remote = state.remote_url if read_from_git_dir else (yield ["remote", "get-url", "origin"])
+        if remote:
+            self.remote_url = remote
+
+    def _sync_steps(self):
+        """Après un fetch : recalcule seulement l'avance/retard et le dernier commit"""
+        ahead_behind, last_commit = yield from analyze_sync()
+        self.ahead, self.behind = ahead_behind if ahead_behind else (None, None)
+        if last_commit:
+            self.last_commit = last_commit
+
+
+def resolve_roots(config, root_path: str | None = None) -> list[str]:
+    """Racines à scanner : root_path s'il est donné, sinon `repository_roots`, sinon
+    `default_repository_path`. Chemins absolus (~ développé), sans doublons."""
+    if root_path:
+        paths = [root_path]
+    else:
+        paths = config.get('repository_roots') or [config.get('default_repository_path')]
+    roots = []
+    for path in paths:
+        if not path:
+            continue
+        path = os.path.abspath(os.path.expanduser(path))
+        if path not in roots:
+            roots.append(path)
+    return roots
+
+
+def check_roots(roots: list[str]) -> list[str]:
+    """Signale les racines introuvables (au démarrage des interfaces) et retourne celles qui existent."""
+    existing = [root for root in roots if os.path.isdir(root)]
+    for root in roots:
+        if root not in existing:
+            print(f"❌ Erreur: Le chemin '{root}' n'existe pas." if len(roots) == 1
+                  else f"⚠️  Racine ignorée, le chemin '{root}' n'existe pas.")
+    if not roots:
+        print("❌ Erreur: Aucun dossier à explorer (default_repository_path ou repository_roots).")
+    elif not existing and len(roots) > 1:
+        print("❌ Erreur: Aucune des racines configurées n'existe.")
+    return existing
+
+
+def _in_loop(callback: Callable | None) -> Callable | None:
+    """Callback du walker (appelé dans son thread) exécuté dans la boucle asyncio courante."""
+    if callback is None:
+        return None
+    loop = asyncio.get_running_loop()
+    return lambda *args: loop.call_soon_threadsafe(callback, *args)
+
+
+async def _gather_or_cancel(coros) -> list:
+    """gather, mais une erreur annule proprement les autres coroutines (voir cancel_tasks)."""
+    tasks = [asyncio.ensure_future(coro) for coro in coros]
+    try:
+        return list(await asyncio.gather(*tasks))
+    except (Exception, asyncio.CancelledError):
+        await cancel_tasks(tasks)
+        raise
+
+
+class ScanEngine:
+    """Découverte, analyse, cache et fetch des repositories, selon la configuration.
+
+    Les méthodes async s'exécutent dans une seule boucle asyncio à la fois ; les
+    callbacks sont appelés depuis cette boucle.
+    """
+
+    def __init__(self, config):
+        self.config = config
+        self.scan_cache = ScanCache.for_config(config)
+        self.git_runner = AsyncGitRunner(
+            resolve_concurrency(config.get('scan_concurrency')),
+            config.get('git_timeout_seconds', 5)
+        )
+        # Sessions `git cat-file --batch` réutilisées d'une requête d'objets à l'autre
+        self.objects = CatFilePool.for_config(config)
+        # Commits de tous les repositories (SQLite), None si désactivé
+        self.activity = ActivityIndex.for_config(config)
+        # Tailles working tree / .git / artefacts, None si désactivé
+        self.disk_usage = DiskUsageAnalyzer.for_config(config)
+        # Daemon de scan (scan_daemon.py) auquel les interfaces se rattachent, None si désactivé
+        self.daemon = DaemonClient.for_config(config)
+
+    @property
+    def max_depth(self) -> int:
+        return self.config.get('max_scan_depth', 3)
+
+    def make_repo(self, path: str, relative_path: str | None = None) -> GitRepoInfo:
+        """GitRepoInfo non analysé, dans le mode (fast ou non) de la configuration."""
+        return GitRepoInfo(path, relative_path, self.config.get('fast_scan', True))
+
+    @staticmethod
+    def _report_error(path: str, error: Exception):
+        print(f"[!] Erreur lors de l'analyse de {path}: {str(error)}")
+
+    def roots(self, root_path: str | None = None) -> list[str]:
+        return resolve_roots(self.config, root_path)
+
+    def candidates(
+        self,
+        root_path: str,
+        on_folder=None,
+        on_error=None,
+        identities: RepoIdentities | None = None,
+        rank: int = 0,
+        roots: list[str] = (),
+    ):
+        """Walker de découverte (chemins absolus : clés du cache, du registre et du watcher).
+
+        Les racines de `roots` contenues dans root_path ne sont pas parcourues :
+        leurs repositories restent sous la racine la plus précise.
+        """
+        root_path = os.path.abspath(root_path)
+        return iter_repo_candidates(
+            root_path,
+            self.max_depth,
+            on_folder=on_folder,
+            on_error=on_error or self._report_error,
+            scan_filter=ScanFilter.from_config(self.config, nested_roots(root_path, roots)),
+            identities=identities if identities is not None else RepoIdentities(),
+            rank=rank
+        )
+
+    # ─── Scan ───────────────────────────────────────────────────────────────────
+
+    async def scan(
+        self,
+        root_path: str,
+        on_discovered: Callable[[GitRepoInfo], None] | None = None,
+        on_analyzed: Callable[[GitRepoInfo], None] | None = None,
+        on_folder: Callable[[str], None] | None = None,
+        on_error: Callable[[str, Exception], None] | None = None,
+    ) -> list[GitRepoInfo]:
+        """Scan complet d'une racine : repositories et dossiers parents, dans l'ordre d'affichage.
+
+        Le cache évite de ré-analyser les repositories dont l'empreinte .git n'a
+        pas changé.
+        """
+        return await analyze_candidates_async(
+            self.candidates(root_path, on_folder, on_error),
+            self.make_repo, self.git_runner, self.scan_cache, on_discovered, on_analyzed
+        )
+
+    async def scan_roots(
+        self,
+        roots: list[str],
+        on_discovered: Callable[[str, GitRepoInfo], None] | None = None,
+        on_analyzed: Callable[[str, GitRepoInfo], None] | None = None,
+        on_folder: Callable[[str], None] | None = None,
+        on_error: Callable[[str, Exception], None] | None = None,
+    ) -> list[tuple[str, list[GitRepoInfo]]]:
+        """Scan de plusieurs racines en parallèle ; retourne [(racine, repositories)].
+
+        Chaque racine est parcourue dans son propre thread, les analyses partagent
+        la limite de processus git du runner. Le résultat ne dépend pas de l'ordre
+        d'arrivée des walkers :
+        - une racine contenue dans une autre garde son sous-arbre (la plus précise gagne) ;
+        - un repository atteint par plusieurs racines via des liens symboliques ou
+          des montages (même .git) reste sous la première racine de `roots`.
+        Dans ce second cas, rare, une autre racine a pu le remettre à on_discovered
+        avant que le doublon ne soit tranché ; il n'apparaît pas dans le résultat.
+        on_discovered et on_analyzed reçoivent (racine, repository). Tous les
+        callbacks sont appelés depuis la boucle asyncio.
+        """
+        identities = RepoIdentities()
+        on_folder, on_error = _in_loop(on_folder), _in_loop(on_error or self._report_error)
+
+        async def scan_root(rank, root):
+            repos = await analyze_candidates_async(
+                candidates_in_thread(self.candidates(root, on_folder, on_error, identities, rank, roots)),
+                self.make_repo, self.git_runner, self.scan_cache,
+                on_discovered and (lambda repo: on_discovered(root, repo)),
+                on_analyzed and (lambda repo: on_analyzed(root, repo))
+            )
+            return root, repos
+
+        sections = await _gather_or_cancel(scan_root(rank, root) for rank, root in enumerate(roots))
+        # Doublons tranchés une fois toutes les découvertes terminées
+        return [(root, identities.resolve(rank, repos)) for rank, (root, repos) in enumerate(sections)]
+
+    async def stream(
+        self,
+        roots: list[str],
+        on_result: Callable[[GitRepoInfo], None],
+        on_error: Callable[[str, Exception], None] | None = None,
+    ) -> int:
+        """Repositories Git seulement, remis dès la fin de leur analyse, sans les conserver.
+
+        Les racines sont parcourues en parallèle, sans doublons, une racine contenue
+        dans une autre gardant son sous-arbre (voir scan_roots). Les résultats
+        n'étant pas conservés, un repository atteint par deux racines via un lien
+        symbolique reste sous celle qui l'a rencontré la première.
+        """
+        identities = RepoIdentities()
+        on_error = _in_loop(on_error or self._report_error)
+        # Quelques analyses d'avance par processus git autorisé, jamais la liste complète
+        max_pending = self.git_runner.max_concurrency * 4
+        try:
+            counts = await _gather_or_cancel(
+                stream_candidates_async(
+                    candidates_in_thread(self.candidates(root, on_error=on_error, identities=identities, roots=roots)),
+                    self.make_repo, self.git_runner, on_result, self.scan_cache, max_pending
+                )
+                for root in roots
+            )
+            return sum(counts)
+        finally:
+            # Pas d'éviction ici : elle demanderait de garder la liste de tous les chemins
+            self.save_cache()
+
+    def finish_scan(self, sections: list[tuple[str, list]]):
+        """Après scan_roots : retire du cache et de l'index d'activité les repositories
+        disparus, puis sauvegarde le cache."""
+        # Chemins vus sous toutes les racines : elles peuvent se recouvrir
+        seen = [repo.path for _, repos in sections for repo in repos if repo.is_git_repo]
+        if self.scan_cache:
+            for root, _ in sections:
+                self.scan_cache.evict(root, seen)
+            self.scan_cache.save()
+        if self.activity:
+            self.activity.evict([root for root, _ in sections], seen)
+        if self.disk_usage and self.disk_usage.cache:
+            self.disk_usage.cache.evict([root for root, _ in sections], seen)
+
+    def save_cache(self):
+        if self.scan_cache:
+            self.scan_cache.save()
+
+    # ─── Daemon ─────────────────────────────────────────────────────────────────
+
+    def repo_from_state(self, state: dict) -> GitRepoInfo:
+        """GitRepoInfo reconstruit depuis un état envoyé par le daemon (RepoRecord.to_state)."""
+        repo = self.make_repo(state["path"], state["relative_path"])
+        repo.restore_state(state)
+        return repo
+
+    def sections_from_snapshot(self, snapshot: dict) -> list[tuple[str, list[GitRepoInfo]]]:
+        """[(racine, repositories)] d'un état complet du daemon, comme scan_roots."""
+        return [(root, [self.repo_from_state(state) for state in states]) for root, states in snapshot["sections"]]
+
+    def daemon_snapshot(self, roots: list[str]) -> tuple[list[tuple[str, list[GitRepoInfo]]], float | None] | None:
+        """(sections, fin du dernier scan du daemon), ou None s'il n'y a pas de daemon pour ces racines."""
+        snapshot = self.daemon.snapshot(roots) if self.daemon else None
+        return (self.sections_from_snapshot(snapshot), snapshot.get("scanned_at")) if snapshot else None
+
+    # ─── Mises à jour ───────────────────────────────────────────────────────────
+
+    async def reanalyze(self, repos: list) -> list[tuple[GitRepoInfo, GitRepoInfo]]:
+        """Ré-analyse des repositories modifiés sur disque.
+
+        Retourne des paires (ancien, nouveau) : l'ancien objet n'est pas modifié,
+        l'interface peut encore l'afficher pendant l'analyse.
+        """
+        async def reanalyze_one(repo):
+            fingerprint = self.scan_cache.lookup(repo.path)[0] if self.scan_cache else None
+            fresh = self.make_repo(repo.path, repo.relative_path)
+            await fresh.analyze_async(self.git_runner)
+            fresh.disk_usage = repo.disk_usage  # Mesuré à part, pas par l'analyse git
+            if self.scan_cache:
+                self.scan_cache.store(repo.path, fingerprint, fresh)
+            return repo, fresh
+
+        return await _gather_or_cancel(reanalyze_one(repo) for repo in repos)
+
+    async def refresh_sync(self, repos: list):
+        """Recalcule avance/retard et dernier commit (comme après un fetch), sans git fetch."""
+        await _gather_or_cancel(
+            self.git_runner.run_steps(repo._sync_steps(), repo.path) for repo in repos if repo.is_git_repo
+        )
+
+    # ─── Objets ─────────────────────────────────────────────────────────────────
+
+    async def recent_commits(self, repo, count: int | None = None) -> list[LastCommit]:
+        """Derniers commits de HEAD (premier parent), lus par la session cat-file du repository.
+
+        count : `recent_commits_count` de la configuration par défaut.
+        """
+        if not repo.is_git_repo:
+            return []
+        count = count or self.config.get('recent_commits_count', 10)
+        return await asyncio.to_thread(self.objects.recent_commits, repo.path, count)
+
+    def close(self):
+        """Ferme les processus git persistants (sessions cat-file), l'index d'activité et le cache des tailles."""
+        self.objects.close()
+        if self.activity:
+            self.activity.close()
+        if self.disk_usage and self.disk_usage.cache:
+            self.disk_usage.cache.close()
+
+    # ─── Tailles sur disque ─────────────────────────────────────────────────────
+
+    async def measure_disk_usage(
+        self,
+        repos: list,
+        on_measured: Callable[[GitRepoInfo], None] | None = None,
+        is_cancelled: Callable[[], bool] = lambda: False,
+    ):
+        """Mesure working tree, .git et artefacts des repositories Git (pool de threads).
+
+        repo.disk_usage est renseigné depuis la boucle asyncio, puis on_measured(repo)
+        est appelé, repository par repository.
+        """
+        if not self.disk_usage:
+            return
+        git_repos = {repo.path: repo for repo in repos if repo.is_git_repo}
+
+        def store(path, usage):
+            repo = git_repos[path]
+            repo.disk_usage = usage
+            if on_measured:
+                on_measured(repo)
+
+        await asyncio.to_thread(self.disk_usage.measure, list(git_repos), _in_loop(store), is_cancelled)
+
+    # ─── Activité ───────────────────────────────────────────────────────────────
+
+    async def index_activity(self, repos: list) -> tuple[int, int]:
+        """Ajoute à l'index d'activité les commits arrivés depuis la dernière indexation.
+
+        Retourne (nouveaux commits, repositories dont l'historique a été réécrit).
+        """
+        if not self.activity:
+            return 0, 0
+        watermarks = self.activity.watermarks()
+        history_days = self.config.get('activity_history_days', 365)
+        max_age = int(time.time() - history_days * 86400) if history_days > 0 else None
+        # Première indexation d'un gros historique : bien plus long qu'une commande d'analyse
+        timeout = self.config.get('activity_timeout_seconds', 120)
+
+        async def index_one(repo):
+            watermark = watermarks.get(repo.path)
+            update = await self.git_runner.run_steps(index_steps(repo.path, watermark, max_age), repo.path, timeout)
+            if update is None or update.head == watermark:
+                return 0, 0
+            # Écriture SQLite hors de la boucle : elle reste libre pour les processus git
+            await asyncio.to_thread(self.activity.apply, repo.path, update)
+            return len(update.commits), int(update.rewritten)
+
+        results = await _gather_or_cancel(index_one(repo) for repo in repos if repo.is_git_repo)
+        return sum(added for added, _ in results), sum(rewritten for _, rewritten in results)
+
+    def activity_sparklines(self) -> dict[str, str]:
+        """repository -> sparkline des commits par jour (`activity_sparkline_days` derniers jours)."""
+        if not self.activity:
+            return {}
+        counts = self.activity.daily_counts(self.config.get('activity_sparkline_days', 14))
+        return {repo: sparkline(days) for repo, days in counts.items()}
+
+    # ─── Fetch ──────────────────────────────────────────────────────────────────
+
+    def fetch_executor(self) -> FetchExecutor:
+        """Exécuteur configuré (concurrence globale, par hôte, timeout) ; un par opération."""
+        return FetchExecutor.for_config(self.config)
+
+    async def fetch_all(
+        self,
+        repos: list,
+        on_result: Callable[[FetchResult], None],
+        is_cancelled: Callable[[], bool] = lambda: False,
+        executor: FetchExecutor | None = None,
+    ) -> list[FetchResult]:
+        """Fetch des repositories Git ; chaque repository met à jour ses infos de sync."""
+        executor = executor or self.fetch_executor()
+        git_repos = [repo for repo in repos if repo.is_git_repo]
+        return await executor.fetch_all(git_repos, on_result, is_cancelled)
+
+    # ─── Pull ───────────────────────────────────────────────────────────────────
+
+    def pull_executor(self) -> PullExecutor:
+        """Exécuteur configuré (concurrence, timeout) ; un par opération."""
+        return PullExecutor.for_config(self.config)
+
+    async def pull_all(
+        self,
+        repos: list,
+        on_result: Callable[[PullResult], None],
+        is_cancelled: Callable[[], bool] = lambda: False,
+        executor: PullExecutor | None = None,
+    ) -> list[PullResult]:
+        """Pull fast-forward des repositories Git ; les vérifications passent par le runner d'analyse."""
+        executor = executor or self.pull_executor()
+        git_repos = [repo for repo in repos if repo.is_git_repo]
+        return await executor.pull_all(git_repos, on_result, is_cancelled, self.git_runner)
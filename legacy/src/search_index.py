@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+RepoScan - Index de recherche de l'interface graphique.
+
+Chaque repository a une chaîne de recherche en minuscules (chemin, branche,
+dernier commit) calculée une seule fois, puis recalculée seulement quand le
+repository change. Une requête qui prolonge la précédente ("ap" -> "api") ne
+parcourt que les résultats de la précédente.
+"""
+
+
+class SearchIndex:
+    """Filtre une liste ordonnée de repositories par sous-chaîne."""
+
+    def __init__(self):
+        self._repos: list = []
+        self._haystacks: dict[str, str] = {}  # chemin -> texte de recherche
+        self._last_term: str | None = None
+        self._last_result: list = []
+
+    @staticmethod
+    def _haystack(repo) -> str:
+        # Séparateur \n : une recherche ne peut pas correspondre à cheval sur deux champs
+        commit = repo.last_commit.format() if repo.last_commit else ""
+        return "\n".join((repo.relative_path, repo.current_branch or "", commit)).lower()
+
+    def _invalidate(self):
+        self._last_term = None
+        self._last_result = []
+
+    def clear(self):
+        self._repos = []
+        self._haystacks = {}
+        self._invalidate()
+
+    def add(self, repo):
+        """Ajoute un repository en fin de liste (ordre d'affichage)."""
+        self._repos.append(repo)
+        self._haystacks[repo.path] = self._haystack(repo)
+        self._invalidate()
+
+    def update(self, repo):
+        """Recalcule le texte d'un repository déjà indexé (après analyse, fetch...)."""
+        if repo.path not in self._haystacks:
+            return
+        haystack = self._haystack(repo)
+        if haystack != self._haystacks[repo.path]:
+            self._haystacks[repo.path] = haystack
+            self._invalidate()
+
+    def replace(self, old, new):
+        """Remplace l'objet d'un repository ré-analysé, à la même position."""
+        try:
+            self._repos[self._repos.index(old)] = new
+        except ValueError:
+            return
+        self._haystacks.pop(old.path, None)
+        self._haystacks[new.path] = self._haystack(new)
+        self._invalidate()
+
+    def retain(self, paths):
+        """Retire les repositories dont le chemin n'est pas dans paths."""
+        paths = set(paths)
+        self._repos = [repo for repo in self._repos if repo.path in paths]
+        self._haystacks = {path: text for path, text in self._haystacks.items() if path in paths}
+        self._invalidate()
+
+    def matches(self, repo, term: str) -> bool:
+        return not term or term in self._haystacks.get(repo.path, "")
+
+    def query(self, term: str) -> list:
+        """Repositories dont le chemin, la branche ou le dernier commit contient term."""
+        term = term.lower()
+        if not term:
+            return self._repos[:]
+        if self._last_term is not None and term.startswith(self._last_term):
+            candidates = self._last_result  # Requête plus précise : on ne fait que restreindre
+        else:
+            candidates = self._repos
+        haystacks = self._haystacks
+        result = [repo for repo in candidates if term in haystacks[repo.path]]
+        self._last_term, self._last_result = term, result
+        return result
@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+"""
+RepoScan - Modèle de lignes du Treeview, mis à jour par différence.
+
+Chaque repository garde le même item (identifiant stable) pendant toute la vie de
+la fenêtre. Au lieu de tout supprimer et tout ré-insérer :
+- une ligne dont les valeurs n'ont pas changé n'est pas touchée, sinon un seul item()
+- le filtrage détache les lignes masquées et ré-attache celles qui réapparaissent,
+  sans recréer d'item
+- un item n'est créé dans le Treeview que la première fois qu'il est affiché
+
+Les lignes peuvent être rangées dans des sections repliables (une par racine
+scannée) : chaque ligne garde sa section, les positions sont relatives à celle-ci.
+"""
+
+import itertools
+
+
+class TreeRowModel:
+    """Lignes d'un ttk.Treeview, indexées par chemin de repository, éventuellement dans des sections."""
+
+    def __init__(self, tree):
+        self.tree = tree
+        self._ids = itertools.count(1)
+        self._item_by_path: dict[str, str] = {}
+        self._path_by_item: dict[str, str] = {}
+        self._rows: dict[str, tuple[tuple, tuple]] = {}  # item -> (valeurs, tags)
+        self._created: set[str] = set()  # items existant dans le Treeview
+        self._attached: list[str] = []  # items affichés, dans l'ordre
+        self._attached_set: set[str] = set()
+        self._parent: dict[str, str] = {}  # item -> section ('' : à plat)
+        self._sections: dict[str, str] = {}  # clé -> item de section
+        self._section_rows: dict[str, tuple] = {}  # item de section -> valeurs
+
+    def item_for(self, path: str) -> str | None:
+        return self._item_by_path.get(path)
+
+    def path_for(self, item: str) -> str | None:
+        return self._path_by_item.get(item)
+
+    def section_for(self, key: str) -> str:
+        """Item de la section (ou '' si elle n'existe pas : ligne à plat)."""
+        return self._sections.get(key, '')
+
+    def set_sections(self, sections):
+        """Définit les sections [(clé, valeurs)], dans cet ordre ; [] pour un affichage à plat.
+
+        Les lignes doivent être masquées (show([])) avant de retirer une section :
+        supprimer un item du Treeview supprime aussi ses enfants attachés.
+        """
+        keys = [key for key, _ in sections]
+        for key in [key for key in self._sections if key not in keys]:
+            item = self._sections.pop(key)
+            del self._section_rows[item]
+            self.tree.delete(item)
+        for index, (key, values) in enumerate(sections):
+            values = tuple(values)
+            item = self._sections.get(key)
+            if item is None:
+                item = self._sections[key] = f"section{next(self._ids)}"
+                self.tree.insert('', index, iid=item, values=values, tags=('section',), open=True)
+            else:
+                if self._section_rows[item] != values:
+                    self.tree.item(item, values=values)
+                self.tree.move(item, '', index)
+            self._section_rows[item] = values
+
+    def set_row(self, path: str, values, tags, section: str | None = None) -> str:
+        """Crée ou met à jour la ligne d'un repository ; ne touche le Treeview que si elle a changé.
+
+        section : item de section (voir section_for) ; None garde la section actuelle.
+        """
+        row = (tuple(values), tuple(tags))
+        item = self._item_by_path.get(path)
+        if item is None:
+            item = f"repo{next(self._ids)}"
+            self._item_by_path[path] = item
+            self._path_by_item[item] = path
+            self._parent[item] = section or ''
+        elif section is not None:
+            # Pris en compte au prochain placement (les lignes sont masquées entre deux scans)
+            self._parent[item] = section
+        if self._rows.get(item) == row:
+            return item
+        self._rows[item] = row
+        if item in self._created:
+            self.tree.item(item, values=row[0], tags=row[1])
+        return item
+
+    def _place(self, item: str, index):
+        """Affiche un item à la position donnée dans sa section (création, ré-attachement ou déplacement)."""
+        parent = self._parent[item]
+        if item in self._created:
+            self.tree.move(item, parent, index)
+        else:
+            values, tags = self._rows[item]
+            self.tree.insert(parent, index, iid=item, values=values, tags=tags)
+            self._created.add(item)
+
+    def append(self, path: str):
+        """Affiche la ligne d'un repository à la fin, si elle n'est pas déjà affichée."""
+        item = self._item_by_path[path]
+        if item not in self._attached_set:
+            self._place(item, 'end')
+            self._attached.append(item)
+            self._attached_set.add(item)
+
+    def show(self, paths):
+        """Affiche exactement ces repositories, dans cet ordre, avec le minimum d'opérations.
+
+        Chaque ligne est placée dans sa section ; l'ordre est conservé au sein de chacune.
+        """
+        items = [self._item_by_path[path] for path in paths if path in self._item_by_path]
+        wanted = set(items)
+        hidden = [item for item in self._attached if item not in wanted]
+        if hidden:
+            self.tree.detach(*hidden)
+        kept = [item for item in self._attached if item in wanted]
+        kept_set = set(kept)
+
+        # Cas courant (filtrage) : les lignes restées affichées sont déjà dans le bon
+        # ordre, seules celles qui réapparaissent sont à placer
+        in_order = [item for item in items if item in kept_set] == kept
+        positions: dict[str, int] = {}  # section -> prochaine position
+        for item in items:
+            parent = self._parent[item]
+            index = positions.get(parent, 0)
+            positions[parent] = index + 1
+            if not in_order or item not in kept_set:
+                self._place(item, index)
+        self._attached = items
+        self._attached_set = wanted
+
+    def retain(self, paths):
+        """Supprime les lignes des repositories qui ne font plus partie de la liste."""
+        keep = set(paths)
+        removed = [path for path in self._item_by_path if path not in keep]
+        if not removed:
+            return
+        items = {self._item_by_path.pop(path) for path in removed}
+        created = [item for item in items if item in self._created]
+        if created:
+            self.tree.delete(*created)
+        for item in items:
+            del self._path_by_item[item]
+            del self._parent[item]
+            self._rows.pop(item, None)
+            self._created.discard(item)
+        self._attached = [item for item in self._attached if item not in items]
+        self._attached_set -= items